@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Trace analyzer for Enhanced Jarvis
+Prints per-stage latency percentiles from a run.py --trace JSONL file
+"""
+
+import sys
+import json
+from collections import defaultdict
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values) - 1, int(round(pct / 100 * len(values))) - 1))
+    return values[rank]
+
+
+def load_spans(path):
+    spans = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    spans.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    return spans
+
+
+def print_stage_table(spans):
+    by_stage = defaultdict(list)
+    for span in spans:
+        by_stage[span['span']].append(span['duration_ms'])
+
+    print(f"{'stage':<24}{'count':>7}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}  (ms)")
+    print("-" * 75)
+    for stage in sorted(by_stage):
+        durations = sorted(by_stage[stage])
+        print(f"{stage:<24}{len(durations):>7}"
+              f"{percentile(durations, 50):>10.1f}{percentile(durations, 90):>10.1f}"
+              f"{percentile(durations, 99):>10.1f}{durations[-1]:>10.1f}")
+
+
+def print_turn(spans, turn_id):
+    turn_spans = sorted((s for s in spans if s['turn'] == turn_id), key=lambda s: s['start'])
+    if not turn_spans:
+        print(f"No spans for turn {turn_id}")
+        return
+
+    origin = turn_spans[0]['start']
+    end = max(s['start'] + s['duration_ms'] / 1000 for s in turn_spans)
+    print(f"Turn {turn_id}: {(end - origin) * 1000:.1f} ms wall clock")
+    for span in turn_spans:
+        indent = '  ' if span.get('parent') else ''
+        offset = (span['start'] - origin) * 1000
+        print(f"  +{offset:>9.1f} ms  {indent}{span['span']:<22}{span['duration_ms']:>9.1f} ms  [{span['thread']}]")
+
+
+def main():
+    args = sys.argv[1:]
+    if not args or '--help' in args:
+        print("Usage: python analyze_trace.py TRACE.jsonl [--turn TURN_ID | --slowest N]")
+        return
+
+    spans = load_spans(args[0])
+    if not spans:
+        print("Trace file is empty.")
+        return
+
+    if '--turn' in args:
+        print_turn(spans, args[args.index('--turn') + 1])
+        return
+
+    print_stage_table(spans)
+
+    if '--slowest' in args:
+        count = int(args[args.index('--slowest') + 1])
+        totals = defaultdict(float)
+        for span in spans:
+            if span['turn'] and span['span'] == 'command':
+                totals[span['turn']] += span['duration_ms']
+        for turn_id, _ in sorted(totals.items(), key=lambda item: -item[1])[:count]:
+            print()
+            print_turn(spans, turn_id)
+
+
+if __name__ == "__main__":
+    main()
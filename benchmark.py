@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for Enhanced Jarvis
+Measures local hot paths that do not need network access or a microphone
+"""
+
+import os
+import sys
+import json
+import time
+import wave
+import tempfile
+import random
+import datetime
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from analyze_trace import load_spans, percentile, print_stage_table
+from src.utils.notes_index import NotesIndex
+from src.utils.semantic_cache import NEAR_MISSES, PARAPHRASES, SemanticCache, match_score
+from src.utils.tracing import tracer
+from src.utils.vad import AGGRESSIVENESS, Endpointer, frame_features
+from src.utils.wake_word import split_wake_word
+
+WORDS = (
+    "dentist appointment tuesday call mom groceries milk eggs bread meeting project deadline "
+    "report budget flight paris hotel booking car service oil change birthday gift sarah "
+    "password router wifi recipe pasta garlic gym workout doctor prescription pharmacy "
+    "invoice client payment book library return movie tickets friday dinner reservation"
+).split()
+
+
+def print_latencies(label, samples_ms):
+    samples_ms = sorted(samples_ms)
+    print(f"{label:<24}{len(samples_ms):>7}"
+          f"{percentile(samples_ms, 50):>10.3f}{percentile(samples_ms, 90):>10.3f}"
+          f"{percentile(samples_ms, 99):>10.3f}{samples_ms[-1]:>10.3f}")
+
+
+def synthetic_notes(count):
+    rng = random.Random(42)
+    now = datetime.datetime.now()
+    return [{
+        "text": " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 16))),
+        "timestamp": (now - datetime.timedelta(minutes=i)).isoformat(),
+        "id": i + 1
+    } for i in range(count)]
+
+
+def bench_notes(args):
+    """Notes retrieval: index build, incremental add, search and prompt context."""
+    if '--notes' in args:
+        with open(args[args.index('--notes') + 1], 'r') as f:
+            notes = json.load(f)
+    else:
+        size = int(args[args.index('--size') + 1]) if '--size' in args else 10000
+        notes = synthetic_notes(size)
+    query_count = int(args[args.index('--queries') + 1]) if '--queries' in args else 500
+
+    started = time.perf_counter()
+    index = NotesIndex(notes)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    rng = random.Random(7)
+    queries = [f"what did I note about the {rng.choice(WORDS)} {rng.choice(WORDS)}" for _ in range(query_count)]
+    search_ms, context_ms, add_ms = [], [], []
+    for query in queries:
+        started = time.perf_counter()
+        index.search(query, k=3)
+        search_ms.append((time.perf_counter() - started) * 1000)
+        started = time.perf_counter()
+        index.context_for(query, k=3, token_budget=200)
+        context_ms.append((time.perf_counter() - started) * 1000)
+    for note in synthetic_notes(min(query_count, 1000)):
+        started = time.perf_counter()
+        index.add(note)
+        add_ms.append((time.perf_counter() - started) * 1000)
+
+    print(f"Notes index: {len(notes)} notes built in {build_ms:.1f} ms")
+    print(f"{'operation':<24}{'count':>7}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}  (ms)")
+    print("-" * 75)
+    print_latencies('search', search_ms)
+    print_latencies('context_for', context_ms)
+    print_latencies('add', add_ms)
+
+
+def synthetic_prompts(count, rng):
+    # Compound words give a vocabulary large enough that prompts rarely repeat
+    vocabulary = [a + b for a in WORDS for b in WORDS[:20]]
+    return [f"what about the {' '.join(rng.sample(vocabulary, rng.randint(2, 6)))}" for _ in range(count)]
+
+
+def bench_cache(args):
+    """Semantic cache: calibration pairs against the threshold, then get/put latency when full."""
+    threshold = float(args[args.index('--threshold') + 1]) if '--threshold' in args else 0.85
+    size = int(args[args.index('--size') + 1]) if '--size' in args else 100000
+    query_count = int(args[args.index('--queries') + 1]) if '--queries' in args else 1000
+
+    wrong = 0
+    print(f"Semantic cache calibration at threshold {threshold:g}")
+    print(f"{'expected':<10}{'score':>7}  prompts")
+    print("-" * 75)
+    for expected, pairs in (('hit', PARAPHRASES), ('miss', NEAR_MISSES)):
+        for a, b in pairs:
+            score = match_score(a, b)
+            ok = (score >= threshold) == (expected == 'hit')
+            wrong += not ok
+            print(f"{expected:<10}{score:>7.3f}  '{a}' ~ '{b}'{'' if ok else '  <-- WRONG'}")
+    if wrong:
+        print(f"{wrong} pairs on the wrong side of the threshold")
+    print()
+
+    rng = random.Random(5)
+    with tempfile.TemporaryDirectory(prefix='jarvis-cache-') as cache_dir:
+        cache = SemanticCache(cache_dir, capacity=size, threshold=threshold, save_interval=float('inf'))
+        started = time.perf_counter()
+        for prompt in synthetic_prompts(size, rng):
+            cache.put(prompt, "A cached answer of about the usual length for a spoken reply.")
+        fill_s = time.perf_counter() - started
+
+        get_ms, put_ms = [], []
+        for prompt in synthetic_prompts(query_count, rng):
+            started = time.perf_counter()
+            cache.get(prompt)
+            get_ms.append((time.perf_counter() - started) * 1000)
+        # Full by now, so every put evicts or replaces an entry
+        for prompt in synthetic_prompts(query_count, rng):
+            started = time.perf_counter()
+            cache.put(prompt, "A fresh answer.")
+            put_ms.append((time.perf_counter() - started) * 1000)
+        started = time.perf_counter()
+        cache.save()
+        save_ms = (time.perf_counter() - started) * 1000
+
+    print(f"Semantic cache: {len(cache)} entries filled in {fill_s:.1f} s, save {save_ms:.1f} ms")
+    print(f"{'operation':<24}{'count':>7}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}  (ms)")
+    print("-" * 75)
+    print_latencies('get', get_ms)
+    print_latencies('put', put_ms)
+    if wrong:
+        sys.exit(1)
+
+
+SAMPLE_RATE = 16000
+CHUNK = 1024  # speech_recognition.Microphone's default buffer size
+
+
+def synthetic_utterance(rng):
+    """Noise, a few voiced "words" with optional fricative tails, then noise; returns (samples, speech end)."""
+    t = lambda seconds: np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    noise_db = rng.uniform(-60, -45)
+    parts = [np.zeros(int(rng.uniform(0.6, 1.0) * SAMPLE_RATE))]
+    for word in range(rng.randint(2, 5)):
+        for _ in range(rng.randint(1, 3)):
+            times = t(rng.uniform(0.12, 0.28))
+            pitch = rng.uniform(110, 220)
+            voiced = sum(np.sin(2 * np.pi * pitch * h * times) / h for h in range(1, 6))
+            level = 10 ** (rng.uniform(-22, -12) / 20)
+            parts.append(voiced / np.max(np.abs(voiced)) * np.hanning(len(times)) * level)
+            parts.append(np.zeros(int(rng.uniform(0.02, 0.08) * SAMPLE_RATE)))
+        if rng.random() < 0.4:
+            hiss = np.diff(np.random.default_rng(rng.randint(0, 1 << 30)).standard_normal(int(0.12 * SAMPLE_RATE) + 1))
+            parts.append(hiss / np.max(np.abs(hiss)) * np.hanning(len(hiss)) * 10 ** (-32 / 20))
+        # Gap between words; now and then a longer hesitation
+        gap = rng.uniform(0.3, 0.5) if rng.random() < 0.2 else rng.uniform(0.05, 0.25)
+        parts.append(np.zeros(int(gap * SAMPLE_RATE)))
+    speech_end = sum(len(part) for part in parts[:-1]) / SAMPLE_RATE
+    parts.append(np.zeros(int(2.0 * SAMPLE_RATE)))
+    signal = np.concatenate(parts)
+    signal += np.random.default_rng(rng.randint(0, 1 << 30)).standard_normal(len(signal)) * 10 ** (noise_db / 20)
+    return (np.clip(signal, -1, 1) * 32767).astype(np.int16), speech_end
+
+
+def load_wav(path):
+    """Mono int16 samples and sample rate of a 16-bit WAV file."""
+    with wave.open(path, 'rb') as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM is supported")
+        samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+        channels, rate = wav.getnchannels(), wav.getframerate()
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    return samples, rate
+
+
+def oracle_speech_end(samples, rate):
+    """Offline estimate of where speech ends: the last 20ms frame 15 dB over the quietest tenth."""
+    energy, _ = frame_features(samples, rate // 50)
+    loud = np.nonzero(energy > np.percentile(energy, 10) + 15)[0]
+    return (loud[-1] + 1) / 50.0 if len(loud) else None
+
+
+def recognizer_endpoint(samples, rate, pause_threshold=0.8):
+    """When speech_recognition's listen() would end the phrase: RMS over 1.5x the calibrated noise, 0.8s pause."""
+    chunks = samples[:len(samples) // CHUNK * CHUNK].reshape(-1, CHUNK).astype(np.float64)
+    rms = np.sqrt(np.mean(chunks * chunks, axis=1))
+    calibration = max(1, int(0.5 * rate / CHUNK))
+    threshold = max(rms[:calibration].mean() * 1.5, 1.0)
+    pause_chunks = int(np.ceil(pause_threshold * rate / CHUNK))
+    started, pause = False, 0
+    for index, value in enumerate(rms[calibration:], calibration):
+        if value > threshold:
+            started, pause = True, 0
+        elif started:
+            pause += 1
+            if pause > pause_chunks:
+                return (index + 1) * CHUNK / rate
+    return None
+
+
+def vad_endpoint(samples, rate, aggressiveness):
+    """Stream the clip through an Endpointer in microphone-sized chunks; (end time, seconds spent)."""
+    endpointer = Endpointer(rate, aggressiveness)
+    data = samples.tobytes()
+    started = time.perf_counter()
+    for offset in range(0, len(data), CHUNK * 2):
+        if endpointer.feed(data[offset:offset + CHUNK * 2]):
+            break
+    spent = time.perf_counter() - started
+    return (endpointer.frames * endpointer.frame_seconds if endpointer.done else None), spent
+
+
+def bench_vad(args):
+    """Endpoint delay: time from the end of speech until the phrase is handed to STT."""
+    clips = []
+    wavs = [args[i + 1] for i, arg in enumerate(args) if arg == '--wav']
+    for path in wavs:
+        samples, rate = load_wav(path)
+        clips.append((samples, rate, oracle_speech_end(samples, rate)))
+    if not wavs:
+        rng = random.Random(11)
+        count = int(args[args.index('--count') + 1]) if '--count' in args else 50
+        for _ in range(count):
+            samples, end = synthetic_utterance(rng)
+            clips.append((samples, SAMPLE_RATE, end))
+    levels = [int(args[args.index('--aggressiveness') + 1])] if '--aggressiveness' in args else sorted(AGGRESSIVENESS)
+
+    results = {}
+    delays, missed = [], 0
+    for samples, rate, end in clips:
+        decided = recognizer_endpoint(samples, rate)
+        if decided is None or end is None:
+            missed += 1
+        else:
+            delays.append((decided - end) * 1000)
+    results['recognizer 0.8s pause'] = (delays, 0, missed)
+
+    audio_seconds, spent = 0.0, 0.0
+    for level in levels:
+        delays, cuts, missed = [], 0, 0
+        for samples, rate, end in clips:
+            decided, seconds = vad_endpoint(samples, rate, level)
+            spent += seconds
+            audio_seconds += (decided or len(samples) / rate)
+            if decided is None or end is None:
+                missed += 1
+            elif decided < end:
+                cuts += 1  # Ended on a pause before the speaker finished
+            else:
+                delays.append((decided - end) * 1000)
+        results[f"vad aggressiveness {level}"] = (delays, cuts, missed)
+
+    print(f"Endpointing: {len(clips)} {'recorded' if wavs else 'synthetic'} utterances")
+    print(f"{'detector':<24}{'count':>7}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}  (ms after speech ends)")
+    print("-" * 75)
+    for label, (delays, cuts, missed) in results.items():
+        if delays:
+            print_latencies(label, delays)
+        notes = []
+        if cuts:
+            notes.append(f"{cuts} cut short")
+        if missed:
+            notes.append(f"{missed} never ended")
+        if notes:
+            print(f"{'':<24}{', '.join(notes)}")
+    print(f"VAD processing: {spent / max(audio_seconds, 1e-9) * 100:.2f}% of real time")
+
+
+# Spoken commands for the synthetic voice-loop recordings; the audio is only speech-shaped,
+# so these need --stt transcript
+SCRIPT = [
+    "jarvis what time is it",
+    "good morning everyone",
+    "jarvis",
+    "what's the date today",
+    "jarvis what's the date",
+    "jarvis what time is it",
+]
+
+
+def write_synthetic_recordings(directory, count):
+    """Synthetic utterances as numbered WAVs, each with a sidecar transcript."""
+    rng = random.Random(23)
+    for index in range(count):
+        samples, speech_end = synthetic_utterance(rng)
+        samples = samples[:int((speech_end + 0.1) * SAMPLE_RATE)]  # Recordings stop when the speaker does
+        base = os.path.join(directory, f"{index:03d}")
+        with wave.open(base + '.wav', 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(SAMPLE_RATE)
+            wav.writeframes(samples.tobytes())
+        with open(base + '.txt', 'w', encoding='utf-8') as f:
+            f.write(SCRIPT[index % len(SCRIPT)])
+
+
+def instrument_voice(voice, stt, stt_latency, wake_word):
+    """Wrap Voice.record/recognize to time STT and wake-word detection against the replayed recordings."""
+    import speech_recognition as sr
+
+    source = voice.microphone
+    stats = {'phrases': 0, 'audio_seconds': 0.0, 'stt_seconds': 0.0, 'wake_ms': []}
+    phrase_ends = deque()  # Input position where each recorded phrase ended, in STT order
+
+    def recording_at(position):
+        """The recording a phrase ending at ``position`` came from (it may end in the gap after it)."""
+        index = 0
+        for i, utterance in enumerate(source.utterances):
+            if utterance['start'] <= position:
+                index = i
+        return source.utterances[index]
+
+    record = voice.record
+
+    def tracked_record(*args, **kwargs):
+        audio = record(*args, **kwargs)
+        if audio is not None:
+            phrase_ends.append(voice.input_position)
+        return audio
+    voice.record = tracked_record
+
+    recognize = voice.recognize
+    current = {}
+
+    def timed_recognize(audio, *args, **kwargs):
+        current['utterance'] = recording_at(phrase_ends.popleft() if phrase_ends else voice.input_position)
+        started = time.perf_counter()
+        text = recognize(audio, *args, **kwargs)
+        stats['stt_seconds'] += time.perf_counter() - started
+        stats['audio_seconds'] += len(audio.frame_data) / float(audio.sample_rate * audio.sample_width)
+        stats['phrases'] += 1
+        ended = source.played_at(current['utterance']['end'])
+        if ended is not None and text and split_wake_word(text, wake_word) is not None:
+            stats['wake_ms'].append((time.monotonic() - ended) * 1000)
+        return text
+    voice.recognize = timed_recognize
+
+    if stt == 'transcript':
+        transcribed = set()
+
+        def replay(audio, *args, **kwargs):
+            time.sleep(stt_latency)
+            utterance = current['utterance']
+            # A recording split into several phrases is transcribed once
+            if not utterance['transcript'] or utterance['path'] in transcribed:
+                raise sr.UnknownValueError()
+            transcribed.add(utterance['path'])
+            return utterance['transcript']
+        voice.recognizer.recognize_google = replay
+    return stats
+
+
+def bench_voice(args):
+    """Voice input end to end on recorded audio: STT throughput, wake-word latency, per-stage timings."""
+    mode = args[args.index('--mode') + 1] if '--mode' in args else 'pipeline'
+    speed = float(args[args.index('--speed') + 1]) if '--speed' in args else 1.0
+    stt_latency = float(args[args.index('--stt-latency') + 1]) if '--stt-latency' in args else 0.3
+    workdir = tempfile.mkdtemp(prefix='jarvis-bench-')
+    if '--audio' in args:
+        audio_path = args[args.index('--audio') + 1]
+    else:
+        audio_path = workdir
+        write_synthetic_recordings(workdir, int(args[args.index('--count') + 1]) if '--count' in args else 6)
+    stt = args[args.index('--stt') + 1] if '--stt' in args else None
+
+    trace_path = os.path.join(workdir, 'trace.jsonl')
+    tracer.enable(trace_path)
+    overrides = {'audio_input': audio_path, 'audio_input_speed': speed}
+    started = time.perf_counter()
+    if mode == 'listen':
+        from src.utils.voice import Voice
+        voice = Voice(dict(overrides, wake_word='jarvis'))
+        stt = stt or ('transcript' if all(u['transcript'] for u in voice.microphone.utterances) else 'google')
+        stats = instrument_voice(voice, stt, stt_latency, 'jarvis')
+        try:
+            while not voice.input_ended:
+                voice.listen(timeout=2, phrase_time_limit=15)
+        finally:
+            voice.shutdown()
+    else:
+        from src.assistant import Assistant
+        assistant = Assistant(overrides=overrides)
+        voice = assistant.voice
+        stt = stt or ('transcript' if all(u['transcript'] for u in voice.microphone.utterances) else 'google')
+        stats = instrument_voice(voice, stt, stt_latency, assistant.config['wake_word'])
+        try:
+            assistant.run_voice_mode()
+        finally:
+            assistant.shutdown()
+    elapsed = time.perf_counter() - started
+    tracer.close()
+
+    source = voice.microphone
+    print(f"Voice {mode}: {len(source.utterances)} recordings, {source.duration:.1f} s of audio "
+          f"at {speed:g}x in {elapsed:.1f} s, STT: {stt}")
+    if stats['stt_seconds']:
+        print(f"STT throughput: {stats['phrases']} phrases, {stats['audio_seconds']:.1f} s of speech "
+              f"in {stats['stt_seconds']:.2f} s ({stats['audio_seconds'] / stats['stt_seconds']:.1f}x real time, "
+              f"{stats['phrases'] / stats['stt_seconds']:.2f} phrases/s)")
+    print()
+    if stats['wake_ms']:
+        print(f"{'latency':<24}{'count':>7}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}  (ms after the recording ends)")
+        print("-" * 75)
+        print_latencies('wake word recognized', stats['wake_ms'])
+        print()
+    spans = load_spans(trace_path)
+    if spans:
+        print_stage_table(spans)
+
+
+BENCHMARKS = {
+    'cache': bench_cache,
+    'notes': bench_notes,
+    'vad': bench_vad,
+    'voice': bench_voice,
+}
+
+
+def main():
+    args = sys.argv[1:]
+    if not args or args[0] not in BENCHMARKS or '--help' in args:
+        print("Usage: python benchmark.py BENCHMARK [OPTIONS]")
+        print()
+        print("  cache [--threshold X] [--size N] [--queries N]")
+        print("        Semantic cache: reworded and near-miss prompt pairs against the threshold,")
+        print("        then get/put latency in a full cache (default: 100000 entries)")
+        print("  notes [--notes FILE | --size N] [--queries N]")
+        print("        Notes retrieval latency (default: 10000 synthetic notes)")
+        print("  vad [--wav FILE ...] [--count N] [--aggressiveness 0-3]")
+        print("        End-of-utterance delay vs. speech_recognition's pause threshold")
+        print("        (default: 50 synthetic utterances; WAVs must be 16-bit PCM)")
+        print("  voice [--audio FILE|DIR] [--mode pipeline|listen] [--speed X]")
+        print("        [--stt google|sphinx|transcript] [--stt-latency S] [--count N]")
+        print("        Recorded audio through Voice.listen or run_voice_mode: STT throughput,")
+        print("        wake-word latency and per-stage timings. 'transcript' STT replays NAME.txt")
+        print("        next to each NAME.wav (default: synthetic recordings, transcript STT)")
+        return
+    BENCHMARKS[args[0]](args[1:])
+
+
+if __name__ == "__main__":
+    main()
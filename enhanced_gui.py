@@ -9,6 +9,10 @@ from tkinter import ttk, scrolledtext, messagebox, filedialog
 import threading
 import queue
 from free_ai_assistant import FreeAIAssistant
+from src.utils.config_service import needs_restart
+from src.utils.metrics import ai_latency, ai_requests, cache_requests
+from src.utils.singleflight import SingleFlight
+from src.utils.wake_word import is_stop_request, split_wake_word
 import datetime
 import json
 import asyncio
@@ -130,7 +134,7 @@ class EnhancedJarvisGUI:
         # AI service selector
         self.service_var = tk.StringVar(value="huggingface")
         service_menu = ttk.Combobox(chat_header, textvariable=self.service_var, 
-                                   values=["huggingface", "groq", "ollama"], 
+                                   values=["auto", "huggingface", "groq", "ollama", "together"], 
                                    state="readonly", width=12)
         service_menu.pack(side=tk.RIGHT, pady=5)
         service_menu.bind('<<ComboboxSelected>>', self.change_ai_service)
@@ -284,10 +288,15 @@ class EnhancedJarvisGUI:
         def init_assistant():
             try:
                 self.assistant = FreeAIAssistant()
+                self.assistant.reminders.add_listener(
+                    lambda reminder: self.message_queue.put(("system", f"⏰ Reminder: {reminder['text']}"))
+                )
+                self.assistant.reminders.start()
                 self.message_queue.put(("status", "🟢 Free AI Systems Online"))
                 self.message_queue.put(("ai_status", "active"))
                 self.message_queue.put(("system", "All systems operational! Ready for free AI assistance."))
-                self.update_service_indicators()
+                # Tk widgets and variables are only touched from process_messages
+                self.message_queue.put(("service", self.assistant.config.get('ai_service', 'huggingface')))
             except Exception as e:
                 self.message_queue.put(("status", "🔴 Error"))
                 self.message_queue.put(("ai_status", "error"))
@@ -318,8 +327,17 @@ class EnhancedJarvisGUI:
         """Change the active AI service."""
         if self.assistant:
             new_service = self.service_var.get()
-            self.assistant.config['ai_service'] = new_service
-            self.add_message("System", f"Switched to {new_service.title()} AI service", "system")
+            try:
+                # Saved to the config file, so the next reload keeps the choice
+                self.assistant.config_service.set('ai_service', new_service)
+            except Exception as e:
+                self.service_var.set(self.assistant.config.get('ai_service', 'huggingface'))
+                self.add_message("System", f"Couldn't save AI service: {e}", "system")
+                return
+            if new_service == 'auto':
+                self.add_message("System", f"Adaptive routing enabled ({self.assistant.config.get('router_policy', 'latency')} policy)", "system")
+            else:
+                self.add_message("System", f"Switched to {new_service.title()} AI service", "system")
 
     def process_messages(self):
         """Process messages from the queue."""
@@ -334,6 +352,9 @@ class EnhancedJarvisGUI:
                         self.ai_indicator.config(fg='#00ff88')
                     elif content == "error":
                         self.ai_indicator.config(fg='#ff4444')
+                elif msg_type == "service":
+                    self.service_var.set(content)
+                    self.update_service_indicators()
                 elif msg_type == "system":
                     self.add_message("Jarvis", content, "system")
                 elif msg_type == "user":
@@ -447,10 +468,15 @@ class EnhancedJarvisGUI:
                     if not self.conversation_active:
                         break
                     
-                    if self.assistant.config['wake_word'] in command:
-                        self.message_queue.put(("system", "👂 Listening for your command..."))
-                        
-                        command = self.assistant.listen(timeout=15)
+                    remainder = split_wake_word(command, self.assistant.config['wake_word'],
+                                                self.assistant.config.get('wake_word_aliases', []))
+                    if remainder is not None:
+                        if is_stop_request(remainder):
+                            continue
+                        if not remainder:
+                            self.message_queue.put(("system", "👂 Listening for your command..."))
+                            remainder = self.assistant.listen(timeout=15, pre_roll=0)
+                        command = remainder
                         if command and self.conversation_active:
                             self.message_queue.put(("user", command))
                             
@@ -549,16 +575,42 @@ class EnhancedJarvisGUI:
         )
         settings_text.pack(fill=tk.BOTH, expand=True)
         
-        # Display current configuration
+        # Display current configuration; it is editable and applied without a restart
         if self.assistant:
-            config_text = json.dumps(self.assistant.config, indent=2)
-            settings_text.insert(tk.END, "Current Configuration:\n\n")
-            settings_text.insert(tk.END, config_text)
-            settings_text.insert(tk.END, "\n\n" + "="*50 + "\n\n")
-            settings_text.insert(tk.END, "To modify settings:\n")
-            settings_text.insert(tk.END, "1. Edit 'free_ai_config.json' file\n")
-            settings_text.insert(tk.END, "2. Add your free API keys\n")
-            settings_text.insert(tk.END, "3. Restart the application\n")
+            settings_text.insert(tk.END, json.dumps(self.assistant.config, indent=2))
+        
+        def save_settings():
+            try:
+                user_config = json.loads(settings_text.get("1.0", tk.END))
+                if not isinstance(user_config, dict):
+                    raise ValueError("settings must be a JSON object")
+                changed = self.assistant.config_service.save(user_config)
+            except ValueError as e:
+                messagebox.showerror("Invalid Settings", str(e), parent=settings_window)
+                return
+            except Exception as e:
+                messagebox.showerror("Error", f"Couldn't save settings: {e}", parent=settings_window)
+                return
+            
+            deferred = [key for key in sorted(changed) if needs_restart(key)]
+            message = f"Applied {len(changed)} change(s)." if changed else "No changes."
+            if deferred:
+                message += "\n\nThese take effect after a restart:\n" + "\n".join(deferred)
+            messagebox.showinfo("Settings Saved", message, parent=settings_window)
+        
+        ttk.Label(
+            settings_frame,
+            text="Edit and save to apply live. Edits to 'free_ai_config.json' are picked up automatically.",
+            style='Status.TLabel'
+        ).pack(fill=tk.X, pady=(10, 0))
+        
+        ttk.Button(
+            settings_frame,
+            text="💾 Save & Apply",
+            command=save_settings,
+            style='Enhanced.TButton',
+            state=tk.NORMAL if self.assistant else tk.DISABLED
+        ).pack(side=tk.RIGHT, pady=10)
 
     def show_api_setup(self):
         """Show API setup guide window."""
@@ -651,17 +703,19 @@ Memory: {memory.percent:.1f}%
 Available: {memory.available // (1024**3):.1f}GB
 
 AI Services:
-Active: {ai_service.title()}
+Active: {ai_service.title()}{self.format_route()}
 Hugging Face: {hf_status}
-Groq: {groq_status}
+Groq: {groq_status}{self.format_quota('groq')}
 Ollama: {'🟢 Available' if self.assistant.get_ollama_response('test') else '🔴 Not Running'}
 
 Features:
-Weather: {'🟢 Ready' if self.assistant.config.get('weather_api_key') else '🔴 Not Set'}
-News: {'🟢 Ready' if self.assistant.config.get('news_api_key') else '🔴 Not Set'}
+Weather: {'🟢 Ready' if self.assistant.config.get('weather_api_key') else '🔴 Not Set'}{self.format_quota('weather')}
+News: {'🟢 Ready' if self.assistant.config.get('news_api_key') else '🔴 Not Set'}{self.format_quota('news')}
 
 Conversation History: {len(self.assistant.conversation_history)} messages
 Notes: {len(self.assistant.notes)} saved
+
+{self.format_metrics()}
 """
                 
                 self.info_display.config(state=tk.NORMAL)
@@ -675,6 +729,51 @@ Notes: {len(self.assistant.notes)} saved
         # Schedule next update
         self.root.after(5000, self.update_system_info)
 
+    def format_quota(self, provider):
+        """Remaining free-tier budget for a provider, if it has one."""
+        quota = self.assistant.quota
+        wait = quota.blocked_for(provider)
+        if wait:
+            return f" (paused {wait:.0f}s)"
+        remaining = quota.remaining(provider)
+        if remaining is None:
+            return ""
+        return f" ({remaining}/{quota.limits[provider]['daily']} left today)"
+
+    def format_route(self):
+        """Show the router's current pick when adaptive routing is on."""
+        if self.assistant.config.get('ai_service') != 'auto':
+            return ""
+        order = self.assistant.backend_order()
+        stats = self.assistant.router.snapshot().get(order[0], {})
+        if not stats:
+            return f" -> {order[0].title()}"
+        return f" -> {order[0].title()} ({stats['latency']:.2f}s, {stats['success']:.0%} ok)"
+
+    def format_metrics(self):
+        """Summarize backend and cache metrics for the info panel."""
+        lines = ["Backend Metrics:"]
+        for service in self.assistant.ai_services:
+            ok = ai_requests.value(backend=service, outcome='ok')
+            errors = ai_requests.value(backend=service, outcome='error')
+            if not ok and not errors:
+                continue
+            p50 = ai_latency.quantile(0.5, backend=service)
+            lines.append(f"{service.title()}: {int(ok + errors)} calls, {int(errors)} errors, p50 {p50:.2f}s")
+        if len(lines) == 1:
+            lines.append("No AI calls yet")
+        
+        for cache in ('semantic', 'tts', 'search', 'prices'):
+            hits = cache_requests.value(cache=cache, result='hit')
+            total = hits + cache_requests.value(cache=cache, result='miss') + cache_requests.value(cache=cache, result='stale')
+            if total:
+                lines.append(f"{cache.title()} cache: {hits / total:.0%} hit rate ({int(total)} lookups)")
+        
+        saved = SingleFlight.total_saved()
+        if saved:
+            lines.append(f"Duplicate calls saved: {saved}")
+        return "\n".join(lines)
+
     def run(self):
         """Start the enhanced GUI."""
         self.root.mainloop()
@@ -15,6 +15,7 @@ import json
 import datetime
 import time
 import threading
+import queue
 import re
 import webbrowser
 import random
@@ -25,9 +26,28 @@ import wikipedia
 import yfinance as yf
 import pyautogui
 import psutil
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import logging
 
+from src.utils.async_runner import AsyncRunner
+from src.utils.briefing import FanOut, SourceError
+from src.utils.capture import ContinuousMicrophone
+from src.utils.config_service import ConfigService
+from src.utils.deadline import deadline_scope, expired, time_left
+from src.utils.notes_index import NotesIndex
+from src.utils.metrics import ai_fallback_depth, ai_requests, metrics, note_ops, record_backend_call
+from src.utils.quota import QuotaTracker
+from src.utils.reminders import REMINDER_PATTERN, ReminderScheduler, describe_due, parse_reminder
+from src.utils.retry import RetryableError, RetryPolicy, raise_if_retryable, raise_if_retryable_sync
+from src.utils.router import BackendRouter
+from src.utils.semantic_cache import SemanticCache
+from src.utils.singleflight import coalesced
+from src.utils.stocks import PriceHistory, parse_trend_query
+from src.utils.tts_cache import TTSCache, play_clip
+from src.utils.vad import Endpointer, capture_phrase
+from src.utils.wake_word import is_stop_request, split_wake_word
+from src.utils.web_search import SearchPipeline, SentenceBuffer, search_url, split_sentences
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -44,13 +64,50 @@ class FreeAIAssistant:
         self.recognizer = sr.Recognizer()
         self.microphone = sr.Microphone()
         self.tts_engine = pyttsx3.init()
+        self.speech_lock = threading.Lock()
         
         # Load configuration
         self.config = self.load_config()
+        metrics.start(self.config)
         self.setup_voice()
+        # Microphone stays open and buffered so commands said with the wake word aren't cut off
+        self.capture = ContinuousMicrophone(self.microphone, pre_roll=self.config['voice_pre_roll'])
+        self.endpointer = None
+        self.last_spoke = 0.0  # time.monotonic() when speech last finished
+        self.tts_cache = TTSCache(
+            self.render_speech,
+            cache_dir=self.config.get('tts_cache_dir', 'tts_cache'),
+            max_items=self.config.get('tts_cache_size', 64),
+            min_repeats=self.config.get('tts_cache_min_repeats', 2)
+        )
+        self.tts_cache.configure(self.config)
+        self._speech_warmer = None
         
         # Load data
         self.notes = self.load_notes()
+        self.notes_index = NotesIndex(self.notes)
+        self.reminders = ReminderScheduler(
+            self.config.get('reminders_file', 'reminders.jsonl'),
+            catch_up=self.config.get('reminder_catch_up_hours', 24) * 3600
+        )
+        self.reminders.add_listener(self.announce_reminder)
+        self.price_history = PriceHistory(self.config.get('price_cache_dir', 'price_cache'))
+        self.fan_out = FanOut()
+        self.async_runner = AsyncRunner()
+        self.router = BackendRouter(self.config, self.config.get('router_stats_file', 'router_stats.json'))
+        self.quota = QuotaTracker(self.config.get('provider_limits'), self.config.get('quota_state_file', 'quota_state.json'))
+        self.router.add_headroom_source(self.quota.headroom)
+        self.retry_policy = RetryPolicy(self.config, self.quota)
+        self.response_cache = SemanticCache(
+            self.config.get('semantic_cache_dir', 'semantic_cache'),
+            capacity=self.config.get('semantic_cache_size', 10000),
+            threshold=self.config.get('semantic_cache_threshold', 0.85),
+            ttl=self.config.get('semantic_cache_ttl', 86400)
+        )
+        self.search_pipeline = SearchPipeline(
+            max_pages=self.config.get('search_max_pages', 3),
+            per_host=self.config.get('search_per_host', 2)
+        )
         
         # AI service endpoints (free alternatives)
         self.ai_services = {
@@ -68,40 +125,90 @@ class FreeAIAssistant:
             "time_of_day": self.get_time_period()
         }
         
+        startup_message = "Enhanced Jarvis online! I'm powered by free AI services and ready for anything!"
+        self.tts_cache.pin((text, self.speech_rate(emotion)) for text, emotion in [
+            ("Yes? I'm listening.", "attentive"), ("Goodbye!", "warm"), ("Goodbye! Take care!", "warm"),
+            (startup_message, "neutral")
+        ])
+        
+        self.config_service.subscribe(self.apply_config)
+        self.config_service.start(self.config.get('config_poll_interval', 2.0))
+        
         print("🚀 Enhanced Free AI Assistant initialized successfully!")
-        self.speak("Enhanced Jarvis online! I'm powered by free AI services and ready for anything!")
+        self.speak(startup_message)
 
     def load_config(self):
-        """Load configuration settings with free API options."""
+        """Load configuration settings with free API options; later edits to the file apply live."""
         default_config = {
             "voice_rate": 200,
             "voice_volume": 0.9,
             "voice_id": 0,
             "wake_word": "jarvis",
             "auto_listen": True,
-            "ai_service": "huggingface",  # Default to Hugging Face
+            "ai_service": "huggingface",  # Default to Hugging Face, or "auto" for adaptive routing
             "huggingface_token": "",  # Free tier available
             "groq_api_key": "",  # Free tier: 100 requests/day
             "together_api_key": "",  # Free tier available
             "weather_api_key": "",  # OpenWeatherMap free tier
             "news_api_key": "",  # NewsAPI free tier
+            "price_cache_dir": "price_cache",  # Local daily price history
+            "home_city": "",  # Default city for weather in the daily briefing
+            "stock_watchlist": [],  # Symbols quoted in the daily briefing
+            "briefing_timeout": 8,  # Seconds to wait for briefing sources
+            "search_max_pages": 3,  # Result pages fetched per web search
+            "search_per_host": 2,  # Concurrent connections per host
+            "metrics_file": "jarvis_metrics.prom",  # OpenMetrics text export
+            "metrics_interval": 15,
+            "metrics_port": 0,  # Set to serve /metrics on 127.0.0.1
+            "router_policy": "latency",  # latency, quality or balanced (used when ai_service is "auto")
+            "router_stats_file": "router_stats.json",
+            "quota_state_file": "quota_state.json",
+            "provider_limits": {},  # Overrides for free-tier limits, e.g. {"groq": {"daily": 100}}
+            "retry_max_attempts": 3,  # Attempts per backend for transient errors
+            "retry_base_delay": 0.5,  # Seconds; doubled per attempt with full jitter
+            "retry_max_delay": 20.0,  # Longest single wait, including model-loading hints
+            "retry_budget": 15.0,  # Seconds a backend may spend retrying
+            "command_deadline": 12.0,  # Hard response-time budget per command, in seconds
+            "semantic_cache_dir": "semantic_cache",
+            "semantic_cache_size": 10000,  # Cached AI answers; 0 disables the cache
+            "semantic_cache_threshold": 0.85,  # Cosine similarity needed to reuse an answer
+            "semantic_cache_ttl": 86400,  # Seconds before a cached answer goes stale
+            "notes_context_notes": 3,  # Relevant notes added to Groq/Ollama prompts
+            "notes_context_tokens": 200,  # Prompt budget for those notes
+            "notes_min_score": 0.5,  # Share of a request a note must match to be added (0-1)
+            "reminders_file": "reminders.jsonl",  # Append-only reminder journal
+            "reminder_catch_up_hours": 24,  # Missed reminders older than this are dropped on start
+            "tts_cache_dir": "tts_cache",  # Pre-rendered speech for fixed phrases
+            "tts_cache_size": 64,  # Phrases kept in memory
+            "tts_cache_min_repeats": 2,  # Uses before a phrase is rendered and cached
+            "voice_pre_roll": 2.0,  # Seconds of audio before each listen that are kept
+            "wake_word_aliases": [],  # Mis-hearings of the wake word to accept too
+            "vad_enabled": True,  # End phrases on our own endpointer instead of a fixed 0.8s pause
+            "vad_aggressiveness": 1,  # 0-3; higher ends phrases sooner but may cut off hesitant speech
+            "voice_echo_tail": 0.3,  # Seconds after speaking before the microphone is trusted again
+            "config_poll_interval": 2.0,  # Seconds between checks of this file for edits; 0 disables
             "max_conversation_history": 10,
             "enable_learning": True,
             "personality_mode": "friendly",
             "fallback_responses": True
         }
         
-        try:
-            with open(self.config_file, 'r') as f:
-                config = json.load(f)
-                for key, value in default_config.items():
-                    if key not in config:
-                        config[key] = value
-                return config
-        except FileNotFoundError:
-            with open(self.config_file, 'w') as f:
-                json.dump(default_config, f, indent=2)
-            return default_config
+        self.config_service = ConfigService(self.config_file, default_config)
+        return self.config_service.config
+
+    def apply_config(self, config: Dict, changed: set):
+        """Rebuild state derived from edited settings; most settings are read on every use."""
+        if changed & {'voice_id', 'voice_rate', 'voice_volume'}:
+            with self.speech_lock:
+                self.setup_voice()
+        if 'vad_aggressiveness' in changed:
+            self.endpointer = None
+        self.response_cache.threshold = config.get('semantic_cache_threshold', 0.85)
+        self.response_cache.ttl = config.get('semantic_cache_ttl', 86400)
+        self.search_pipeline.max_pages = config.get('search_max_pages', 3)
+        self.search_pipeline.per_host = config.get('search_per_host', 2)
+        if 'provider_limits' in changed:
+            self.quota.set_limits(config.get('provider_limits'))
 
     def setup_voice(self):
         """Configure text-to-speech settings."""
@@ -115,29 +222,71 @@ class FreeAIAssistant:
         except Exception as e:
             logger.warning(f"Voice setup warning: {e}")
 
+    def speech_rate(self, emotion: str) -> int:
+        """Speaking rate adjusted for emotion."""
+        if emotion == "excited":
+            return self.config['voice_rate'] + 20
+        elif emotion == "calm":
+            return self.config['voice_rate'] - 20
+        return self.config['voice_rate']
+
+    def render_speech(self, text: str, rate: int, path: str) -> bool:
+        """Render speech to a WAV file for the speech cache."""
+        with self.speech_lock:
+            self.tts_engine.setProperty('rate', rate)
+            self.tts_engine.save_to_file(text, path)
+            self.tts_engine.runAndWait()
+        return os.path.exists(path) and os.path.getsize(path) > 44
+
+    def warm_speech_cache(self):
+        """Render queued speech cache phrases on a background thread."""
+        if not self.tts_cache.pending or (self._speech_warmer and self._speech_warmer.is_alive()):
+            return
+        
+        def render_all():
+            while self.tts_cache.render_pending():
+                pass
+        
+        self._speech_warmer = threading.Thread(target=render_all, name='speech-cache', daemon=True)
+        self._speech_warmer.start()
+
     def speak(self, text, emotion="neutral"):
         """Enhanced text-to-speech with emotion."""
         try:
-            if emotion == "excited":
-                self.tts_engine.setProperty('rate', self.config['voice_rate'] + 20)
-            elif emotion == "calm":
-                self.tts_engine.setProperty('rate', self.config['voice_rate'] - 20)
-            else:
-                self.tts_engine.setProperty('rate', self.config['voice_rate'])
-            
-            print(f"🗣️ Jarvis ({emotion}): {text}")
-            self.tts_engine.say(text)
-            self.tts_engine.runAndWait()
+            # Reminders are announced from the scheduler thread; the engine is not thread-safe
+            with self.speech_lock:
+                rate = self.speech_rate(emotion)
+                self.tts_cache.configure(self.config)
+                clip = self.tts_cache.lookup(text, rate)
+                
+                print(f"🗣️ Jarvis ({emotion}): {text}")
+                if clip is None or not play_clip(clip):
+                    self.tts_engine.setProperty('rate', rate)
+                    self.tts_engine.say(text)
+                    self.tts_engine.runAndWait()
+                self.last_spoke = time.monotonic()
         except Exception as e:
             logger.error(f"Speech error: {e}")
             print(f"🗣️ Jarvis ({emotion}): {text}")
+        self.warm_speech_cache()
 
-    def listen(self, timeout=5):
+    def listen(self, timeout=5, pre_roll=None):
         """Enhanced voice input with better error handling."""
         try:
-            with self.microphone as source:
-                print("🎤 Listening...")
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
+            # Never rewind into the tail of our own speech
+            pre_roll = self.capture.pre_roll if pre_roll is None else pre_roll
+            pre_roll = max(0.0, min(pre_roll, time.monotonic() - self.last_spoke - self.config['voice_echo_tail']))
+            # Calibrates on first use only; later listens reuse the open microphone
+            source = self.capture.source(self.recognizer, pre_roll)
+            print("🎤 Listening...")
+            if self.config['vad_enabled'] and source.SAMPLE_WIDTH == 2:
+                if self.endpointer is None:
+                    self.endpointer = Endpointer(source.SAMPLE_RATE, self.config['vad_aggressiveness'])
+                frames = capture_phrase(source, self.endpointer, timeout, phrase_time_limit=15)
+                if frames is None:
+                    return None
+                audio = sr.AudioData(frames, source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+            else:
                 audio = self.recognizer.listen(source, timeout=timeout, phrase_time_limit=15)
             
             print("🔄 Processing speech...")
@@ -155,8 +304,28 @@ class FreeAIAssistant:
             logger.error(f"Speech recognition error: {e}")
             return None
 
+    async def _retry_async(self, name: str, request, prompt: str) -> Optional[str]:
+        """Run an async backend request under the retry policy."""
+        try:
+            return await self.retry_policy.call_async(name, request, prompt)
+        except RetryableError as e:
+            logger.warning(f"{name} failed after retries: {e}")
+            return None
+
+    def _retry_sync(self, name: str, request, prompt: str) -> Optional[str]:
+        """Run a blocking backend request under the retry policy."""
+        try:
+            return self.retry_policy.call(name, request, prompt)
+        except RetryableError as e:
+            logger.warning(f"{name} failed after retries: {e}")
+            return None
+
     async def get_huggingface_response(self, user_input: str) -> str:
         """Get response from Hugging Face Inference API (Free)."""
+        return await self._retry_async('huggingface', self._request_huggingface, user_input)
+
+    async def _request_huggingface(self, user_input: str) -> str:
+        """Single Hugging Face request; raises RetryableError on transient failures."""
         try:
             headers = {}
             if self.config.get('huggingface_token'):
@@ -176,21 +345,42 @@ class FreeAIAssistant:
                     self.ai_services['huggingface'],
                     headers=headers,
                     json=payload,
-                    timeout=10
+                    timeout=time_left(10)
                 ) as response:
                     if response.status == 200:
                         result = await response.json()
                         if isinstance(result, list) and len(result) > 0:
                             return result[0].get('generated_text', '').replace(user_input, '').strip()
                     else:
+                        self.quota.note_response('huggingface', response.status, response.headers.get('Retry-After'))
+                        await raise_if_retryable(response, 'Hugging Face')
                         logger.warning(f"Hugging Face API error: {response.status}")
                         return None
+        except RetryableError:
+            raise
         except Exception as e:
             logger.error(f"Hugging Face API error: {e}")
             return None
 
+    def system_prompt(self, user_input: str) -> str:
+        """Jarvis persona plus any notes relevant to the request."""
+        prompt = "You are Jarvis, a helpful AI assistant. Be concise and friendly."
+        context = self.notes_index.context_for(
+            user_input,
+            k=self.config.get('notes_context_notes', 3),
+            token_budget=self.config.get('notes_context_tokens', 200),
+            min_score=self.config.get('notes_min_score', 0.5)
+        )
+        if context:
+            prompt += " Use the user's notes below when they are relevant.\n\n" + context
+        return prompt
+
     async def get_groq_response(self, user_input: str) -> str:
         """Get response from Groq API (Free tier: 100 requests/day)."""
+        return await self._retry_async('groq', self._request_groq, user_input)
+
+    async def _request_groq(self, user_input: str) -> str:
+        """Single Groq request; raises RetryableError on transient failures."""
         if not self.config.get('groq_api_key'):
             return None
         
@@ -205,7 +395,7 @@ class FreeAIAssistant:
                 "messages": [
                     {
                         "role": "system",
-                        "content": "You are Jarvis, a helpful AI assistant. Be concise and friendly."
+                        "content": self.system_prompt(user_input)
                     },
                     {
                         "role": "user",
@@ -221,39 +411,51 @@ class FreeAIAssistant:
                     self.ai_services['groq'],
                     headers=headers,
                     json=payload,
-                    timeout=10
+                    timeout=time_left(10)
                 ) as response:
                     if response.status == 200:
                         result = await response.json()
                         return result['choices'][0]['message']['content'].strip()
                     else:
+                        self.quota.note_response('groq', response.status, response.headers.get('Retry-After'))
+                        await raise_if_retryable(response, 'Groq')
                         logger.warning(f"Groq API error: {response.status}")
                         return None
+        except RetryableError:
+            raise
         except Exception as e:
             logger.error(f"Groq API error: {e}")
             return None
 
+    @coalesced('ollama')
     def get_ollama_response(self, user_input: str) -> str:
         """Get response from local Ollama instance (Free, runs locally)."""
+        return self._retry_sync('ollama', self._request_ollama, user_input)
+
+    def _request_ollama(self, user_input: str) -> str:
+        """Single Ollama request; raises RetryableError on transient failures."""
         try:
             payload = {
                 "model": "llama2",  # or any model you have installed
-                "prompt": f"You are Jarvis, a helpful AI assistant. User: {user_input}\nJarvis:",
+                "prompt": f"{self.system_prompt(user_input)}\nUser: {user_input}\nJarvis:",
                 "stream": False
             }
             
             response = requests.post(
                 self.ai_services['ollama'],
                 json=payload,
-                timeout=30
+                timeout=time_left(30)
             )
             
             if response.status_code == 200:
                 result = response.json()
                 return result.get('response', '').strip()
             else:
+                raise_if_retryable_sync(response, 'Ollama')
                 logger.warning(f"Ollama not available: {response.status_code}")
                 return None
+        except RetryableError:
+            raise
         except requests.exceptions.ConnectionError:
             logger.info("Ollama not running locally")
             return None
@@ -261,45 +463,285 @@ class FreeAIAssistant:
             logger.error(f"Ollama error: {e}")
             return None
 
-    async def get_ai_response(self, user_input: str, context: str = "") -> str:
-        """Get intelligent response using available free AI services."""
-        # Try different AI services in order of preference
-        ai_service = self.config.get('ai_service', 'huggingface')
-        
-        response = None
+    async def get_together_response(self, user_input: str) -> str:
+        """Get response from Together AI inference API (Free tier available)."""
+        return await self._retry_async('together', self._request_together, user_input)
+
+    async def _request_together(self, user_input: str) -> str:
+        """Single Together request; raises RetryableError on transient failures."""
+        if not self.config.get('together_api_key'):
+            return None
         
-        # Try primary service
-        if ai_service == 'groq':
-            response = await self.get_groq_response(user_input)
-        elif ai_service == 'ollama':
-            response = self.get_ollama_response(user_input)
-        else:  # Default to Hugging Face
-            response = await self.get_huggingface_response(user_input)
-        
-        # Fallback to other services if primary fails
-        if not response:
-            if ai_service != 'huggingface':
-                response = await self.get_huggingface_response(user_input)
+        try:
+            headers = {
+                'Authorization': f"Bearer {self.config['together_api_key']}",
+                'Content-Type': 'application/json'
+            }
             
-            if not response and ai_service != 'ollama':
-                response = self.get_ollama_response(user_input)
+            payload = {
+                "model": "togethercomputer/llama-2-7b-chat",
+                "prompt": f"[INST] You are Jarvis, a helpful AI assistant. Be concise and friendly. {user_input} [/INST]",
+                "max_tokens": 150,
+                "temperature": 0.7
+            }
             
-            if not response and ai_service != 'groq':
+            async with aiohttp.ClientSession() as session:
+                async with session.post(
+                    self.ai_services['together'],
+                    headers=headers,
+                    json=payload,
+                    timeout=time_left(10)
+                ) as response:
+                    if response.status == 200:
+                        result = await response.json()
+                        return result['output']['choices'][0]['text'].strip()
+                    else:
+                        self.quota.note_response('together', response.status, response.headers.get('Retry-After'))
+                        await raise_if_retryable(response, 'Together')
+                        logger.warning(f"Together API error: {response.status}")
+                        return None
+        except RetryableError:
+            raise
+        except Exception as e:
+            logger.error(f"Together API error: {e}")
+            return None
+
+    async def stream_groq_response(self, user_input: str):
+        """Stream response tokens from Groq as they are generated."""
+        headers = {
+            'Authorization': f"Bearer {self.config['groq_api_key']}",
+            'Content-Type': 'application/json'
+        }
+        payload = {
+            "model": "llama2-70b-4096",
+            "messages": [
+                {"role": "system", "content": self.system_prompt(user_input)},
+                {"role": "user", "content": user_input}
+            ],
+            "max_tokens": 150,
+            "temperature": 0.7,
+            "stream": True
+        }
+        
+        async with aiohttp.ClientSession() as session:
+            async with session.post(self.ai_services['groq'], headers=headers, json=payload, timeout=time_left(10)) as response:
+                if response.status != 200:
+                    self.quota.note_response('groq', response.status, response.headers.get('Retry-After'))
+                    await raise_if_retryable(response, 'Groq')
+                    logger.warning(f"Groq API error: {response.status}")
+                    return
+                async for line in response.content:
+                    line = line.decode('utf-8').strip()
+                    if not line.startswith('data:') or line == 'data: [DONE]':
+                        continue
+                    delta = json.loads(line[5:])['choices'][0]['delta']
+                    if delta.get('content'):
+                        yield delta['content']
+
+    async def stream_ollama_response(self, user_input: str):
+        """Stream response tokens from the local Ollama instance."""
+        payload = {
+            "model": "llama2",
+            "prompt": f"{self.system_prompt(user_input)}\nUser: {user_input}\nJarvis:",
+            "stream": True
+        }
+        
+        async with aiohttp.ClientSession() as session:
+            async with session.post(self.ai_services['ollama'], json=payload, timeout=time_left(30)) as response:
+                if response.status != 200:
+                    await raise_if_retryable(response, 'Ollama')
+                    logger.warning(f"Ollama not available: {response.status}")
+                    return
+                async for line in response.content:
+                    if line.strip():
+                        chunk = json.loads(line)
+                        if chunk.get('response'):
+                            yield chunk['response']
+
+    async def stream_backend(self, service: str, user_input: str, outcome: Optional[Dict] = None):
+        """Stream tokens from one AI service under the same quota, retry and bookkeeping as call_backend.
+
+        Only a failure before the first token is retried; a stream that
+        breaks later keeps what it produced. ``outcome`` gets 'attempted'
+        once a request was charged to the service, and 'completed' when
+        the stream ran to its end.
+        """
+        streams = {'groq': self.stream_groq_response, 'ollama': self.stream_ollama_response}
+        if service not in streams or (service == 'groq' and not self.config.get('groq_api_key')):
+            return
+        if expired(f'backend.{service}'):
+            return
+        if not self.quota.acquire(service):
+            logger.info(f"Skipping {service}: over quota or backing off")
+            ai_requests.inc(backend=service, outcome='throttled')
+            return
+        if outcome is not None:
+            outcome['attempted'] = True
+        
+        started = time.perf_counter()
+        produced = False
+        try:
+            async for token in self.retry_policy.stream_async(service, streams[service], user_input):
+                produced = True
+                yield token
+            if outcome is not None:
+                outcome['completed'] = True
+        except RetryableError as e:
+            logger.warning(f"{service} failed after retries: {e}")
+        except Exception as e:
+            logger.error(f"Streaming {service} error: {e}")
+        finally:
+            elapsed = time.perf_counter() - started
+            record_backend_call(service, elapsed, produced)
+            self.router.record(service, elapsed, produced)
+
+    @coalesced('ai-stream')
+    async def stream_sentences(self, user_input: str, cacheable: bool = True):
+        """Sentences of the answer as they are generated; concurrent identical prompts share one stream."""
+        cacheable = cacheable and self.is_cacheable(user_input)
+        cached = self.response_cache.get(user_input) if cacheable else None
+        if cached is not None:
+            for sentence in split_sentences(cached):
+                yield sentence
+            return
+        
+        service = self.backend_order()[0]
+        outcome = {}
+        sentences = []
+        buffer = SentenceBuffer()
+        async for token in self.stream_backend(service, user_input, outcome):
+            for sentence in buffer.feed(token):
+                sentences.append(sentence)
+                yield sentence
+        tail = buffer.flush()
+        if tail:
+            sentences.append(tail)
+            yield tail
+        
+        if sentences:
+            # A stream cut off partway is spoken but never cached
+            if cacheable and outcome.get('completed'):
+                self.response_cache.put(user_input, " ".join(sentences))
+            return
+        
+        # Non-streaming services and failed streams go through the normal
+        # fallback chain, minus a service that was already called and billed
+        skip = (service,) if outcome.get('attempted') else ()
+        response = await self.generate_response(user_input, cacheable, skip)
+        for sentence in split_sentences(response):
+            yield sentence
+
+    async def stream_ai_response(self, user_input: str, context: str = "", cacheable: bool = True):
+        """Yield the AI response a sentence at a time, streaming when the service supports it."""
+        sentences = []
+        async for sentence in self.stream_sentences(user_input, cacheable):
+            sentences.append(sentence)
+            yield sentence
+        if sentences:
+            self.remember_exchange(user_input, " ".join(sentences))
+
+    def is_cacheable(self, user_input: str) -> bool:
+        """Answers grounded in notes are not cached, since the notes may change.
+
+        Uses the same score cutoff as system_prompt, so a request is only
+        kept out of the cache when notes would actually be added to it.
+        """
+        return not self.notes_index.search(user_input, k=1, min_score=self.config.get('notes_min_score', 0.5))
+
+    def available_backends(self) -> List[str]:
+        """AI services that can be called with the current configuration."""
+        backends = ['huggingface', 'ollama']
+        if self.config.get('groq_api_key'):
+            backends.append('groq')
+        if self.config.get('together_api_key'):
+            backends.append('together')
+        return backends
+
+    def backend_order(self) -> List[str]:
+        """Primary service followed by the fallback chain."""
+        ai_service = self.config.get('ai_service', 'huggingface')
+        if ai_service == 'auto':
+            return self.router.rank(self.available_backends())
+        
+        fallbacks = [b for b in ('huggingface', 'ollama', 'groq', 'together') if b != ai_service]
+        return [ai_service] + fallbacks
+
+    async def call_backend(self, service: str, user_input: str) -> Optional[str]:
+        """Call one AI service, recording its latency and outcome."""
+        if service in ('groq', 'together') and not self.config.get(f'{service}_api_key'):
+            return None
+        
+        if expired(f'backend.{service}'):
+            return None
+        if not self.quota.acquire(service):
+            logger.info(f"Skipping {service}: over quota or backing off")
+            ai_requests.inc(backend=service, outcome='throttled')
+            return None
+        
+        started = time.perf_counter()
+        response = None
+        try:
+            if service == 'groq':
                 response = await self.get_groq_response(user_input)
+            elif service == 'together':
+                response = await self.get_together_response(user_input)
+            elif service == 'ollama':
+                # requests and the retry backoff block, so keep them off the shared event loop
+                response = await asyncio.to_thread(self.get_ollama_response, user_input)
+            else:  # Default to Hugging Face
+                response = await self.get_huggingface_response(user_input)
+        except Exception as e:
+            logger.error(f"AI service error: {e}")
+        elapsed = time.perf_counter() - started
+        record_backend_call(service, elapsed, bool(response))
+        self.router.record(service, elapsed, bool(response))
+        return response
+
+    @coalesced('ai')
+    async def generate_response(self, user_input: str, cacheable: bool = True, skip: Tuple[str, ...] = ()) -> str:
+        """Run the backend chain once for concurrent identical prompts; services in ``skip`` are left out."""
+        # Reworded repeats of an earlier question are answered locally
+        cacheable = cacheable and self.is_cacheable(user_input)
+        response = self.response_cache.get(user_input) if cacheable else None
+        if response is not None:
+            return response
+        
+        # Try different AI services in order of preference
+        order = [service for service in self.backend_order() if service not in skip]
+        depth = len(order)
+        for attempt, service in enumerate(order):
+            response = await self.call_backend(service, user_input)
+            if response:
+                depth = attempt
+                break
         
         # Final fallback to rule-based responses
-        if not response:
+        if response:
+            if cacheable:
+                self.response_cache.put(user_input, response)
+        else:
             response = self.get_fallback_response(user_input)
-        
-        # Update conversation history
+        ai_fallback_depth.observe(depth)
+        return response
+
+    async def get_ai_response(self, user_input: str, context: str = "", cacheable: bool = True) -> str:
+        """Get intelligent response using available free AI services.
+
+        Fixed prompts that should get a fresh answer each time (a joke, a
+        goodbye) pass ``cacheable=False``.
+        """
+        response = await self.generate_response(user_input, cacheable)
+        self.remember_exchange(user_input, response)
+        return response
+
+    def remember_exchange(self, user_input: str, response: str):
+        """Add a turn to the conversation history."""
         self.conversation_history.append({"role": "user", "content": user_input})
         self.conversation_history.append({"role": "assistant", "content": response})
         
         # Keep history manageable
         if len(self.conversation_history) > self.config['max_conversation_history'] * 2:
             self.conversation_history = self.conversation_history[-self.config['max_conversation_history']:]
-        
-        return response
 
     def get_fallback_response(self, user_input: str) -> str:
         """Enhanced fallback responses with pattern matching."""
@@ -342,111 +784,239 @@ class FreeAIAssistant:
         ]
         return random.choice(responses)
 
+    @coalesced('weather')
     def get_weather(self, city: str = "") -> str:
         """Get weather information using free OpenWeatherMap API."""
         if not self.config.get('weather_api_key'):
             return "Weather API not configured. You can get a free API key from OpenWeatherMap."
         
         try:
-            if not city:
-                city = "current location"
-            
-            api_key = self.config['weather_api_key']
-            url = f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={api_key}&units=metric"
-            
-            response = requests.get(url, timeout=10)
-            data = response.json()
-            
-            if response.status_code == 200:
-                temp = data['main']['temp']
-                feels_like = data['main']['feels_like']
-                humidity = data['main']['humidity']
-                description = data['weather'][0]['description']
-                city_name = data['name']
-                
-                return f"Weather in {city_name}: {description.title()}, {temp}°C (feels like {feels_like}°C), humidity {humidity}%"
-            else:
-                return f"Couldn't get weather for {city}. {data.get('message', 'Unknown error')}"
-                
+            return self.fetch_weather(city or "current location")
+        except SourceError as e:
+            return str(e)
         except Exception as e:
             return f"Weather service unavailable: {e}"
 
+    def fetch_weather(self, city: str) -> str:
+        """Weather summary for a city; raises when the service can't provide one."""
+        if not self.quota.acquire('weather', max_wait=2.0):
+            raise SourceError("Weather lookups are paused to stay within the free tier. Try again later.")
+        
+        api_key = self.config['weather_api_key']
+        url = f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={api_key}&units=metric"
+        
+        response = requests.get(url, timeout=time_left(10))
+        data = response.json()
+        self.quota.note_response('weather', response.status_code, response.headers.get('Retry-After'))
+        
+        if response.status_code != 200:
+            raise SourceError(f"Couldn't get weather for {city}. {data.get('message', 'Unknown error')}")
+        
+        temp = data['main']['temp']
+        feels_like = data['main']['feels_like']
+        humidity = data['main']['humidity']
+        description = data['weather'][0]['description']
+        city_name = data['name']
+        
+        return f"Weather in {city_name}: {description.title()}, {temp}°C (feels like {feels_like}°C), humidity {humidity}%"
+
     def get_news(self, topic: str = "technology") -> List[str]:
         """Get latest news using free NewsAPI."""
         if not self.config.get('news_api_key'):
             return ["News API not configured. You can get a free API key from NewsAPI.org"]
         
         try:
-            api_key = self.config['news_api_key']
-            url = f"https://newsapi.org/v2/everything?q={topic}&sortBy=publishedAt&pageSize=3&apiKey={api_key}"
-            
-            response = requests.get(url, timeout=10)
-            data = response.json()
-            
-            if response.status_code == 200:
-                articles = data['articles']
-                news_items = []
-                
-                for article in articles[:3]:
-                    title = article['title']
-                    source = article['source']['name']
-                    news_items.append(f"{title} - {source}")
-                
-                return news_items
-            else:
-                return ["Couldn't fetch news right now."]
-                
+            return self.fetch_news(topic)
+        except SourceError as e:
+            return [str(e)]
         except Exception as e:
             return [f"News service error: {e}"]
 
+    @coalesced('news')
+    def fetch_news(self, topic: str) -> List[str]:
+        """Up to three headlines on a topic; raises when the service can't provide them."""
+        if not self.quota.acquire('news', max_wait=2.0):
+            raise SourceError("News lookups are paused to stay within the free tier. Try again later.")
+        
+        api_key = self.config['news_api_key']
+        url = f"https://newsapi.org/v2/everything?q={topic}&sortBy=publishedAt&pageSize=3&apiKey={api_key}"
+        
+        response = requests.get(url, timeout=time_left(10))
+        data = response.json()
+        self.quota.note_response('news', response.status_code, response.headers.get('Retry-After'))
+        
+        if response.status_code != 200:
+            raise SourceError("Couldn't fetch news right now.")
+        
+        news_items = []
+        for article in data['articles'][:3]:
+            title = article['title']
+            source = article['source']['name']
+            news_items.append(f"{title} - {source}")
+        
+        return news_items
+
     def get_stock_price(self, symbol: str) -> str:
         """Get stock price using free yfinance library."""
         try:
-            stock = yf.Ticker(symbol.upper())
-            info = stock.info
-            current_price = info.get('currentPrice', 'N/A')
-            company_name = info.get('longName', symbol.upper())
-            
-            return f"{company_name} ({symbol.upper()}) is currently at ${current_price}"
+            return self.fetch_stock_price(symbol)
         except Exception as e:
             return f"Couldn't get stock info for {symbol}: {e}"
 
-    def search_web_enhanced(self, query: str) -> str:
-        """Enhanced web search with AI summarization."""
+    @coalesced('stock_quote')
+    def fetch_stock_price(self, symbol: str) -> str:
+        """Current quote for a symbol; raises when no price is available."""
+        stock = yf.Ticker(symbol.upper())
+        info = stock.info
+        current_price = info.get('currentPrice')
+        if current_price is None:
+            raise SourceError("no current price")
+        company_name = info.get('longName', symbol.upper())
+        
+        return f"{company_name} ({symbol.upper()}) is currently at ${current_price}"
+
+    def get_stock_trend(self, symbols: List[str], period: str = "month") -> List[str]:
+        """Summarize recent performance of one or more stocks from cached history."""
         try:
-            search_url = f"https://www.google.com/search?q={query.replace(' ', '+')}"
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
+            return self.price_history.summarize(symbols, period)
+        except Exception as e:
+            logger.error(f"Stock trend error: {e}")
+            return [f"Couldn't analyze stock history for {', '.join(symbols)}: {e}"]
+
+    async def _search_and_summarize(self, query: str, emit) -> str:
+        """Run the search pipeline and stream an AI summary through ``emit``."""
+        try:
+            results = await self.search_pipeline.search(query)
             
-            response = requests.get(search_url, headers=headers, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            if results.get('summary'):
+                emit(results['summary'])
+                return results['summary']
             
-            # Extract search results
-            results = []
-            for result in soup.find_all('div', class_='BNeawe')[:3]:
-                text = result.get_text().strip()
-                if text and len(text) > 10:
-                    results.append(text)
+            sources = results['snippets'][:2] + [page['text'] for page in results['pages']]
+            if not sources:
+                webbrowser.open(results['url'])
+                message = f"Opened web search for {query}"
+                emit(message)
+                return message
             
-            if results:
-                # Try to get AI summary of results
-                summary_prompt = f"Summarize this information about '{query}': {' '.join(results[:2])}"
-                try:
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    summary = loop.run_until_complete(self.get_ai_response(summary_prompt, "web_search"))
-                    loop.close()
-                    return summary
-                except:
-                    return f"Found: {results[0]}"
-            else:
-                webbrowser.open(search_url)
-                return f"Opened web search for {query}"
-                
+            summary_prompt = f"Summarize this information about '{query}': {' '.join(sources)[:2000]}"
+            sentences = []
+            try:
+                async for sentence in self.stream_ai_response(summary_prompt, "web_search"):
+                    sentences.append(sentence)
+                    emit(sentence)
+            except Exception as e:
+                logger.error(f"Search summary error: {e}")
+            
+            if not sentences:
+                message = f"Found: {sources[0][:300]}"
+                emit(message)
+                return message
+            
+            summary = " ".join(sentences)
+            results['summary'] = summary
+            return summary
+        finally:
+            emit(None)
+
+    def search_web_enhanced(self, query: str, on_sentence=None) -> str:
+        """Enhanced web search with AI summarization.
+        
+        Result pages are fetched concurrently on the shared event loop and the
+        summary is handed to ``on_sentence`` sentence by sentence as it streams.
+        """
+        sentences = queue.Queue()
+        try:
+            future = self.async_runner.submit(self._search_and_summarize(query, sentences.put))
+            while True:
+                sentence = sentences.get()
+                if sentence is None:
+                    break
+                if on_sentence:
+                    on_sentence(sentence)
+            return future.result()
         except Exception as e:
-            webbrowser.open(f"https://www.google.com/search?q={query.replace(' ', '+')}")
-            return f"Opened browser search for {query}"
+            logger.error(f"Web search error: {e}")
+            webbrowser.open(search_url(query))
+            message = f"Opened browser search for {query}"
+            if on_sentence:
+                on_sentence(message)
+            return message
+
+    def load_reminders(self) -> List[Dict]:
+        """Pending reminders, soonest first."""
+        return self.reminders.pending()
+
+    def set_reminder(self, command: str) -> str:
+        """Schedule a reminder from a command like "remind me to call mom at 5pm"."""
+        parsed = parse_reminder(command)
+        if parsed is None:
+            return "When should I remind you? Try something like 'remind me to call mom in 20 minutes'."
+        due, task = parsed
+        self.reminders.add(task, due)
+        return f"Okay, I'll remind you {describe_due(due)}: {task}."
+
+    def describe_reminders(self) -> List[str]:
+        """Spoken summary of pending reminders."""
+        pending = self.reminders.pending()
+        if not pending:
+            return ["You don't have any reminders set."]
+        lines = [f"You have {len(pending)} reminder{'s' if len(pending) != 1 else ''}:"]
+        for reminder in pending[:5]:
+            due = datetime.datetime.fromisoformat(reminder['due'])
+            lines.append(f"Number {reminder['id']}, {reminder['text']}, {describe_due(due)}.")
+        return lines
+
+    def announce_reminder(self, reminder: Dict):
+        """Speak a reminder when it comes due."""
+        if reminder.get('missed'):
+            due = datetime.datetime.fromisoformat(reminder['due'])
+            self.speak(f"You missed a reminder from {due.strftime('%I:%M %p').lstrip('0')}: {reminder['text']}", "informative")
+        else:
+            self.speak(f"Reminder: {reminder['text']}", "informative")
+
+    def get_daily_briefing(self) -> List[str]:
+        """Fetch weather, news, quotes, notes and reminders concurrently.
+
+        Sources raise when they can't be reached, so they are listed as
+        failed instead of reading out an error message; services without an
+        API key are left out.
+        """
+        sources = {}
+        if self.config.get('weather_api_key'):
+            sources['weather'] = lambda: self.fetch_weather(self.config.get('home_city', '') or "current location")
+        if self.config.get('news_api_key'):
+            sources['news'] = lambda: self.fetch_news('general')
+        sources['notes'] = lambda: self.notes[-3:]
+        sources['reminders'] = self.load_reminders
+        for symbol in self.config.get('stock_watchlist', []):
+            sources[f"stock {symbol.upper()}"] = lambda symbol=symbol: self.fetch_stock_price(symbol)
+        
+        results, late, failed = self.fan_out.gather(sources, time_left(self.config.get('briefing_timeout', 8)))
+        
+        lines = [f"Good {self.get_time_period()}! Here's your briefing."]
+        if 'weather' in results:
+            lines.append(results['weather'])
+        if results.get('news'):
+            lines.append("Top headlines: " + "; ".join(results['news']) + ".")
+        
+        quotes = [results[name] for name in sources if name.startswith('stock ') and name in results]
+        if quotes:
+            lines.append(" ".join(quotes))
+        
+        if results.get('notes'):
+            lines.append("Your recent notes: " + "; ".join(note['text'] for note in results['notes']) + ".")
+        
+        today = datetime.date.today().isoformat()
+        due_today = [r for r in results.get('reminders', []) if str(r.get('due', '')).startswith(today)]
+        if due_today:
+            lines.append("Reminders for today: " + "; ".join(r['text'] for r in due_today) + ".")
+        
+        if late:
+            lines.append(f"Still waiting on {', '.join(late)}, so I skipped them.")
+        if failed:
+            lines.append(f"Couldn't reach {', '.join(failed)}.")
+        return lines
 
     def get_time_period(self) -> str:
         """Get current time period for context."""
@@ -464,7 +1034,9 @@ class FreeAIAssistant:
         """Load notes from JSON file."""
         try:
             with open(self.notes_file, 'r') as f:
-                return json.load(f)
+                notes = json.load(f)
+            note_ops.inc(op='load')
+            return notes
         except FileNotFoundError:
             return []
 
@@ -472,6 +1044,7 @@ class FreeAIAssistant:
         """Save notes to JSON file."""
         with open(self.notes_file, 'w') as f:
             json.dump(self.notes, f, indent=2)
+        note_ops.inc(op='save')
 
     def add_note(self, note_text):
         """Add a new note with timestamp."""
@@ -481,18 +1054,51 @@ class FreeAIAssistant:
             "id": len(self.notes) + 1
         }
         self.notes.append(note)
+        self.notes_index.add(note)
+        note_ops.inc(op='add')
         self.save_notes()
         return f"Note saved: {note_text}"
 
     def process_enhanced_command(self, command: str) -> bool:
         """Process commands with AI enhancement."""
-        command = command.lower().strip()
+        with deadline_scope(self.config.get('command_deadline')):
+            return self._route_enhanced_command(command)
+
+    def _route_enhanced_command(self, command: str) -> bool:
+        original = command.strip()  # Capitals mark ticker symbols
+        command = original.lower()
         
         # Update context
         self.current_context['last_command'] = command
+        trend_query = parse_trend_query(original, self.config.get('stock_watchlist', []))
+        
+        # Stock performance over a period
+        if trend_query:
+            symbols, period = trend_query
+            for summary in self.get_stock_trend(symbols, period):
+                self.speak(summary, "informative")
+        
+        # Reminders
+        elif REMINDER_PATTERN.search(command):
+            self.speak(self.set_reminder(command), "helpful")
+        
+        elif 'reminder' in command:
+            number = re.search(r'\d+', command)
+            if number and any(word in command for word in ['cancel', 'delete', 'remove']):
+                if self.reminders.cancel(int(number.group())):
+                    self.speak(f"Reminder {number.group()} cancelled.", "helpful")
+                else:
+                    self.speak(f"I couldn't find reminder {number.group()}.", "apologetic")
+            else:
+                for line in self.describe_reminders():
+                    self.speak(line, "informative")
+        
+        # Daily briefing from all info sources at once
+        elif any(phrase in command for phrase in ['briefing', 'brief me', 'daily update']):
+            self.speak(" ".join(self.get_daily_briefing()), "informative")
         
         # AI-powered general conversation
-        if any(word in command for word in ['how are you', 'what do you think', 'tell me about', 'explain', 'why', 'what if', 'chat']):
+        elif any(word in command for word in ['how are you', 'what do you think', 'tell me about', 'explain', 'why', 'what if', 'chat']):
             try:
                 loop = asyncio.new_event_loop()
                 asyncio.set_event_loop(loop)
@@ -542,8 +1148,7 @@ class FreeAIAssistant:
         elif 'search for' in command or 'search' in command:
             query = command.replace('search for', '').replace('search', '').strip()
             if query:
-                result = self.search_web_enhanced(query)
-                self.speak(result, "informative")
+                self.search_web_enhanced(query, on_sentence=lambda sentence: self.speak(sentence, "informative"))
             else:
                 self.speak("What would you like me to search for?", "questioning")
         
@@ -595,7 +1200,7 @@ class FreeAIAssistant:
             try:
                 loop = asyncio.new_event_loop()
                 asyncio.set_event_loop(loop)
-                joke_response = loop.run_until_complete(self.get_ai_response("Tell me a clever, witty joke", "entertainment"))
+                joke_response = loop.run_until_complete(self.get_ai_response("Tell me a clever, witty joke", "entertainment", cacheable=False))
                 loop.close()
                 self.speak(joke_response, "humorous")
             except:
@@ -611,7 +1216,7 @@ class FreeAIAssistant:
             try:
                 loop = asyncio.new_event_loop()
                 asyncio.set_event_loop(loop)
-                farewell_response = loop.run_until_complete(self.get_ai_response("Generate a friendly goodbye message", "farewell"))
+                farewell_response = loop.run_until_complete(self.get_ai_response("Generate a friendly goodbye message", "farewell", cacheable=False))
                 loop.close()
                 self.speak(farewell_response, "warm")
             except:
@@ -623,6 +1228,7 @@ class FreeAIAssistant:
             help_text = """I'm your enhanced AI assistant powered by free AI services! I can help with:
             - Intelligent conversations and questions
             - Weather, news, and stock information
+            - Daily briefings and stock trends
             - Web searches with AI summaries
             - Wikipedia lookups
             - Notes and reminders
@@ -647,7 +1253,7 @@ class FreeAIAssistant:
     def run_enhanced_mode(self):
         """Run the enhanced assistant with free AI capabilities."""
         print("\n🚀 Enhanced Free AI Assistant")
-        print("Say 'Jarvis' to wake me up, then give your command.")
+        print("Say 'Jarvis' followed by your command, or just 'Jarvis' and wait for the prompt.")
         print("I'm powered by free AI services and can handle complex conversations!")
         print("Say 'quit' or 'exit' to stop.\n")
         
@@ -658,12 +1264,16 @@ class FreeAIAssistant:
                 if command is None:
                     continue
                 
-                if self.config['wake_word'] in command:
-                    self.speak("Yes? I'm listening.", "attentive")
-                    
-                    command = self.listen(timeout=15)
-                    if command:
-                        if not self.process_enhanced_command(command):
+                remainder = split_wake_word(command, self.config['wake_word'], self.config['wake_word_aliases'])
+                if remainder is not None:
+                    if is_stop_request(remainder):
+                        continue
+                    if not remainder:
+                        self.speak("Yes? I'm listening.", "attentive")
+                        # Only live audio; the buffer holds the prompt we just spoke
+                        remainder = self.listen(timeout=15, pre_roll=0)
+                    if remainder:
+                        if not self.process_enhanced_command(remainder):
                             break
                 
                 elif any(word in command for word in ['quit', 'exit', 'goodbye']):
@@ -701,6 +1311,7 @@ class FreeAIAssistant:
 
     def run(self, mode='voice'):
         """Run the enhanced assistant."""
+        self.reminders.start()
         if mode == 'text':
             self.run_text_mode()
         else:
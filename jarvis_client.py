@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Thin client for Enhanced Jarvis
+Sends commands to a running 'python run.py --daemon' and prints the replies as they stream in
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path for imports; only the standard-library socket code is loaded
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.utils.daemon import send_command
+
+
+def run(command, socket_path):
+    """Send one command and print its replies; returns False if the assistant said goodbye."""
+    for message in send_command(command, socket_path):
+        if 'reply' in message:
+            print(f"🗣️ Jarvis: {message['reply']}", flush=True)
+        elif message.get('error'):
+            print(f"❌ {message['error']}", file=sys.stderr)
+        elif message.get('done'):
+            return message.get('continue', True)
+    return True
+
+
+def main():
+    args = sys.argv[1:]
+    if '--help' in args or '-h' in args:
+        print("Usage: python jarvis_client.py [--socket PATH] COMMAND...")
+        print("       python jarvis_client.py [--socket PATH] < commands.txt")
+        print("       python jarvis_client.py [--socket PATH] --ping | --stop")
+        return 0
+
+    socket_path = None
+    if '--socket' in args:
+        index = args.index('--socket')
+        socket_path = args[index + 1]
+        del args[index:index + 2]
+
+    try:
+        if '--ping' in args or '--stop' in args:
+            op = 'ping' if '--ping' in args else 'shutdown'
+            for _ in send_command('', socket_path, timeout=5, op=op):
+                pass
+            print("Daemon is running." if op == 'ping' else "Daemon stopped.")
+        elif args:
+            run(" ".join(args), socket_path)
+        else:
+            # One command per line from stdin, e.g. a hotkey script or pipe
+            for line in sys.stdin:
+                if line.strip() and not run(line.strip(), socket_path):
+                    break
+    except ConnectionError as e:
+        print(f"❌ {e}. Start it with: python run.py --daemon", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -18,8 +18,12 @@ import threading
 import re
 import webbrowser
 import random
+import itertools
 from pathlib import Path
 
+from file_index import FileIndex, most_recent, scan
+from file_reader import is_binary, resolve, search, sentences, tail
+
 class JarvisAssistant:
     def __init__(self):
         """Initialize the Jarvis Assistant with all necessary components."""
@@ -39,6 +43,11 @@ class JarvisAssistant:
         # Load notes
         self.notes = self.load_notes()
         
+        # File names are indexed in the background for "find file" commands
+        self.file_index = FileIndex(self.config['file_index_roots'], self.config['file_index_refresh'])
+        self.file_index.start()
+        self.reader = None  # Sentences still to be read from the file being read aloud
+        
         # Personality responses
         self.greetings = [
             "Hello! I'm Jarvis, your personal assistant. How can I help you today?",
@@ -65,7 +74,9 @@ class JarvisAssistant:
             "voice_volume": 0.9,
             "voice_id": 0,
             "wake_word": "jarvis",
-            "auto_listen": True
+            "auto_listen": True,
+            "file_index_roots": ["~"],
+            "file_index_refresh": 300
         }
         
         try:
@@ -272,24 +283,45 @@ class JarvisAssistant:
         self.speak(f"I've opened the weather forecast for {city} in your browser.")
 
     def list_files(self, directory="."):
-        """List files in a directory."""
+        """List the most recently modified files in a directory."""
         try:
-            files = os.listdir(directory)
-            if not files:
+            # Streams the directory and keeps only the newest 10, so huge folders stay cheap
+            total, recent = most_recent(scan(os.path.expanduser(directory)), 10)
+            if not total:
                 self.speak(f"The directory {directory} is empty.")
                 return
             
-            self.speak(f"Here are the files in {directory}:")
-            for file in files[:10]:  # Limit to first 10 files
-                self.speak(file)
+            self.speak(f"Here are the most recent files in {directory}:")
+            for entry in recent:
+                self.speak(entry.name)
             
-            if len(files) > 10:
-                self.speak(f"And {len(files) - 10} more files.")
+            if total > 10:
+                self.speak(f"And {total - 10} more files.")
                 
         except Exception as e:
             self.speak(f"Sorry, I couldn't access that directory.")
             print(f"Error: {e}")
 
+    def find_file(self, name):
+        """Find files by approximate name in the background index."""
+        matches = self.file_index.find(name, limit=3)
+        if not matches:
+            if self.file_index.ready:
+                self.speak(f"I couldn't find a file called {name}.")
+            else:
+                self.speak("I'm still indexing your files. Try again in a moment.")
+            return
+        
+        home = os.path.expanduser("~")
+        self.speak(f"I found {len(matches)} likely match{'es' if len(matches) > 1 else ''}:")
+        for path, score in matches:
+            folder = os.path.dirname(path)
+            if folder == home:
+                folder = "your home folder"
+            elif folder.startswith(home + os.sep):
+                folder = os.path.relpath(folder, home)
+            self.speak(f"{os.path.basename(path)} in {folder}")
+
     def create_file(self, filename, content=""):
         """Create a new file."""
         try:
@@ -301,29 +333,124 @@ class JarvisAssistant:
             print(f"Error: {e}")
 
     def read_file(self, filename):
-        """Read contents of a file."""
+        """Start reading a file aloud, one page of sentences at a time."""
+        path = resolve(filename)
+        if path is None:
+            self.speak(f"Sorry, I couldn't find the file {filename}")
+            return
+        
         try:
-            with open(filename, 'r') as f:
-                content = f.read()
+            if is_binary(path):
+                self.speak(f"{filename} doesn't look like a text file.")
+                return
             
-            if len(content) > 500:
-                self.speak(f"The file {filename} is quite long. Here's the beginning:")
-                self.speak(content[:500] + "...")
-            else:
-                self.speak(f"Contents of {filename}: {content}")
-                
-        except FileNotFoundError:
+            self.close_reader()
+            # Sentences are read from disk only as they are spoken
+            self.reader = sentences(path)
+            self.speak(f"Reading {os.path.basename(path)}:")
+            self.read_next_page()
+        except Exception as e:
+            self.speak(f"Sorry, I couldn't read the file {filename}")
+            print(f"Error: {e}")
+
+    def read_next_page(self, page_size=5):
+        """Speak the next few sentences of the file being read."""
+        if self.reader is None:
+            self.speak("I'm not reading a file right now. Say 'read file' and a file name.")
+            return
+        
+        spoken = 0
+        for sentence in itertools.islice(self.reader, page_size):
+            self.speak(sentence)
+            spoken += 1
+        
+        if spoken < page_size:
+            self.close_reader()
+            self.speak("That's the end of the file.")
+        else:
+            self.speak("Say 'continue reading' for more.")
+
+    def close_reader(self):
+        """Stop paging through the current file and close it."""
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
+
+    def read_file_end(self, filename):
+        """Read the last part of a file, e.g. the latest lines of a log."""
+        path = resolve(filename)
+        if path is None:
             self.speak(f"Sorry, I couldn't find the file {filename}")
+            return
+        
+        try:
+            text = tail(path)
+            if text:
+                self.speak(f"The end of {os.path.basename(path)}: {text}")
+            else:
+                self.speak(f"The file {filename} is empty.")
         except Exception as e:
             self.speak(f"Sorry, I couldn't read the file {filename}")
             print(f"Error: {e}")
 
+    def search_file(self, filename, phrase):
+        """Count matches of a phrase in a file and read a few of them in context."""
+        path = resolve(filename)
+        if path is None:
+            self.speak(f"Sorry, I couldn't find the file {filename}")
+            return
+        
+        try:
+            count, hits = search(path, phrase)
+            if not count:
+                self.speak(f"I didn't find {phrase} in {os.path.basename(path)}.")
+                return
+            
+            self.speak(f"I found {phrase} {count} time{'s' if count > 1 else ''} in {os.path.basename(path)}.")
+            for line, snippet in hits:
+                self.speak(f"Line {line}: {snippet}")
+            if count > len(hits):
+                self.speak(f"And {count - len(hits)} more.")
+        except Exception as e:
+            self.speak(f"Sorry, I couldn't search the file {filename}")
+            print(f"Error: {e}")
+
     def process_command(self, command):
         """Process and execute user commands."""
         command = command.lower().strip()
         
+        # File commands are checked first so names like 'timesheet' aren't taken for other commands
+        if 'find file' in command or 'find the file' in command:
+            name = re.sub(r'^.*?find (the )?file (called |named )?', '', command).strip()
+            if name:
+                self.find_file(name)
+            else:
+                self.speak("Which file should I look for?")
+        
+        elif re.search(r'\bfile .+ for ', command) and ('search' in command or 'look' in command):
+            match = re.search(r'file (.+?) for (.+)', command)
+            self.search_file(match.group(1).strip(), match.group(2).strip())
+        
+        elif re.search(r'(search for|find) .+ in (the )?file ', command):
+            match = re.search(r'(?:search for|find) (.+) in (?:the )?file (.+)', command)
+            self.search_file(match.group(2).strip(), match.group(1).strip())
+        
+        elif re.search(r'(end|tail|last part) of (the )?file ', command):
+            filename = re.sub(r'^.*?of (the )?file ', '', command).strip()
+            self.read_file_end(filename)
+        
+        elif 'read file' in command:
+            filename = command.split('read file', 1)[1].strip()
+            if filename:
+                self.read_file(filename)
+            else:
+                self.speak("Which file would you like me to read?")
+        
+        elif any(phrase in command for phrase in ['continue reading', 'keep reading', 'next page']):
+            self.read_next_page()
+        
         # Greeting responses
-        if any(word in command for word in ['hello', 'hi', 'hey', 'good morning', 'good afternoon']):
+        elif any(word in command for word in ['hello', 'hi', 'hey', 'good morning', 'good afternoon']):
             greeting = random.choice(self.greetings)
             self.speak(greeting)
         
@@ -377,13 +504,6 @@ class JarvisAssistant:
             else:
                 self.speak("What should I name the file?")
         
-        elif 'read file' in command:
-            filename = command.replace('read file', '').strip()
-            if filename:
-                self.read_file(filename)
-            else:
-                self.speak("Which file would you like me to read?")
-        
         # Weather
         elif 'weather' in command:
             city = command.replace('weather in', '').replace('weather', '').strip()
@@ -413,6 +533,9 @@ class JarvisAssistant:
             - Say 'tell me a joke' for entertainment
             - Say 'weather in New York' for weather info
             - Say 'list files' to see directory contents
+            - Say 'find file budget' to find a file by name
+            - Say 'read file log.txt', then 'continue reading' for more
+            - Say 'search file log.txt for error' to find a phrase in a file
             - Say 'create file test.txt' to create files
             - Say 'play music' to open music player"""
             self.speak(help_text)
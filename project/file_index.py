@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+File listing and file-name index for Jarvis.
+Streams directories with os.scandir and finds files by approximate name in the background.
+"""
+
+import os
+import re
+import heapq
+import threading
+
+SKIP_DIRS = {'node_modules', '__pycache__', 'venv', '.venv', 'site-packages', 'AppData', 'Library'}
+
+
+def scan(directory, recursive=False, skip_hidden=True):
+    """Yield os.DirEntry objects one at a time, without building the whole listing."""
+    stack = [directory]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if skip_hidden and entry.name.startswith('.'):
+                        continue
+                    yield entry
+                    if recursive and entry.name not in SKIP_DIRS and entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+        except (PermissionError, FileNotFoundError, NotADirectoryError):
+            if current == directory:
+                raise
+
+
+def _mtime(entry):
+    try:
+        return entry.stat(follow_symlinks=False).st_mtime
+    except OSError:
+        return 0
+
+
+def most_recent(entries, k=10):
+    """Return (number of files, newest k files) using a k-sized heap instead of sorting everything.
+
+    Directories and other non-files are skipped.
+    """
+    total = 0
+    heap = []  # (mtime, tiebreak, entry), smallest first
+    for entry in entries:
+        try:
+            if not entry.is_file(follow_symlinks=False):
+                continue
+        except OSError:
+            continue
+        total += 1
+        item = (_mtime(entry), total, entry)
+        if len(heap) < k:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+    return total, [entry for _, _, entry in sorted(heap, reverse=True)]
+
+
+def name_words(name):
+    """Split a file name into lowercase words: 'QuarterlyReport_2023.xlsx' -> quarterly, report, 2023, xlsx."""
+    name = re.sub(r'([a-z])([A-Z])', r'\1 \2', name)
+    return [word for word in re.split(r'[^a-zA-Z0-9]+', name.lower()) if word]
+
+
+def _trigrams(word):
+    padded = f' {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a, b):
+    """Dice coefficient of two words' trigrams; 1.0 for identical words."""
+    ta, tb = _trigrams(a), _trigrams(b)
+    return 2 * len(ta & tb) / (len(ta) + len(tb))
+
+
+class FileIndex:
+    """Background index of file names under some root directories.
+
+    Words of every file name map to the files containing them, and a
+    trigram index over that (much smaller) vocabulary finds words close to
+    a misheard one, so a query touches only plausible candidates rather
+    than every file. Refreshes are incremental: a directory whose mtime
+    has not changed since the last pass is not listed again.
+    """
+
+    def __init__(self, roots, refresh_interval=300, max_files=500000):
+        self.roots = [os.path.expanduser(root) for root in roots]
+        self.refresh_interval = refresh_interval
+        self.max_files = max_files
+        self.ready = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._files = {}       # path -> (name, mtime)
+        self._words = {}       # word -> set of paths
+        self._grams = {}       # trigram -> set of words
+        self._dirs = {}        # directory -> (mtime_ns, file paths, subdirectories)
+
+    def start(self):
+        """Build the index on a daemon thread and keep it up to date."""
+        threading.Thread(target=self._run, name='file-index', daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"File index error: {e}")
+            self.ready = True
+            if self._stop.wait(self.refresh_interval):
+                break
+
+    @property
+    def count(self):
+        return len(self._files)
+
+    def refresh(self):
+        """One incremental pass over the roots."""
+        seen = set()
+        stack = list(self.roots)
+        while stack and not self._stop.is_set():
+            directory = stack.pop()
+            seen.add(directory)
+            try:
+                stamp = os.stat(directory).st_mtime_ns
+            except OSError:
+                continue
+            cached = self._dirs.get(directory)
+            if cached and cached[0] == stamp:
+                stack.extend(cached[2])
+                continue
+
+            files, subdirs = {}, []
+            try:
+                for entry in scan(directory):
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in SKIP_DIRS:
+                            subdirs.append(entry.path)
+                    elif len(self._files) + len(files) < self.max_files:
+                        files[entry.path] = (entry.name, _mtime(entry))
+            except OSError:
+                continue
+            with self._lock:
+                old_paths = cached[1] if cached else set()
+                for path in old_paths - files.keys():
+                    self._remove(path)
+                for path, info in files.items():
+                    if path not in self._files:
+                        self._add(path, info)
+                    else:
+                        self._files[path] = info
+                self._dirs[directory] = (stamp, set(files), subdirs)
+            stack.extend(subdirs)
+
+        # Directories that disappeared since the last pass
+        if not self._stop.is_set():
+            with self._lock:
+                for directory in [d for d in self._dirs if d not in seen]:
+                    for path in self._dirs.pop(directory)[1]:
+                        self._remove(path)
+
+    def _add(self, path, info):
+        self._files[path] = info
+        for word in name_words(info[0]):
+            if word not in self._words:
+                self._words[word] = set()
+                for gram in _trigrams(word):
+                    self._grams.setdefault(gram, set()).add(word)
+            self._words[word].add(path)
+
+    def _remove(self, path):
+        info = self._files.pop(path, None)
+        if info is None:
+            return
+        for word in name_words(info[0]):
+            paths = self._words.get(word)
+            if paths is None:
+                continue
+            paths.discard(path)
+            if not paths:
+                # Forget words no file uses any more, so churn doesn't grow the maps
+                del self._words[word]
+                for gram in _trigrams(word):
+                    words = self._grams.get(gram)
+                    if words is not None:
+                        words.discard(word)
+                        if not words:
+                            del self._grams[gram]
+
+    def _close_words(self, word, cutoff=0.5):
+        """Indexed words resembling ``word``, with their similarity."""
+        counts = {}
+        for gram in _trigrams(word):
+            for candidate in self._grams.get(gram, ()):
+                counts[candidate] = counts.get(candidate, 0) + 1
+        needed = cutoff * len(_trigrams(word)) / 2
+        matches = {}
+        for candidate, shared in counts.items():
+            if shared >= needed and self._words.get(candidate):
+                score = 1.0 if candidate.startswith(word) else similarity(word, candidate)
+                if score >= cutoff:
+                    matches[candidate] = score
+        return matches
+
+    def find(self, query, limit=5):
+        """Best matching (path, score) pairs for a spoken file name, newest first among equals."""
+        words = name_words(query)
+        if not words:
+            return []
+        with self._lock:
+            scores = {}
+            for word in words:
+                best = {}
+                for candidate, score in self._close_words(word).items():
+                    for path in self._words[candidate]:
+                        if score > best.get(path, 0):
+                            best[path] = score
+                for path, score in best.items():
+                    scores[path] = scores.get(path, 0) + score
+            ranked = heapq.nlargest(limit, scores.items(),
+                                    key=lambda item: (item[1], self._files[item[0]][1]))
+        return [(path, score / len(words)) for path, score in ranked]
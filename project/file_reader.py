@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+File reading for Jarvis.
+Reads, searches and pages through files of any size without loading them into memory.
+"""
+
+import os
+import re
+import mmap
+import codecs
+
+CHUNK_SIZE = 1 << 20        # Bytes scanned at a time when searching
+PAGE_READ_SIZE = 64 * 1024  # Bytes read at a time when paging
+MAX_SENTENCE = 300          # Characters spoken as one sentence at most
+
+# Sentence punctuation, blank lines, or a line break not followed by a lowercase continuation
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+|\n\s*\n|\n(?=[^\sa-z])')
+_SPACE = re.compile(rb'\s')
+_LAST_SPACE = re.compile(rb'.*\s', re.DOTALL)
+
+
+def resolve(path):
+    """Find ``path`` even if its case was lost in speech recognition; None if missing."""
+    path = os.path.expanduser(path)
+    if os.path.exists(path):
+        return path
+    folder, name = os.path.split(path)
+    try:
+        with os.scandir(folder or '.') as entries:
+            for entry in entries:
+                if entry.name.lower() == name.lower():
+                    return entry.path
+    except OSError:
+        pass
+    return None
+
+
+def is_binary(path):
+    """True if the start of the file looks like binary data rather than text."""
+    with open(path, 'rb') as f:
+        return b'\0' in f.read(1024)
+
+
+def _trim_words(text, max_chars, from_end=False):
+    """Cut ``text`` to ``max_chars`` at a word boundary."""
+    text = text.strip()
+    if len(text) <= max_chars:
+        return text
+    if from_end:
+        text = text[-max_chars:]
+        return text.split(None, 1)[-1]
+    return text[:max_chars].rsplit(None, 1)[0]
+
+
+def head(path, max_chars=500):
+    """The first ``max_chars`` characters of a file, reading only that much."""
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        return _trim_words(f.read(max_chars + 1), max_chars)
+
+
+def tail(path, max_chars=500):
+    """The last ``max_chars`` characters of a file, reading only that much."""
+    with open(path, 'rb') as f:
+        size = f.seek(0, os.SEEK_END)
+        # UTF-8 needs at most 4 bytes a character
+        f.seek(max(0, size - max_chars * 4))
+        text = f.read().decode('utf-8', errors='replace').rstrip()
+    text = text[-max_chars:]
+    # Start at a line boundary if there is one, e.g. a whole log line
+    if '\n' in text and len(text) == max_chars:
+        return text.split('\n', 1)[1].strip()
+    return _trim_words(text, max_chars, from_end=len(text) == max_chars)
+
+
+def _case_pattern(phrase):
+    """Bytes regex for ``phrase`` in any case, non-ASCII letters included; also returns its longest match."""
+    parts, longest = [], 0
+    for char in phrase:
+        variants = sorted({v.encode('utf-8') for v in (char, char.lower(), char.upper())}, key=len, reverse=True)
+        parts.append(b'(?:' + b'|'.join(re.escape(v) for v in variants) + b')')
+        longest += len(variants[0])
+    return re.compile(b''.join(parts)), longest
+
+
+def _find_all(chunk, needle, pattern):
+    """(offset, length) of each match in a chunk."""
+    if pattern is not None:
+        for match in pattern.finditer(chunk):
+            yield match.start(), match.end() - match.start()
+        return
+    chunk = chunk.lower()
+    index = chunk.find(needle)
+    while index != -1:
+        yield index, len(needle)
+        index = chunk.find(needle, index + 1)
+
+
+def search(path, phrase, max_hits=3, context=80):
+    """Count case-insensitive matches of ``phrase`` and return (count, [(line, snippet), ...]).
+
+    The file is memory-mapped and scanned a chunk at a time, so only one
+    chunk is ever copied into memory whatever the file size. Each snippet
+    is the matching line, cut to ``context`` bytes either side. ASCII
+    phrases use a plain lowercase scan; others a regex over the UTF-8
+    spellings of each letter's cases, so "érror" finds "ÉRROR".
+    """
+    if not phrase or os.path.getsize(path) == 0:
+        return 0, []
+    needle = phrase.lower().encode('utf-8')
+    # bytes.lower() only folds ASCII, which is all an ASCII phrase needs
+    pattern, longest = (None, len(needle)) if phrase.isascii() else _case_pattern(phrase)
+    count, hits = 0, []
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        lines_before = 0
+        for start in range(0, len(mm), CHUNK_SIZE):
+            # Overlap chunks so a match straddling the boundary is still found,
+            # and count only matches starting in this chunk so none is found twice
+            chunk = mm[start:start + CHUNK_SIZE + longest - 1]
+            for index, length in _find_all(chunk, needle, pattern):
+                if index >= CHUNK_SIZE:
+                    break
+                count += 1
+                if len(hits) < max_hits:
+                    line = lines_before + chunk.count(b'\n', 0, index) + 1
+                    hits.append((line, _line_around(mm, start + index, length, context)))
+            lines_before += chunk.count(b'\n', 0, CHUNK_SIZE)
+            if hasattr(mm, 'madvise') and hasattr(mmap, 'MADV_DONTNEED'):
+                # Scanned pages are dropped from this process (not from the OS cache), keeping RSS flat
+                mm.madvise(mmap.MADV_DONTNEED, start, min(CHUNK_SIZE, len(mm) - start))
+    return count, hits
+
+
+def _line_around(mm, position, length, context):
+    """The line containing mm[position:position + length], at most ``context`` bytes either side."""
+    low = max(0, position - context)
+    high = min(len(mm), position + length + context)
+    line_start = mm.rfind(b'\n', low, position) + 1 or low
+    line_end = mm.find(b'\n', position + length, high)
+    snippet = mm[line_start:line_end if line_end != -1 else high]
+    match_end = position - line_start + length
+    # Drop words cut in half at a context edge, but never the one holding the match
+    if line_start == low and low > 0:
+        space = _SPACE.search(snippet, 0, position - line_start)
+        if space:
+            snippet, match_end = snippet[space.end():], match_end - space.end()
+    if line_end == -1 and high < len(mm):
+        tail = _LAST_SPACE.match(snippet, match_end)
+        if tail:
+            snippet = snippet[:tail.end()]
+    return ' '.join(snippet.decode('utf-8', errors='ignore').split())
+
+
+def sentences(path):
+    """Yield the file's sentences in order, reading it a block at a time."""
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    buffer = ''
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(PAGE_READ_SIZE)
+            buffer += decoder.decode(block, final=not block)
+            parts = _SENTENCE_END.split(buffer)
+            # The last part may continue in the next block, unless it is already too long to wait for
+            buffer = parts.pop() if block else ''
+            if len(buffer) > PAGE_READ_SIZE:
+                parts.append(buffer)
+                buffer = ''
+            for part in parts:
+                part = ' '.join(part.split())
+                while len(part) > MAX_SENTENCE:
+                    piece = _trim_words(part, MAX_SENTENCE)
+                    yield piece
+                    part = part[len(piece):].strip()
+                if part:
+                    yield part
+            if not block:
+                return
@@ -12,16 +12,11 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from src.assistant import Assistant
+from src.utils.log_pipeline import setup_logging
+from src.utils.tracing import tracer
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('jarvis.log')
-    ]
-)
+# Configure logging: callers only enqueue; JSON lines go to a rotating jarvis.log
+setup_logging('jarvis.log')
 
 logger = logging.getLogger(__name__)
 
@@ -46,12 +41,29 @@ Options:
   --text        Run in text-only mode (faster, no voice)
   --voice       Run in voice mode (default)
   --gui         Run with graphical interface (coming soon)
+  --trace [FILE]
+                Write per-turn latency spans to FILE (default: jarvis_trace.jsonl)
+  --daemon [--socket PATH]
+                Keep a warm assistant serving jarvis_client.py over a Unix socket
+  --batch FILE [--output PATH] [--concurrency N]
+                Run commands from a .txt or .jsonl file, writing JSONL results;
+                rerun the same command to resume after an interruption
+  --audio PATH  Take voice input from a WAV file or directory instead of the microphone
+  --speed X     Replay --audio at X times real time (default: 1)
   --help        Show this help message
 
 Examples:
   python run.py              # Voice mode
   python run.py --text       # Text mode
   python run.py --voice      # Explicit voice mode
+  python run.py --trace      # Voice mode with latency tracing
+  python run.py --audio recordings/ --speed 4   # Voice mode on recorded commands
+  python run.py --daemon     # Warm daemon; then: python jarvis_client.py "what time is it"
+  python run.py --batch nightly.jsonl --concurrency 8   # Nightly prompts to nightly.results.jsonl
+  python analyze_trace.py jarvis_trace.jsonl   # Per-stage percentiles
+  python benchmark.py notes                    # Notes retrieval latency
+  python benchmark.py vad                      # End-of-utterance detection delay
+  python benchmark.py voice --speed 4          # Voice loop on recorded commands
 
 Features:
   • AI-powered conversations using free services
@@ -78,6 +90,10 @@ def main():
         # Determine mode
         if '--text' in args:
             mode = 'text'
+        elif '--daemon' in args:
+            mode = 'daemon'
+        elif '--batch' in args:
+            mode = 'batch'
         elif '--gui' in args:
             mode = 'gui'
         else:
@@ -85,21 +101,45 @@ def main():
         
         print_banner()
         
+        if '--trace' in args:
+            index = args.index('--trace')
+            trace_path = 'jarvis_trace.jsonl'
+            if index + 1 < len(args) and not args[index + 1].startswith('--'):
+                trace_path = args[index + 1]
+            tracer.enable(trace_path)
+        
         if mode == 'gui':
             print("🚧 GUI mode coming soon! Using voice mode instead.")
             mode = 'voice'
         
+        overrides = {}
+        if '--audio' in args:
+            overrides['audio_input'] = args[args.index('--audio') + 1]
+            if '--speed' in args:
+                overrides['audio_input_speed'] = float(args[args.index('--speed') + 1])
+        if mode == 'batch':
+            overrides['tts_enabled'] = False  # Replies are captured into the results file
+        
         # Initialize and run assistant
         logger.info(f"Starting Enhanced Jarvis in {mode} mode")
-        assistant = Assistant()
+        assistant = Assistant(overrides=overrides)
         
         try:
             if mode == 'text':
                 assistant.run_text_mode()
+            elif mode == 'batch':
+                assistant.run_batch(
+                    args[args.index('--batch') + 1],
+                    args[args.index('--output') + 1] if '--output' in args else None,
+                    int(args[args.index('--concurrency') + 1]) if '--concurrency' in args else None
+                )
+            elif mode == 'daemon':
+                assistant.run_daemon(args[args.index('--socket') + 1] if '--socket' in args else None)
             else:
                 assistant.run_voice_mode()
         finally:
             assistant.shutdown()
+            tracer.close()
             
     except KeyboardInterrupt:
         print("\n\n👋 Shutting down Enhanced Jarvis Assistant. Goodbye!")
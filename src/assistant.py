@@ -5,6 +5,7 @@ Modular AI assistant with multiple service support and clean architecture
 """
 
 import os
+import re
 import json
 import datetime
 import asyncio
@@ -12,25 +13,61 @@ import requests
 import webbrowser
 import logging
 import random
+import time
+import threading
 from pathlib import Path
 from typing import Dict, List, Optional
 
 import aiohttp
 import wikipedia
 import yfinance as yf
-import speech_recognition as sr
 from bs4 import BeautifulSoup
 
-from src.utils.voice import Voice
+from src.utils.batch import BatchRunner, load_items
+from src.utils.config_service import ConfigService
+from src.utils.daemon import AssistantDaemon
+from src.utils.deadline import deadline_scope, expired, time_left
+from src.utils.notes_index import NotesIndex
+from src.utils.metrics import ai_fallback_depth, ai_requests, metrics, note_ops, record_backend_call
+from src.utils.quota import QuotaTracker
+from src.utils.reminders import REMINDER_PATTERN, ReminderScheduler, describe_due, parse_reminder
+from src.utils.replies import note_detail
+from src.utils.retry import RetryableError, RetryPolicy, raise_if_retryable, raise_if_retryable_sync
+from src.utils.router import BackendRouter
+from src.utils.semantic_cache import SemanticCache
+from src.utils.tracing import tracer
+from src.utils.voice import LOW, URGENT, Voice
+from src.utils.voice_pipeline import VoicePipeline
 
 logger = logging.getLogger(__name__)
 
 class Assistant:
-    def __init__(self, config_path='free_ai_config.json'):
-        """Initialize the enhanced assistant."""
-        self.config = self._load_config(config_path)
+    def __init__(self, config_path='free_ai_config.json', overrides: Optional[Dict] = None):
+        """Initialize the enhanced assistant; ``overrides`` replace config file values."""
+        # One shared dict, kept in step with the file as it is edited
+        self.config_service = ConfigService(config_path, self._default_config(), overrides)
+        self.config = self.config_service.config
+        metrics.start(self.config)
         self.voice = Voice(self.config)
+        self.router = BackendRouter(self.config, self.config.get('router_stats_file', 'router_stats.json'))
+        self.quota = QuotaTracker(self.config.get('provider_limits'), self.config.get('quota_state_file', 'quota_state.json'))
+        self.router.add_headroom_source(self.quota.headroom)
+        self.retry_policy = RetryPolicy(self.config, self.quota)
+        self.response_cache = SemanticCache(
+            self.config.get('semantic_cache_dir', 'semantic_cache'),
+            capacity=self.config.get('semantic_cache_size', 10000),
+            threshold=self.config.get('semantic_cache_threshold', 0.85),
+            ttl=self.config.get('semantic_cache_ttl', 86400)
+        )
         self.notes = self._load_notes()
+        self._notes_lock = threading.Lock()  # Daemon clients may add notes concurrently
+        self.notes_index = NotesIndex(self.notes)
+        self.reminders = ReminderScheduler(
+            self.config.get('reminders_file', 'reminders.jsonl'),
+            catch_up=self.config.get('reminder_catch_up_hours', 24) * 3600
+        )
+        self.reminders.add_listener(self._announce_reminder)
+        self.reminders.start()
         self.conversation_history = []
         
         # AI service endpoints
@@ -53,12 +90,24 @@ class Assistant:
             "Mission accomplished!", "Got it covered!"
         ]
         
+        startup_message = "Enhanced Jarvis online! Powered by free AI services and ready for action!"
+        
+        # Fixed phrases are rendered once and replayed without synthesis delay
+        self.voice.warm(
+            [("Yes? I'm listening.", 'attentive'), ("Goodbye!", 'warm'), (startup_message, 'excited')]
+            + [(text, 'accomplished') for text in self.confirmations]
+            + [(text, 'friendly') for text in self.greetings]
+        )
+        
+        self.config_service.subscribe(self._on_config_change)
+        self.config_service.start(self.config.get('config_poll_interval', 2.0))
+        
         logger.info("Assistant initialized successfully")
-        self.voice.speak("Enhanced Jarvis online! Powered by free AI services and ready for action!", 'excited')
+        self.voice.speak(startup_message, 'excited')
 
-    def _load_config(self, path: str) -> Dict:
-        """Load configuration with sensible defaults."""
-        default_config = {
+    def _default_config(self) -> Dict:
+        """Configuration defaults; the config file overrides any of them."""
+        return {
             "voice_rate": 200,
             "voice_volume": 0.9,
             "voice_id": 0,
@@ -71,25 +120,62 @@ class Assistant:
             "max_conversation_history": 10,
             "enable_learning": True,
             "personality_mode": "friendly",
-            "fallback_responses": True
+            "fallback_responses": True,
+            "metrics_file": "jarvis_metrics.prom",
+            "metrics_interval": 15,
+            "metrics_port": 0,
+            "router_policy": "latency",
+            "router_stats_file": "router_stats.json",
+            "quota_state_file": "quota_state.json",
+            "provider_limits": {},
+            "retry_max_attempts": 3,
+            "retry_base_delay": 0.5,
+            "retry_max_delay": 20.0,
+            "retry_budget": 15.0,
+            "command_deadline": 12.0,
+            "semantic_cache_dir": "semantic_cache",
+            "semantic_cache_size": 10000,
+            "semantic_cache_threshold": 0.85,
+            "semantic_cache_ttl": 86400,
+            "notes_context_notes": 3,
+            "notes_context_tokens": 200,
+            "notes_min_score": 0.5,
+            "reminders_file": "reminders.jsonl",
+            "reminder_catch_up_hours": 24,
+            "tts_cache_dir": "tts_cache",
+            "tts_cache_size": 64,
+            "tts_cache_min_repeats": 2,
+            "tts_coalesce_chars": 240,
+            "voice_pre_roll": 2.0,
+            "wake_word_aliases": [],
+            "vad_enabled": True,
+            "vad_aggressiveness": 1,
+            "voice_half_duplex": True,
+            "voice_echo_tail": 0.3,
+            "voice_queue_size": 3,
+            "voice_capture_policy": "block",
+            "voice_command_policy": "drop_oldest",
+            "voice_command_ttl": 20,
+            "audio_input": "",
+            "audio_input_speed": 1.0,
+            "daemon_socket": "",
+            "daemon_max_clients": 8,
+            "tts_enabled": True,
+            "batch_concurrency": 4,
+            "config_poll_interval": 2.0
         }
-        
-        try:
-            if os.path.exists(path):
-                with open(path, 'r') as f:
-                    user_config = json.load(f)
-                # Merge with defaults
-                config = {**default_config, **user_config}
-            else:
-                config = default_config
-                # Save default config
-                with open(path, 'w') as f:
-                    json.dump(config, f, indent=2)
-            
-            return config
-        except Exception as e:
-            logger.error(f"Config loading error: {e}")
-            return default_config
+
+    def _on_config_change(self, config: Dict, changed: set):
+        """Rebuild state derived from edited settings.
+
+        API keys, ai_service, router and retry settings, voice_rate and the
+        wake word are read on every use and need nothing here.
+        """
+        self.voice.reconfigure(changed)
+        self.response_cache.threshold = config.get('semantic_cache_threshold', 0.85)
+        self.response_cache.ttl = config.get('semantic_cache_ttl', 86400)
+        if 'provider_limits' in changed:
+            self.quota.set_limits(config.get('provider_limits'))
 
     def _load_notes(self) -> List[Dict]:
         """Load notes from JSON file."""
@@ -97,7 +183,9 @@ class Assistant:
         try:
             if os.path.exists(notes_file):
                 with open(notes_file, 'r') as f:
-                    return json.load(f)
+                    notes = json.load(f)
+                note_ops.inc(op='load')
+                return notes
         except Exception as e:
             logger.error(f"Notes loading error: {e}")
         return []
@@ -107,20 +195,54 @@ class Assistant:
         try:
             with open("notes.json", 'w') as f:
                 json.dump(self.notes, f, indent=2)
+            note_ops.inc(op='save')
         except Exception as e:
             logger.error(f"Notes saving error: {e}")
 
     def add_note(self, text: str):
         """Add a new note with timestamp."""
-        note = {
-            "text": text,
-            "timestamp": datetime.datetime.now().isoformat(),
-            "id": len(self.notes) + 1
-        }
-        self.notes.append(note)
-        self._save_notes()
+        with self._notes_lock:
+            note = {
+                "text": text,
+                "timestamp": datetime.datetime.now().isoformat(),
+                "id": len(self.notes) + 1
+            }
+            self.notes.append(note)
+            self.notes_index.add(note)
+            note_ops.inc(op='add')
+            self._save_notes()
         self.voice.speak(f"Note saved: {text}", 'accomplished')
 
+    def set_reminder(self, command: str):
+        """Schedule a reminder from a command like "remind me to call mom at 5pm"."""
+        parsed = parse_reminder(command)
+        if parsed is None:
+            self.voice.speak("When should I remind you? Try 'remind me to call mom in 20 minutes'.", 'questioning')
+            return
+        due, task = parsed
+        self.reminders.add(task, due)
+        self.voice.speak(f"Okay, I'll remind you {describe_due(due)}: {task}.", 'accomplished')
+
+    def read_reminders(self):
+        """Read pending reminders aloud."""
+        pending = self.reminders.pending()
+        if not pending:
+            self.voice.speak("You don't have any reminders set.", 'informative')
+            return
+        self.voice.speak(f"You have {len(pending)} reminder{'s' if len(pending) != 1 else ''}:", 'informative')
+        for reminder in pending[:5]:
+            due = datetime.datetime.fromisoformat(reminder['due'])
+            self.voice.speak(f"Number {reminder['id']}, {reminder['text']}, {describe_due(due)}.", 'neutral')
+
+    def _announce_reminder(self, reminder: Dict):
+        """Queue a reminder announcement when it comes due."""
+        if reminder.get('missed'):
+            due = datetime.datetime.fromisoformat(reminder['due'])
+            self.voice.speak(f"You missed a reminder from {due.strftime('%I:%M %p').lstrip('0')}: {reminder['text']}",
+                             'informative', URGENT)
+        else:
+            self.voice.speak(f"Reminder: {reminder['text']}", 'informative', URGENT)
+
     def read_notes(self):
         """Read recent notes aloud."""
         if not self.notes:
@@ -133,8 +255,28 @@ class Assistant:
             formatted_time = timestamp.strftime("%B %d at %I:%M %p")
             self.voice.speak(f"{note['text']} - saved on {formatted_time}", 'neutral')
 
+    async def _retry_async(self, name: str, request, prompt: str) -> Optional[str]:
+        """Run an async backend request under the retry policy."""
+        try:
+            return await self.retry_policy.call_async(name, request, prompt)
+        except RetryableError as e:
+            logger.warning(f"{name} failed after retries: {e}")
+            return None
+
+    def _retry_sync(self, name: str, request, prompt: str) -> Optional[str]:
+        """Run a blocking backend request under the retry policy."""
+        try:
+            return self.retry_policy.call(name, request, prompt)
+        except RetryableError as e:
+            logger.warning(f"{name} failed after retries: {e}")
+            return None
+
     async def _get_huggingface_response(self, prompt: str) -> Optional[str]:
         """Get response from Hugging Face API."""
+        return await self._retry_async('huggingface', self._request_huggingface, prompt)
+
+    async def _request_huggingface(self, prompt: str) -> Optional[str]:
+        """Single Hugging Face request; raises RetryableError on transient failures."""
         try:
             headers = {}
             if self.config.get('huggingface_token'):
@@ -154,20 +296,41 @@ class Assistant:
                     self.ai_services['huggingface'],
                     headers=headers,
                     json=payload,
-                    timeout=10
+                    timeout=time_left(10)
                 ) as response:
                     if response.status == 200:
                         result = await response.json()
                         if isinstance(result, list) and len(result) > 0:
                             return result[0].get('generated_text', '').replace(prompt, '').strip()
                     else:
+                        self.quota.note_response('huggingface', response.status, response.headers.get('Retry-After'))
+                        await raise_if_retryable(response, 'Hugging Face')
                         logger.warning(f"Hugging Face API error: {response.status}")
+        except RetryableError:
+            raise
         except Exception as e:
             logger.error(f"Hugging Face API error: {e}")
         return None
 
     async def _get_groq_response(self, prompt: str) -> Optional[str]:
         """Get response from Groq API."""
+        return await self._retry_async('groq', self._request_groq, prompt)
+
+    def _system_prompt(self, prompt: str) -> str:
+        """Jarvis persona plus any notes relevant to the request."""
+        system = "You are Jarvis, a helpful AI assistant. Be concise and friendly."
+        context = self.notes_index.context_for(
+            prompt,
+            k=self.config.get('notes_context_notes', 3),
+            token_budget=self.config.get('notes_context_tokens', 200),
+            min_score=self.config.get('notes_min_score', 0.5)
+        )
+        if context:
+            system += " Use the user's notes below when they are relevant.\n\n" + context
+        return system
+
+    async def _request_groq(self, prompt: str) -> Optional[str]:
+        """Single Groq request; raises RetryableError on transient failures."""
         if not self.config.get('groq_api_key'):
             return None
         
@@ -180,7 +343,7 @@ class Assistant:
             payload = {
                 "model": "llama2-70b-4096",
                 "messages": [
-                    {"role": "system", "content": "You are Jarvis, a helpful AI assistant. Be concise and friendly."},
+                    {"role": "system", "content": self._system_prompt(prompt)},
                     {"role": "user", "content": prompt}
                 ],
                 "max_tokens": 150,
@@ -192,81 +355,130 @@ class Assistant:
                     self.ai_services['groq'],
                     headers=headers,
                     json=payload,
-                    timeout=10
+                    timeout=time_left(10)
                 ) as response:
                     if response.status == 200:
                         result = await response.json()
                         return result['choices'][0]['message']['content'].strip()
                     else:
+                        self.quota.note_response('groq', response.status, response.headers.get('Retry-After'))
+                        await raise_if_retryable(response, 'Groq')
                         logger.warning(f"Groq API error: {response.status}")
+        except RetryableError:
+            raise
         except Exception as e:
             logger.error(f"Groq API error: {e}")
         return None
 
     def _get_ollama_response(self, prompt: str) -> Optional[str]:
         """Get response from local Ollama instance."""
+        return self._retry_sync('ollama', self._request_ollama, prompt)
+
+    def _request_ollama(self, prompt: str) -> Optional[str]:
+        """Single Ollama request; raises RetryableError on transient failures."""
         try:
             payload = {
                 "model": "llama2",
-                "prompt": f"You are Jarvis, a helpful AI assistant. User: {prompt}\nJarvis:",
+                "prompt": f"{self._system_prompt(prompt)}\nUser: {prompt}\nJarvis:",
                 "stream": False
             }
             
             response = requests.post(
                 self.ai_services['ollama'],
                 json=payload,
-                timeout=30
+                timeout=time_left(30)
             )
             
             if response.status_code == 200:
                 result = response.json()
                 return result.get('response', '').strip()
             else:
+                raise_if_retryable_sync(response, 'Ollama')
                 logger.warning(f"Ollama not available: {response.status_code}")
+        except RetryableError:
+            raise
         except requests.exceptions.ConnectionError:
             logger.info("Ollama not running locally")
         except Exception as e:
             logger.error(f"Ollama error: {e}")
         return None
 
-    def get_ai_response(self, prompt: str) -> str:
-        """Get AI response with fallback chain."""
-        ai_service = self.config.get('ai_service', 'huggingface')
+    def get_ai_response(self, prompt: str, cacheable: bool = True) -> str:
+        """Get AI response with fallback chain; fixed prompts that need a fresh answer pass cacheable=False."""
+        with tracer.span('ai') as ai_span:
+            response = self._get_ai_response(prompt, ai_span, cacheable)
+        return response
+
+    def _call_backend(self, service: str, prompt: str, fallback: bool = False) -> Optional[str]:
+        """Call one AI backend, recording its latency and outcome."""
+        if expired(f'backend.{service}'):
+            return None
+        if not self.quota.acquire(service):
+            logger.info(f"Skipping {service}: over quota or backing off")
+            ai_requests.inc(backend=service, outcome='throttled')
+            return None
         
-        # Try primary service
         response = None
-        try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-            if ai_service == 'groq':
-                response = loop.run_until_complete(self._get_groq_response(prompt))
-            elif ai_service == 'ollama':
-                response = self._get_ollama_response(prompt)
-            else:  # Default to Hugging Face
-                response = loop.run_until_complete(self._get_huggingface_response(prompt))
-            
-            loop.close()
-        except Exception as e:
-            logger.error(f"AI service error: {e}")
-        
-        # Fallback chain
-        if not response:
-            if ai_service != 'huggingface':
-                try:
+        started = time.perf_counter()
+        with tracer.span(f'backend.{service}', fallback=fallback) as span:
+            try:
+                if service == 'ollama':
+                    response = self._get_ollama_response(prompt)
+                else:
                     loop = asyncio.new_event_loop()
                     asyncio.set_event_loop(loop)
-                    response = loop.run_until_complete(self._get_huggingface_response(prompt))
-                    loop.close()
-                except:
-                    pass
-            
-            if not response and ai_service != 'ollama':
-                response = self._get_ollama_response(prompt)
+                    try:
+                        if service == 'groq':
+                            response = loop.run_until_complete(self._get_groq_response(prompt))
+                        else:  # Default to Hugging Face
+                            response = loop.run_until_complete(self._get_huggingface_response(prompt))
+                    finally:
+                        loop.close()
+            except Exception as e:
+                logger.error(f"AI service error: {e}")
+            span['ok'] = bool(response)
+        elapsed = time.perf_counter() - started
+        record_backend_call(service, elapsed, bool(response))
+        self.router.record(service, elapsed, bool(response))
+        return response
+
+    def _backend_order(self) -> List[str]:
+        """Primary service followed by the fallback chain."""
+        ai_service = self.config.get('ai_service', 'huggingface')
+        if ai_service == 'auto':
+            candidates = ['huggingface', 'ollama'] + (['groq'] if self.config.get('groq_api_key') else [])
+            return self.router.rank(candidates)
+        return [ai_service] + [b for b in ('huggingface', 'ollama') if b != ai_service]
+
+    def _get_ai_response(self, prompt: str, ai_span: Dict, cacheable: bool = True) -> str:
+        # Reworded repeats of an earlier question are answered locally; answers
+        # grounded in notes are not cached, since the notes may change
+        cacheable = cacheable and not self.notes_index.search(
+            prompt, k=1, min_score=self.config.get('notes_min_score', 0.5))
+        response = self.response_cache.get(prompt) if cacheable else None
+        ai_span['cached'] = response is not None
+        backend = 'cache'
         
-        # Final fallback to rule-based responses
-        if not response:
-            response = self._get_fallback_response(prompt)
+        # Try primary service, then the fallback chain
+        if response is None:
+            order = self._backend_order()
+            depth = len(order)
+            for attempt, service in enumerate(order):
+                response = self._call_backend(service, prompt, fallback=attempt > 0)
+                if response:
+                    depth, backend = attempt, service
+                    break
+            
+            # Final fallback to rule-based responses
+            if response:
+                if cacheable:
+                    self.response_cache.put(prompt, response)
+            else:
+                response = self._get_fallback_response(prompt)
+                backend = 'fallback'
+            ai_span['fallback_depth'] = depth
+            ai_fallback_depth.observe(depth)
+        note_detail('backend', backend)
         
         # Update conversation history
         self.conversation_history.append({"role": "user", "content": prompt})
@@ -309,11 +521,15 @@ class Assistant:
             if not city:
                 city = "current location"
             
+            if not self.quota.acquire('weather', max_wait=2.0):
+                return "Weather lookups are paused to stay within the free tier. Try again later."
+            
             api_key = self.config['weather_api_key']
             url = f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={api_key}&units=metric"
             
-            response = requests.get(url, timeout=10)
+            response = requests.get(url, timeout=time_left(10))
             data = response.json()
+            self.quota.note_response('weather', response.status_code, response.headers.get('Retry-After'))
             
             if response.status_code == 200:
                 temp = data['main']['temp']
@@ -335,11 +551,15 @@ class Assistant:
             return ["News API not configured. Get a free key from NewsAPI.org"]
         
         try:
+            if not self.quota.acquire('news', max_wait=2.0):
+                return ["News lookups are paused to stay within the free tier. Try again later."]
+            
             api_key = self.config['news_api_key']
             url = f"https://newsapi.org/v2/everything?q={topic}&sortBy=publishedAt&pageSize=3&apiKey={api_key}"
             
-            response = requests.get(url, timeout=10)
+            response = requests.get(url, timeout=time_left(10))
             data = response.json()
+            self.quota.note_response('news', response.status_code, response.headers.get('Retry-After'))
             
             if response.status_code == 200:
                 articles = data['articles']
@@ -352,10 +572,28 @@ class Assistant:
 
     def handle_command(self, command: str) -> bool:
         """Process and handle user commands."""
+        with tracer.span('command', chars=len(command)), deadline_scope(self.config.get('command_deadline')):
+            return self._route_command(command)
+
+    def _route_command(self, command: str) -> bool:
         command = command.lower().strip()
         
+        # Reminders
+        if REMINDER_PATTERN.search(command):
+            self.set_reminder(command)
+        
+        elif 'reminder' in command:
+            number = re.search(r'\d+', command)
+            if number and any(word in command for word in ['cancel', 'delete', 'remove']):
+                if self.reminders.cancel(int(number.group())):
+                    self.voice.speak(f"Reminder {number.group()} cancelled.", 'accomplished')
+                else:
+                    self.voice.speak(f"I couldn't find reminder {number.group()}.", 'apologetic')
+            else:
+                self.read_reminders()
+        
         # AI-powered conversation
-        if any(word in command for word in ['how are you', 'what do you think', 'tell me about', 'explain']):
+        elif any(word in command for word in ['how are you', 'what do you think', 'tell me about', 'explain']):
             response = self.get_ai_response(command)
             self.voice.speak(response, 'friendly')
         
@@ -391,7 +629,7 @@ class Assistant:
             news_items = self._get_news(topic)
             self.voice.speak(f"Here are the latest {topic} news:", 'informative')
             for item in news_items:
-                self.voice.speak(item, 'neutral')
+                self.voice.speak(item, 'neutral', LOW)
         
         # Time
         elif any(word in command for word in ['time', 'date']):
@@ -412,7 +650,7 @@ class Assistant:
         
         # Jokes
         elif 'joke' in command:
-            response = self.get_ai_response("Tell me a clever, witty joke")
+            response = self.get_ai_response("Tell me a clever, witty joke", cacheable=False)
             self.voice.speak(response, 'humorous')
         
         # Exit commands
@@ -457,7 +695,12 @@ class Assistant:
                 if not user_input:
                     continue
                 
-                if not self.handle_command(user_input):
+                tracer.start_turn()
+                try:
+                    keep_running = self.handle_command(user_input)
+                finally:
+                    tracer.end_turn()
+                if not keep_running:
                     break
                     
             except KeyboardInterrupt:
@@ -467,52 +710,64 @@ class Assistant:
             except Exception as e:
                 logger.error(f"Text mode error: {e}")
 
+    def run_daemon(self, socket_path: Optional[str] = None):
+        """Serve commands from thin clients (jarvis_client.py) until stopped."""
+        def handle(command: str) -> bool:
+            tracer.start_turn()
+            try:
+                return self.handle_command(command)
+            finally:
+                tracer.end_turn()
+        
+        daemon = AssistantDaemon(handle, socket_path or self.config.get('daemon_socket') or None,
+                                 max_clients=self.config.get('daemon_max_clients', 8))
+        print(f"\n🤖 Enhanced Jarvis Assistant - Daemon Mode on {daemon.path}")
+        print("Send commands with: python jarvis_client.py \"what time is it\"")
+        print("Press Ctrl+C or run 'python jarvis_client.py --stop' to stop.\n")
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            print("\n")
+
+    def run_batch(self, input_path: str, results_path: Optional[str] = None, concurrency: Optional[int] = None) -> Dict:
+        """Run every command in ``input_path``, writing JSONL results; rerun to resume."""
+        def handle(command: str) -> bool:
+            tracer.start_turn()
+            try:
+                return self.handle_command(command)
+            finally:
+                tracer.end_turn()
+        
+        items = load_items(input_path)
+        results_path = results_path or f"{os.path.splitext(input_path)[0]}.results.jsonl"
+        runner = BatchRunner(handle, results_path, concurrency or self.config.get('batch_concurrency', 4))
+        print(f"\n🤖 Enhanced Jarvis Assistant - Batch Mode: {len(items)} commands -> {results_path}")
+        summary = runner.run(items)
+        print(f"✅ {summary['ok']} ok, {summary['failed']} failed, {summary['skipped']} already done "
+              f"in {summary['seconds']}s (p50 {summary.get('p50_ms', 0)}ms, p95 {summary.get('p95_ms', 0)}ms)")
+        return summary
+
     def run_voice_mode(self):
-        """Run assistant in voice mode with proper timeout handling."""
+        """Run assistant in voice mode; listening continues while commands are processed."""
         print("\n🤖 Enhanced Jarvis Assistant - Voice Mode")
-        print("Say 'Jarvis' to wake me up, then give your command.")
+        print("Say 'Jarvis' followed by your command, or just 'Jarvis' and wait for the prompt.")
         print("Say 'quit' or 'exit' to stop.\n")
         
-        while True:
-            try:
-                # Listen for wake word - timeouts are normal, don't log them
-                command = self.voice.listen(timeout=3)
-                
-                # None means timeout or no speech - just continue silently
-                if command is None:
-                    continue
-                
-                # Check for wake word
-                if self.config['wake_word'] in command:
-                    self.voice.speak("Yes? I'm listening.", 'attentive')
-                    
-                    # Listen for actual command with longer timeout
-                    try:
-                        command = self.voice.listen(timeout=15)
-                    except Exception as e:
-                        # Only log unexpected errors, not timeouts
-                        if not isinstance(e, sr.WaitTimeoutError):
-                            logger.error(f"Error capturing command: {e}")
-                        continue
-                    
-                    if command:
-                        if not self.handle_command(command):
-                            break
-                
-                elif any(word in command for word in ['quit', 'exit', 'goodbye']):
-                    self.voice.speak("Goodbye!", 'warm')
-                    break
-                    
-            except KeyboardInterrupt:
-                print("\n")
-                self.voice.speak("Goodbye!", 'warm')
-                break
-            except Exception as e:
-                # Only log unexpected errors, not normal timeouts
-                if not isinstance(e, sr.WaitTimeoutError):
-                    logger.error(f"Voice mode error: {e}")
+        pipeline = VoicePipeline(self.voice, self.handle_command, self.config)
+        try:
+            pipeline.run()
+        except KeyboardInterrupt:
+            print("\n")
+            self.voice.speak("Goodbye!", 'warm')
+        except Exception as e:
+            logger.error(f"Voice mode error: {e}")
 
     def shutdown(self):
         """Gracefully shutdown the assistant."""
+        self.config_service.stop()
+        self.reminders.stop()
         self.voice.shutdown()
+        self.router.save()
+        self.quota.save()
+        self.response_cache.save()
         logger.info("Assistant shutdown complete")
\ No newline at end of file
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Shared event loop for Jarvis Assistant
+Runs coroutines on one long-lived background loop instead of a new loop per call
+"""
+
+import asyncio
+import contextvars
+import threading
+import logging
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRunner:
+    """Owns a background event loop that synchronous code can submit work to."""
+
+    def __init__(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name='async-runner', daemon=True)
+        self._thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        return self._loop
+
+    def submit(self, coro) -> Future:
+        """Schedule a coroutine and return a thread-safe future for its result.
+
+        The caller's context variables (such as the command deadline) are
+        carried over into the task.
+        """
+        context = contextvars.copy_context()
+
+        async def run_in_context():
+            for var, value in context.items():
+                var.set(value)
+            return await coro
+
+        return asyncio.run_coroutine_threadsafe(run_in_context(), self._loop)
+
+    def run(self, coro, timeout=None):
+        """Run a coroutine to completion from synchronous code."""
+        return self.submit(coro).result(timeout)
+
+    def shutdown(self):
+        """Stop the background loop."""
+        if self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        logger.info("Async runner shutdown")
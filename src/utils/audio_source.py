@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Audio input sources for Jarvis Assistant
+Microphone by default; recorded WAV files for machines without a sound card and for benchmarks
+"""
+
+import os
+import time
+import wave
+import logging
+from typing import Dict, List
+
+import numpy as np
+import speech_recognition as sr
+
+logger = logging.getLogger(__name__)
+
+
+def wav_paths(path: str) -> List[str]:
+    """A WAV file, or every WAV file in a directory in name order."""
+    if os.path.isdir(path):
+        return sorted(os.path.join(path, name) for name in os.listdir(path) if name.lower().endswith('.wav'))
+    return [path]
+
+
+def read_wav(path: str, rate: int = None):
+    """Mono int16 samples of a 16-bit WAV file, resampled to ``rate`` if given; returns (samples, rate)."""
+    with wave.open(path, 'rb') as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM WAV files are supported")
+        samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+        channels, source_rate = wav.getnchannels(), wav.getframerate()
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    if rate and rate != source_rate:
+        positions = np.arange(int(len(samples) * rate / source_rate)) * source_rate / rate
+        samples = np.interp(positions, np.arange(len(samples)), samples).astype(np.int16)
+        source_rate = rate
+    return samples, source_rate
+
+
+def ambient_level(samples: np.ndarray, rate: int) -> float:
+    """RMS of the quietest tenth of 20ms frames, i.e. the recording's background noise."""
+    frame = max(1, rate // 50)
+    count = len(samples) // frame
+    if not count:
+        return 0.0
+    frames = samples[:count * frame].reshape(count, frame).astype(np.float64)
+    return float(np.percentile(np.sqrt(np.mean(frames * frames, axis=1)), 10))
+
+
+class _WavStream:
+    """Replays the source's samples in CHUNK-sized reads, paced to ``speed`` times real time."""
+
+    def __init__(self, source: 'WavSource'):
+        self.source = source
+        self.position = 0
+        self.started = time.monotonic()
+
+    def read(self, size: int) -> bytes:
+        source = self.source
+        data = source.samples[self.position:self.position + size]
+        self.position += len(data)
+        if source.speed > 0:
+            delay = self.started + self.position / source.SAMPLE_RATE / source.speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        return data.tobytes()
+
+    def close(self):
+        self.position = len(self.source.samples)
+
+
+class WavSource(sr.AudioSource):
+    """Recorded utterances played back as if they came from a microphone.
+
+    Files are joined with ``gap`` seconds between them, after ``lead_in``
+    seconds for ambient calibration. Like a real microphone, the padding
+    is never digital silence but noise at the preceding recording's
+    background level. ``speed``
+    1.0 replays in real time, 4.0 four times faster, 0 as fast as the
+    reader consumes it. Each entry of ``utterances`` records where a file
+    sits in the stream (seconds) and its transcript from a sidecar .txt
+    file, if present. Not a live source: the continuous capture waits for
+    a slow reader instead of dropping audio.
+    """
+
+    live = False
+
+    def __init__(self, path: str, speed: float = 1.0, gap: float = 1.5, lead_in: float = 1.0,
+                 chunk_size: int = 1024):
+        self.CHUNK = chunk_size
+        self.SAMPLE_WIDTH = 2
+        self.SAMPLE_RATE = None
+        self.speed = speed
+        self.stream = None
+        self._started = None
+        self.utterances: List[Dict] = []
+
+        recordings = []
+        for file_path in wav_paths(path):
+            samples, self.SAMPLE_RATE = read_wav(file_path, self.SAMPLE_RATE)
+            recordings.append((file_path, samples))
+        if not recordings:
+            raise ValueError(f"No WAV files found at {path}")
+        rng = np.random.default_rng(0)
+        padding = lambda seconds, samples: np.clip(
+            rng.standard_normal(int(seconds * self.SAMPLE_RATE)) * ambient_level(samples, self.SAMPLE_RATE),
+            -32768, 32767).astype(np.int16)
+
+        parts = [padding(lead_in, recordings[0][1])]
+        offset = len(parts[0])
+        for file_path, samples in recordings:
+            transcript_path = os.path.splitext(file_path)[0] + '.txt'
+            transcript = None
+            if os.path.exists(transcript_path):
+                with open(transcript_path, 'r', encoding='utf-8') as f:
+                    transcript = f.read().strip()
+            self.utterances.append({
+                'path': file_path,
+                'start': offset / self.SAMPLE_RATE,
+                'end': (offset + len(samples)) / self.SAMPLE_RATE,
+                'transcript': transcript
+            })
+            silence = padding(gap, samples)
+            parts.extend((samples, silence))
+            offset += len(samples) + len(silence)
+        self.samples = np.concatenate(parts)
+        logger.info(f"Replaying {len(self.utterances)} recorded utterances from {path}")
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / float(self.SAMPLE_RATE)
+
+    def played_at(self, seconds: float):
+        """time.monotonic() at which the paced replay reaches ``seconds`` into the stream."""
+        if self._started is None or self.speed <= 0:
+            return None
+        return self._started + seconds / self.speed
+
+    def __enter__(self):
+        self.stream = _WavStream(self)
+        self._started = self.stream.started
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.stream is not None:
+            self.stream.close()
+        self.stream = None
+
+
+def open_audio_source(config: Dict):
+    """The microphone, or recorded audio when ``audio_input`` names a WAV file or directory."""
+    if config.get('audio_input'):
+        return WavSource(config['audio_input'], speed=config.get('audio_input_speed', 1.0))
+    return sr.Microphone()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Batch command runner for Jarvis Assistant
+Pushes a file of commands through the assistant concurrently and writes one JSON result per command
+"""
+
+import os
+import json
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Set
+
+from src.utils.replies import capture_replies
+
+logger = logging.getLogger(__name__)
+
+
+def load_items(path: str) -> List[Dict]:
+    """Commands from a text file (one per line, # comments) or JSONL file.
+
+    JSONL lines are objects with a "command" (or "prompt") and an optional
+    "id"; without one, an item's id is its line number. Ids are how a
+    resumed run recognizes finished work, so they should be unique.
+    """
+    items = []
+    jsonl = path.lower().endswith(('.jsonl', '.json'))
+    with open(path, 'r', encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or (not jsonl and line.startswith('#')):
+                continue
+            if not jsonl:
+                items.append({'id': number, 'command': line})
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning(f"{path}:{number}: skipping invalid JSON ({e})")
+                continue
+            command = (record.get('command') or record.get('prompt')) if isinstance(record, dict) else None
+            if not command:
+                logger.warning(f"{path}:{number}: skipping item without a command")
+                continue
+            items.append({'id': record.get('id', number), 'command': str(command)})
+    return items
+
+
+def completed_ids(results_path: str) -> Set:
+    """Ids that already succeeded in ``results_path``.
+
+    Unreadable lines at the end were torn by a crash and are cut off;
+    anything else that isn't a usable result is skipped, never truncated,
+    so the results after it are kept.
+    """
+    done = set()
+    if not os.path.exists(results_path):
+        return done
+    with open(results_path, 'rb+') as f:
+        offset = 0
+        torn_at = None
+        for number, line in enumerate(f, 1):
+            try:
+                if not line.endswith(b'\n'):
+                    raise ValueError('incomplete line')
+                result = json.loads(line)
+            except ValueError:
+                if torn_at is None:
+                    torn_at = offset
+            else:
+                if torn_at is not None:
+                    logger.warning(f"{results_path}: skipping unreadable lines before line {number}")
+                torn_at = None
+                try:
+                    if result.get('ok'):
+                        done.add(result['id'])
+                except (KeyError, TypeError, AttributeError):
+                    logger.warning(f"{results_path}:{number}: skipping malformed result")
+            offset += len(line)
+        if torn_at is not None:
+            f.truncate(torn_at)
+    return done
+
+
+class BatchRunner:
+    """Runs ``handle(command) -> bool`` over many commands, ``concurrency`` at a time.
+
+    Each command's spoken replies are captured rather than synthesized and
+    written with its latency and the AI backend that answered as soon as it
+    finishes. An item answered only by the rule-based fallback counts as
+    failed. The results file doubles as the checkpoint: rerunning the
+    same job skips every id that succeeded and retries the rest.
+    """
+
+    def __init__(self, handle: Callable[[str], bool], results_path: str, concurrency: int = 4):
+        self.handle = handle
+        self.results_path = results_path
+        self.concurrency = max(1, concurrency)
+
+    def _run_item(self, item: Dict) -> Dict:
+        replies, details = [], {}
+        started = time.perf_counter()
+        error = None
+        keep_running = True
+        with capture_replies(lambda text, emotion: replies.append(text), details):
+            try:
+                keep_running = self.handle(item['command'])
+            except Exception as e:
+                logger.error(f"Batch item {item['id']} failed: {e}")
+                error = str(e)
+        if error is None and details.get('backend') == 'fallback':
+            # A canned reply stands in for an answer; leave the item to be retried
+            error = "no AI backend answered"
+        result = {
+            'id': item['id'],
+            'command': item['command'],
+            'ok': error is None,
+            'replies': replies,
+            'backend': details.get('backend'),
+            'ms': round((time.perf_counter() - started) * 1000, 1),
+        }
+        if error:
+            result['error'] = error
+        if not keep_running:
+            result['continue'] = False  # An exit command; the batch carries on
+        return result
+
+    def run(self, items: List[Dict]) -> Dict:
+        """Process every item not already in the results file; returns a summary."""
+        done = completed_ids(self.results_path)
+        pending = [item for item in items if item['id'] not in done]
+        summary = {'total': len(items), 'skipped': len(items) - len(pending), 'ok': 0, 'failed': 0}
+        latencies = []
+        started = time.perf_counter()
+        if done:
+            logger.info(f"Resuming batch: {summary['skipped']} of {len(items)} items already done")
+
+        executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='batch')
+        try:
+            with open(self.results_path, 'a', encoding='utf-8') as out:
+                futures = [executor.submit(self._run_item, item) for item in pending]
+                for future in as_completed(futures):
+                    result = future.result()
+                    out.write(json.dumps(result) + '\n')
+                    out.flush()
+                    summary['ok' if result['ok'] else 'failed'] += 1
+                    latencies.append(result['ms'])
+        finally:
+            # On Ctrl+C, drop queued items; finished ones are already checkpointed
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        latencies.sort()
+        summary['seconds'] = round(time.perf_counter() - started, 2)
+        if latencies:
+            summary['p50_ms'] = latencies[len(latencies) // 2]
+            summary['p95_ms'] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        return summary
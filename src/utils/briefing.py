@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Concurrent fan-out for Jarvis Assistant
+Runs independent information sources in parallel under one shared deadline
+"""
+
+import time
+import contextvars
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SourceError(Exception):
+    """A source could not produce a result; the message is fit to speak."""
+
+
+class FanOut:
+    """Run named callables concurrently and keep whatever finishes in time.
+
+    Each gather gets its own pool with a thread per source, so a long
+    watchlist never queues behind the pool size and stragglers from one
+    call can't hold workers the next call needs.
+    """
+
+    def gather(self, sources: Dict[str, Callable[[], Any]],
+               timeout: float) -> Tuple[Dict[str, Any], List[str], List[str]]:
+        """Return (results, late, failed) for the given sources.
+
+        Every source starts immediately, so total latency is bounded by the
+        slowest source or ``timeout``, whichever comes first. Sources still
+        running at the deadline are reported as late and left to finish in
+        the background; their results are discarded.
+        """
+        if not sources:
+            return {}, [], []
+        started = time.monotonic()
+        executor = ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix='fanout')
+        # Each source runs in a copy of the caller's context so deadlines carry over
+        futures = {executor.submit(contextvars.copy_context().run, fn): name
+                   for name, fn in sources.items()}
+        done, pending = wait(futures, timeout=timeout)
+        # Late sources finish on their own threads, which exit once they do
+        executor.shutdown(wait=False)
+
+        results, late, failed = {}, [], []
+        for future in done:
+            name = futures[future]
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                logger.warning(f"Source '{name}' failed: {e}")
+                failed.append(name)
+
+        for future in pending:
+            late.append(futures[future])
+
+        # Report in the caller's order rather than completion order
+        order = list(sources)
+        late.sort(key=order.index)
+        failed.sort(key=order.index)
+
+        elapsed = time.monotonic() - started
+        logger.info(f"Fan-out finished in {elapsed:.2f}s: {len(results)} ok, {len(late)} late, {len(failed)} failed")
+        return results, late, failed
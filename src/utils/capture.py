@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Continuous audio capture for Jarvis Assistant
+Keeps the microphone open and buffered so speech between listen() calls is not lost
+"""
+
+import threading
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class PreRollStream:
+    """Ring buffer fed from an audio stream by a reader thread.
+
+    Stands in for a speech_recognition source stream: ``read`` returns the
+    next buffered chunk, blocking until one is captured. Audio captured while
+    nobody is reading (during STT, command handling or speech) stays in the
+    ring, and ``resume`` decides how much of that backlog the next read sees.
+    A ``lossless`` stream (recorded audio) waits for the reader instead of
+    overwriting unread chunks.
+    """
+
+    def __init__(self, stream, chunk_size: int, max_chunks: int, lossless: bool = False):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._lossless = lossless
+        self._chunks = deque(maxlen=max_chunks)
+        self._cond = threading.Condition()
+        self._next = 0      # Absolute index of the next chunk to be captured
+        self._cursor = 0    # Absolute index of the next chunk to be read
+        self._closed = False
+        self._thread = threading.Thread(target=self._capture, name='audio-capture', daemon=True)
+        self._thread.start()
+
+    def _capture(self):
+        while not self._closed:
+            try:
+                data = self._stream.read(self._chunk_size)
+            except Exception as e:
+                if not self._closed:
+                    logger.error(f"Audio capture error: {e}")
+                break
+            if not data:
+                break
+            with self._cond:
+                while self._lossless and self._next - self._cursor >= self._chunks.maxlen and not self._closed:
+                    self._cond.wait()
+                self._chunks.append(data)
+                self._next += 1
+                self._cond.notify_all()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def resume(self, max_backlog: int):
+        """Start the next read at most ``max_backlog`` chunks behind live audio."""
+        with self._cond:
+            self._cursor = max(self._cursor, self._next - max_backlog)
+
+    def read(self, size: int = None) -> bytes:
+        with self._cond:
+            while self._cursor >= self._next and not self._closed:
+                self._cond.wait()
+            if self._cursor >= self._next:
+                return b""  # Stream ended
+            oldest = self._next - len(self._chunks)
+            if self._cursor < oldest:
+                # The reader fell further behind than the ring holds
+                self._cursor = oldest
+            chunk = self._chunks[self._cursor - oldest]
+            self._cursor += 1
+            self._cond.notify_all()
+            return chunk
+
+    @property
+    def position(self) -> int:
+        """Chunks consumed so far, counting any skipped over."""
+        return self._cursor
+
+    @property
+    def drained(self) -> bool:
+        """True once the stream has ended and every captured chunk was read."""
+        with self._cond:
+            return self._closed and self._cursor >= self._next
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        try:
+            self._stream.close()
+        except Exception as e:
+            logger.debug(f"Audio stream close error: {e}")
+        self._thread.join(timeout=1)
+
+
+class ContinuousMicrophone:
+    """One long-lived, calibrated microphone source with a pre-roll buffer.
+
+    The microphone is opened and calibrated once instead of on every listen,
+    and audio is captured continuously. Each ``source()`` call rewinds to at
+    most ``pre_roll`` seconds of unread audio, so words spoken right after the
+    wake word or while a command was being processed are still heard.
+    """
+
+    def __init__(self, microphone, pre_roll: float = 2.0, buffer_seconds: float = 15.0):
+        self.microphone = microphone
+        self.pre_roll = pre_roll
+        self.buffer_seconds = buffer_seconds
+        self._source = None
+        self._stream = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._source is not None
+
+    @property
+    def exhausted(self) -> bool:
+        """True once a finite source (recorded audio) has been read to the end."""
+        return self._stream is not None and self._stream.drained
+
+    @property
+    def position(self) -> float:
+        """Seconds into the input stream that listening has reached."""
+        if self._stream is None:
+            return 0.0
+        return self._stream.position * self._source.CHUNK / float(self._source.SAMPLE_RATE)
+
+    def _chunks(self, seconds: float) -> int:
+        return max(1, int(seconds * self._source.SAMPLE_RATE / self._source.CHUNK))
+
+    def open(self, recognizer, calibrate: float = 0.5):
+        """Open the microphone, start buffering and calibrate the energy threshold."""
+        if self._source is not None:
+            return self._source
+        source = self.microphone.__enter__()
+        self._source = source
+        self._stream = PreRollStream(source.stream, source.CHUNK, self._chunks(self.buffer_seconds),
+                                     lossless=not getattr(source, 'live', True))
+        source.stream = self._stream
+        if calibrate:
+            recognizer.adjust_for_ambient_noise(source, duration=calibrate)
+        return source
+
+    def source(self, recognizer, pre_roll: float = None):
+        """The open source, positioned at most ``pre_roll`` seconds behind live audio."""
+        source = self.open(recognizer)
+        seconds = self.pre_roll if pre_roll is None else pre_roll
+        self._stream.resume(self._chunks(seconds) if seconds > 0 else 0)
+        return source
+
+    def close(self):
+        if self._source is None:
+            return
+        try:
+            # Microphone.__exit__ closes our stream, which closes the PyAudio stream
+            self.microphone.__exit__(None, None, None)
+        except Exception as e:
+            logger.debug(f"Microphone close error: {e}")
+        self._source = None
+        self._stream = None
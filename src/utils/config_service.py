@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Live configuration for Jarvis Assistant
+Watches the config file, validates edits and applies them without a restart
+"""
+
+import os
+import json
+import threading
+import logging
+from typing import Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+ConfigListener = Callable[[Dict, Set[str]], None]
+
+# Accepted values for settings that select between implementations
+CHOICES = {
+    'ai_service': ('huggingface', 'groq', 'ollama', 'together', 'auto'),
+    'router_policy': ('latency', 'quality', 'balanced'),
+    'voice_capture_policy': ('block', 'drop_oldest', 'drop_newest'),
+    'voice_command_policy': ('block', 'drop_oldest', 'drop_newest'),
+}
+
+# Settings read once at startup (files, sockets, devices); edits are kept but only apply after a restart
+RESTART_SUFFIXES = ('_file', '_dir', '_port', '_socket', '_size')
+RESTART_KEYS = ('audio_input', 'tts_enabled', 'metrics_interval', 'daemon_max_clients')
+
+
+def needs_restart(key: str) -> bool:
+    return key in RESTART_KEYS or key.endswith(RESTART_SUFFIXES)
+
+
+def check_value(key: str, value, default) -> Optional[str]:
+    """The problem with one setting, or None if it is acceptable."""
+    if value is None or default is None:
+        return None
+    if isinstance(default, bool):
+        ok = isinstance(value, bool)
+    elif isinstance(default, (int, float)):
+        ok = isinstance(value, (int, float)) and not isinstance(value, bool)
+    else:
+        ok = isinstance(value, type(default))
+    if not ok:
+        return f"{key} should be {type(default).__name__}, got {type(value).__name__}"
+    if key in CHOICES and value not in CHOICES[key]:
+        return f"{key} must be one of {', '.join(CHOICES[key])}, got '{value}'"
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and value < 0:
+        return f"{key} must not be negative"
+    return None
+
+
+def validate(config: Dict, defaults: Dict) -> List[str]:
+    """Problems with ``config``, judged by the types of the defaults and ``CHOICES``."""
+    problems = []
+    for key, default in defaults.items():
+        problem = check_value(key, config.get(key), default)
+        if problem:
+            problems.append(problem)
+    return problems
+
+
+class ConfigService:
+    """Owns the config dict every component shares and keeps it in step with the file.
+
+    ``config`` is the same dict object for the life of the process, so
+    code that reads settings when it needs them sees edits immediately.
+    A changed file is parsed and validated in full first; an invalid edit
+    is logged and the running config is left untouched. At startup there
+    is no earlier config to keep, so invalid settings are logged and
+    replaced by their defaults while every valid one is used. A valid edit is
+    applied with a single ``dict.update``, then subscribers are told which
+    keys changed so they can rebuild anything derived from them.
+    ``overrides`` (e.g. from the command line) always win over the file.
+    """
+
+    def __init__(self, path: str, defaults: Dict, overrides: Optional[Dict] = None):
+        self.path = path
+        self.defaults = defaults
+        self.overrides = dict(overrides or {})
+        self._listeners: List[ConfigListener] = []
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._stop = threading.Event()
+        self._thread = None
+        self.config = self._initial()
+
+    def _initial(self) -> Dict:
+        try:
+            if not os.path.exists(self.path):
+                # Save default config so there is a file to edit
+                with open(self.path, 'w') as f:
+                    json.dump(self.defaults, f, indent=2)
+            return self._read(keep_valid=True)
+        except Exception as e:
+            logger.error(f"Config loading error: {e}")
+            return {**self.defaults, **self.overrides}
+
+    def _file_stamp(self):
+        try:
+            stat = os.stat(self.path)
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def _read(self, keep_valid: bool = False) -> Dict:
+        """Parse and validate the file merged over the defaults; raises ValueError if invalid.
+
+        With ``keep_valid``, invalid settings fall back to their defaults instead.
+        """
+        self._stamp = self._file_stamp()
+        user_config = self._load_file()
+        if keep_valid:
+            rejected = {}
+            for key, value in user_config.items():
+                problem = check_value(key, value, self.defaults.get(key))
+                if problem:
+                    rejected[key] = problem
+            if rejected:
+                logger.error(f"Ignoring invalid settings in {self.path}: {'; '.join(rejected.values())}")
+                user_config = {key: value for key, value in user_config.items() if key not in rejected}
+        config = {**self.defaults, **user_config, **self.overrides}
+        problems = validate(config, self.defaults)
+        if problems:
+            raise ValueError('; '.join(problems))
+        return config
+
+    def _load_file(self) -> Dict:
+        with open(self.path, 'r') as f:
+            user_config = json.load(f)
+        if not isinstance(user_config, dict):
+            raise ValueError("config file must hold a JSON object")
+        return user_config
+
+    def subscribe(self, listener: ConfigListener):
+        """Call ``listener(config, changed_keys)`` after each applied change."""
+        self._listeners.append(listener)
+
+    def check(self) -> Set[str]:
+        """Reload if the file changed on disk; returns the keys that changed."""
+        with self._lock:
+            stamp = self._file_stamp()
+            if stamp is None or stamp == self._stamp:
+                return set()
+            try:
+                new_config = self._read()
+            except Exception as e:
+                logger.error(f"Ignoring invalid config edit in {self.path}: {e}")
+                return set()
+            return self.apply(new_config)
+
+    def apply(self, new_config: Dict) -> Set[str]:
+        """Swap in ``new_config`` and notify subscribers; returns the keys that changed."""
+        changed = {key for key in set(self.config) | set(new_config)
+                   if self.config.get(key) != new_config.get(key)}
+        if not changed:
+            return changed
+        self.config.update(new_config)
+        for key in set(self.config) - set(new_config):
+            self.config.pop(key, None)
+
+        deferred = sorted(key for key in changed if needs_restart(key))
+        logger.info(f"Config reloaded: {', '.join(sorted(changed))}")
+        if deferred:
+            logger.warning(f"Restart to apply: {', '.join(deferred)}")
+        for listener in self._listeners:
+            try:
+                listener(self.config, changed)
+            except Exception as e:
+                logger.error(f"Config listener error: {e}")
+        return changed
+
+    def save(self, user_config: Dict) -> Set[str]:
+        """Validate ``user_config``, write it to the file atomically and apply it."""
+        problems = validate({**self.defaults, **user_config}, self.defaults)
+        if problems:
+            raise ValueError('; '.join(problems))
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(user_config, f, indent=2)
+        with self._lock:
+            os.replace(tmp_path, self.path)
+            return self.apply(self._read())
+
+    def set(self, key: str, value) -> Set[str]:
+        """Save one setting, keeping the rest of the file as it is."""
+        with self._lock:
+            user_config = self._load_file() if os.path.exists(self.path) else {}
+        user_config[key] = value
+        return self.save(user_config)
+
+    def start(self, interval: float = 2.0):
+        """Poll the file's mtime every ``interval`` seconds on a background thread."""
+        if self._thread is not None or interval <= 0:
+            return
+
+        def watch():
+            while not self._stop.wait(interval):
+                self.check()
+
+        self._thread = threading.Thread(target=watch, name='config-watch', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
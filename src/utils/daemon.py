@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Warm assistant daemon for Jarvis Assistant
+Serves commands over a Unix domain socket so clients skip startup entirely
+"""
+
+import os
+import json
+import time
+import socket
+import tempfile
+import threading
+import socketserver
+import logging
+from typing import Callable, Dict, Iterator, Optional
+
+from src.utils.replies import capture_replies
+
+logger = logging.getLogger(__name__)
+
+# Protocol: one JSON object per line in each direction. A client sends
+# {"command": "..."} and receives {"reply": ..., "emotion": ...} lines as the
+# assistant speaks, then {"done": true, "continue": bool, "ms": ...}.
+# {"op": "ping"} and {"op": "shutdown"} are answered with a single "done" line.
+
+
+def default_socket_path() -> str:
+    """$JARVIS_SOCKET, or a per-user socket in the temp directory."""
+    if os.environ.get('JARVIS_SOCKET'):
+        return os.environ['JARVIS_SOCKET']
+    user = os.getuid() if hasattr(os, 'getuid') else os.environ.get('USERNAME', 'user')
+    return os.path.join(tempfile.gettempdir(), f"jarvis-{user}.sock")
+
+
+def _send(connection: socket.socket, message: Dict):
+    connection.sendall((json.dumps(message) + '\n').encode('utf-8'))
+
+
+class AssistantDaemon:
+    """Runs ``handle(command) -> bool`` for clients connecting to a Unix socket.
+
+    Each connection is served on its own thread, at most ``max_clients``
+    commands at a time; further clients wait for a slot. Replies are
+    streamed back line by line as they are spoken.
+    """
+
+    def __init__(self, handle: Callable[[str], bool], path: Optional[str] = None, max_clients: int = 8):
+        if not hasattr(socket, 'AF_UNIX'):
+            raise RuntimeError("Daemon mode needs Unix domain sockets, which this platform lacks")
+        self.handle = handle
+        self.path = path or default_socket_path()
+        self._slots = threading.BoundedSemaphore(max(1, max_clients))
+        self._server = None
+
+    def _claim_path(self):
+        """Remove a socket left behind by a daemon that died; refuse to start twice."""
+        if not os.path.exists(self.path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.path)
+            raise RuntimeError(f"A Jarvis daemon is already listening on {self.path}")
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.unlink(self.path)
+        finally:
+            probe.close()
+
+    def _serve_client(self, connection: socket.socket):
+        reader = connection.makefile('r', encoding='utf-8')
+        for line in reader:
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError:
+                _send(connection, {'done': True, 'error': 'invalid JSON'})
+                continue
+            op = request.get('op', 'command')
+            if op == 'ping':
+                _send(connection, {'done': True, 'continue': True})
+            elif op == 'shutdown':
+                _send(connection, {'done': True, 'continue': False})
+                threading.Thread(target=self.shutdown, daemon=True).start()
+                return
+            else:
+                self._run_command(connection, str(request.get('command', '')).strip())
+
+    def _run_command(self, connection: socket.socket, command: str):
+        if not command:
+            _send(connection, {'done': True, 'error': 'empty command'})
+            return
+        lock = threading.Lock()
+
+        def reply(text: str, emotion: str):
+            # Fan-out threads may speak concurrently; a vanished client must not fail the command
+            with lock:
+                try:
+                    _send(connection, {'reply': text, 'emotion': emotion})
+                except OSError:
+                    pass
+
+        started = time.perf_counter()
+        with self._slots, capture_replies(reply):
+            try:
+                keep_running = self.handle(command)
+                error = None
+            except Exception as e:
+                logger.error(f"Daemon command error: {e}")
+                keep_running, error = True, str(e)
+        message = {'done': True, 'continue': keep_running, 'ms': round((time.perf_counter() - started) * 1000, 1)}
+        if error:
+            message['error'] = error
+        _send(connection, message)
+
+    def serve_forever(self):
+        daemon = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                try:
+                    daemon._serve_client(self.request)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # Client went away mid-reply
+
+        self._claim_path()
+        self._server = socketserver.ThreadingUnixStreamServer(self.path, Handler)
+        self._server.daemon_threads = True
+        os.chmod(self.path, 0o600)
+        logger.info(f"Jarvis daemon listening on {self.path}")
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+    def shutdown(self):
+        if self._server is not None:
+            self._server.shutdown()
+
+
+def send_command(command: str, path: Optional[str] = None, timeout: float = 120.0,
+                 op: str = 'command') -> Iterator[Dict]:
+    """Send one request to a running daemon and yield its reply lines as they arrive.
+
+    Raises ConnectionError if no daemon is listening.
+    """
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    connection.settimeout(timeout)
+    try:
+        try:
+            connection.connect(path or default_socket_path())
+        except (FileNotFoundError, ConnectionRefusedError) as e:
+            raise ConnectionError(f"No Jarvis daemon at {path or default_socket_path()}") from e
+        request = {'op': op} if op != 'command' else {'command': command}
+        _send(connection, request)
+        for line in connection.makefile('r', encoding='utf-8'):
+            message = json.loads(line)
+            yield message
+            if message.get('done'):
+                return
+    finally:
+        connection.close()
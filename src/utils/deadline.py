@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Deadline propagation for Jarvis Assistant
+Each command carries a time budget that backends, retries and fetchers draw their timeouts from
+"""
+
+import time
+import contextvars
+import logging
+from contextlib import contextmanager
+from typing import Optional
+
+from src.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Shortest timeout handed to a network call; below this it is not worth starting
+MIN_TIMEOUT = 0.05
+
+deadline_exceeded = metrics.counter('jarvis_deadline_exceeded', 'Work skipped or cut short by the command deadline')
+
+_current: contextvars.ContextVar = contextvars.ContextVar('jarvis_deadline', default=None)
+
+
+class Deadline:
+    """An absolute point in monotonic time by which a command must answer."""
+
+    def __init__(self, seconds: float):
+        self.budget = seconds
+        self.at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() < MIN_TIMEOUT
+
+
+def current() -> Optional[Deadline]:
+    return _current.get()
+
+
+def time_left(default: float) -> float:
+    """Timeout for the next call: ``default`` capped by the active deadline."""
+    deadline = _current.get()
+    if deadline is None:
+        return default
+    return max(MIN_TIMEOUT, min(default, deadline.remaining()))
+
+
+def expired(stage: str = '') -> bool:
+    """True when the active deadline has passed; counts the skipped stage."""
+    deadline = _current.get()
+    if deadline is None or not deadline.expired:
+        return False
+    if stage:
+        deadline_exceeded.inc(stage=stage)
+        logger.info(f"Deadline reached, skipping {stage}")
+    return True
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]):
+    """Run a block under a deadline; nested scopes never extend an outer one."""
+    if not seconds:
+        yield _current.get()
+        return
+    deadline = Deadline(seconds)
+    outer = _current.get()
+    if outer is not None and outer.at < deadline.at:
+        deadline = outer
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Logging pipeline for Jarvis Assistant
+Log calls only enqueue; a background thread formats, writes, rotates and compresses
+"""
+
+import os
+import gzip
+import json
+import time
+import queue
+import shutil
+import atexit
+import logging
+import threading
+import logging.handlers
+from typing import Dict, Optional
+
+from src.utils.metrics import log_dropped
+from src.utils.tracing import tracer
+
+CONSOLE_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, tagged with the turn that logged it."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': self.formatTime(record, '%Y-%m-%dT%H:%M:%S') + f'.{int(record.msecs):03d}',
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName,
+            'line': f"{record.module}:{record.lineno}",
+        }
+        for key in ('turn', 'suppressed'):
+            value = getattr(record, key, None)
+            if value is not None:
+                entry[key] = value
+        return json.dumps(entry, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """Let through ``burst`` identical messages per ``window`` seconds.
+
+    Repeats beyond that are dropped and counted; the first message of the
+    next window says how many were suppressed. Identical means same logger,
+    level and rendered text, e.g. "Ollama not running locally" on every prompt.
+    """
+
+    MAX_KEYS = 1000
+
+    def __init__(self, burst: int = 5, window: float = 60.0):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self._seen: Dict = {}  # key -> [window_start, count, suppressed]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        message = record.getMessage()
+        key = (record.name, record.levelno, message)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._seen.get(key)
+            if entry is not None and now - entry[0] < self.window:
+                entry[1] += 1
+                if entry[1] <= self.burst:
+                    return True
+                entry[2] += 1
+                return False
+            self._seen[key] = [now, 1, 0]
+            if len(self._seen) > self.MAX_KEYS:
+                # Forget expired keys, or failing that the older half, so pruning stays rare
+                seen = {k: v for k, v in self._seen.items() if now - v[0] < self.window}
+                if len(seen) > self.MAX_KEYS // 2:
+                    seen = dict(list(seen.items())[-(self.MAX_KEYS // 2):])
+                self._seen = seen
+        if entry is not None and entry[2]:
+            record.msg, record.args = f"{message} ({entry[2]} similar messages suppressed)", None
+            record.suppressed = entry[2]
+        return True
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Never blocks the caller: records are dropped (and counted) when the queue is full."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The writer thread has no turn of its own, so capture the caller's now
+        record.turn = tracer.current_turn()
+        return super().prepare(record)
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            log_dropped.inc()
+
+
+class RotatingLogHandler(logging.handlers.RotatingFileHandler):
+    """Rotates at ``max_bytes`` or every ``rotate_seconds`` of uptime, gzipping old files.
+
+    Tracebacks arrive already merged into the message by the queue handler.
+    """
+
+    def __init__(self, path: str, max_bytes: int, backups: int, rotate_seconds: float = 0, compress: bool = True):
+        super().__init__(path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8', delay=True)
+        self.rotate_seconds = rotate_seconds
+        self._rollover_at = time.time() + rotate_seconds if rotate_seconds else None
+        if compress:
+            self.namer = lambda name: name + '.gz'
+            self.rotator = _gzip_rotate
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self._rollover_at is not None and time.time() >= self._rollover_at:
+            return True
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self):
+        super().doRollover()
+        if self.rotate_seconds:
+            self._rollover_at = time.time() + self.rotate_seconds
+
+
+def _gzip_rotate(source: str, dest: str):
+    with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+def setup_logging(path: str = 'jarvis.log', level: int = logging.INFO, max_bytes: int = 5_000_000,
+                  backups: int = 5, rotate_seconds: float = 86400, burst: int = 5, window: float = 60.0,
+                  queue_size: int = 10000) -> logging.handlers.QueueListener:
+    """Route the root logger through a bounded queue to a console and a rotating JSON file.
+
+    Returns the running listener; it is stopped (and the queue flushed) at exit.
+    """
+    global _listener
+    stop_logging()
+
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+    log_file = RotatingLogHandler(path, max_bytes, backups, rotate_seconds)
+    log_file.setFormatter(JsonFormatter())
+
+    records = queue.Queue(maxsize=queue_size)
+    handler = _QueueHandler(records)
+    handler.addFilter(RateLimitFilter(burst, window))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(records, console, log_file)
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """Write out everything still queued and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Metrics registry for Jarvis Assistant
+In-process counters, gauges and histograms with OpenMetrics text export
+"""
+
+import os
+import math
+import time
+import bisect
+import threading
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    escaped = (f'{k}="{_escape(v)}"' for k, v in pairs)
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value))
+
+
+class _Metric:
+    type_name = 'unknown'
+    _suffix = ''
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._lock = threading.Lock()
+        self._values: Dict[LabelKey, float] = {}
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0.0)
+
+    def series(self) -> Dict[LabelKey, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> List[str]:
+        lines = [f"# TYPE {self.name} {self.type_name}", f"# HELP {self.name} {self.help}"]
+        for key, value in sorted(self.series().items()):
+            lines.append(f"{self.name}{self._suffix}{_format_labels(key)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, exported with a _total suffix."""
+    type_name = 'counter'
+    _suffix = '_total'
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, such as a queue depth."""
+    type_name = 'gauge'
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[_label_key(labels)] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observations, usually latencies in seconds."""
+    type_name = 'histogram'
+
+    def __init__(self, name: str, help_text: str, buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text)
+        self.buckets = tuple(sorted(buckets))
+        self._counts: Dict[LabelKey, List[int]] = {}
+        self._sums: Dict[LabelKey, float] = {}
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * (len(self.buckets) + 1))
+            counts[index] += 1
+            self._sums[key] = self._sums.get(key, 0.0) + value
+
+    def count(self, **labels) -> int:
+        return sum(self._counts.get(_label_key(labels), ()))
+
+    def quantile(self, q: float, **labels) -> float:
+        """Estimate a quantile by linear interpolation inside the matching bucket."""
+        with self._lock:
+            counts = list(self._counts.get(_label_key(labels), ()))
+        total = sum(counts)
+        if not total:
+            return float('nan')
+
+        target = q * total
+        cumulative = 0
+        for index, bucket_count in enumerate(counts):
+            if cumulative + bucket_count >= target and bucket_count:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else lower
+                return lower + (upper - lower) * (target - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.buckets[-1]
+
+    def render(self) -> List[str]:
+        lines = [f"# TYPE {self.name} histogram", f"# HELP {self.name} {self.help}"]
+        with self._lock:
+            snapshot = {key: (list(counts), self._sums[key]) for key, counts in self._counts.items()}
+        for key, (counts, total_sum) in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = ('le', _format_value(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(key, le)} {cumulative}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(total_sum)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds every metric family and exports them in OpenMetrics text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+        self._export_thread = None
+        self._server = None
+
+    def _get_or_create(self, cls, name: str, help_text: str, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, **kwargs)
+            return metric
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self._get_or_create(Counter, name, help_text)
+
+    def gauge(self, name: str, help_text: str) -> Gauge:
+        return self._get_or_create(Gauge, name, help_text)
+
+    def histogram(self, name: str, help_text: str, buckets=LATENCY_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, buckets=buckets)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in sorted(metrics, key=lambda m: m.name):
+            lines.extend(metric.render())
+        lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path: str):
+        """Write the exposition atomically so scrapers never see a partial file."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+    def start(self, config: Dict):
+        """Start the file exporter and/or local HTTP endpoint from config (idempotent)."""
+        path = config.get('metrics_file')
+        interval = config.get('metrics_interval', 15)
+        if path and self._export_thread is None:
+            self._export_thread = threading.Thread(
+                target=self._export_loop, args=(path, interval), name='metrics-export', daemon=True
+            )
+            self._export_thread.start()
+            logger.info(f"Exporting metrics to {path} every {interval}s")
+
+        port = config.get('metrics_port')
+        if port and self._server is None:
+            try:
+                self._server = ThreadingHTTPServer(('127.0.0.1', port), _handler_for(self))
+                threading.Thread(target=self._server.serve_forever, name='metrics-http', daemon=True).start()
+                logger.info(f"Serving metrics on http://127.0.0.1:{port}/metrics")
+            except OSError as e:
+                logger.error(f"Metrics endpoint unavailable on port {port}: {e}")
+                self._server = None
+
+    def _export_loop(self, path: str, interval: float):
+        while True:
+            try:
+                self.write(path)
+            except Exception as e:
+                logger.error(f"Metrics export error: {e}")
+            time.sleep(interval)
+
+
+def _handler_for(registry: MetricsRegistry):
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = registry.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/openmetrics-text; version=1.0.0; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MetricsHandler
+
+
+# Shared registry and the metric families used across the assistant
+metrics = MetricsRegistry()
+
+ai_requests = metrics.counter('jarvis_ai_requests', 'AI backend calls by backend and outcome')
+ai_latency = metrics.histogram('jarvis_ai_request_seconds', 'AI backend call latency')
+ai_fallback_depth = metrics.histogram(
+    'jarvis_ai_fallback_depth', 'Backends tried after the primary before answering', buckets=(0, 1, 2, 3)
+)
+cache_requests = metrics.counter('jarvis_cache_requests', 'Cache lookups by cache and result')
+stt_latency = metrics.histogram('jarvis_stt_seconds', 'Speech-to-text latency by engine')
+stt_requests = metrics.counter('jarvis_stt_requests', 'Speech-to-text calls by engine and outcome')
+tts_queue_depth = metrics.gauge('jarvis_tts_queue_depth', 'Utterances waiting for speech synthesis')
+tts_queue_wait = metrics.histogram('jarvis_tts_queue_wait_seconds', 'Time utterances wait before synthesis starts')
+tts_interruptions = metrics.counter('jarvis_tts_interruptions', 'Utterances cut short or dropped by barge-in')
+tts_coalesced = metrics.counter('jarvis_tts_coalesced', 'Short utterances merged into the previous synthesis call')
+note_ops = metrics.counter('jarvis_note_ops', 'Note store operations by op')
+voice_queue_depth = metrics.gauge('jarvis_voice_queue_depth', 'Items waiting between voice pipeline stages by stage')
+voice_dropped = metrics.counter('jarvis_voice_dropped', 'Utterances dropped by the voice pipeline by stage and reason')
+log_dropped = metrics.counter('jarvis_log_dropped', 'Log records dropped because the logging queue was full')
+
+
+def record_backend_call(backend: str, seconds: float, ok: bool):
+    """Count one AI backend call and its latency."""
+    ai_requests.inc(backend=backend, outcome='ok' if ok else 'error')
+    ai_latency.observe(seconds, backend=backend)
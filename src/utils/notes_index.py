@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Notes retrieval for Jarvis Assistant
+BM25 index over saved notes so AI answers can be grounded in what the user wrote down
+"""
+
+import re
+import math
+import heapq
+import datetime
+import threading
+import logging
+from collections import Counter, defaultdict
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Common words plus the ways people refer to their notes ("what did I note about...")
+STOPWORDS = {
+    'a', 'an', 'the', 'and', 'or', 'of', 'to', 'in', 'on', 'at', 'for', 'with', 'about', 'from',
+    'is', 'are', 'was', 'were', 'be', 'it', 'this', 'that', 'i', 'me', 'my', 'you', 'your',
+    'what', 'when', 'where', 'which', 'who', 'how', 'did', 'do', 'does', 'have', 'has', 'had',
+    'can', 'could', 'would', 'will', 'please', 'jarvis', 'tell', 'say', 'said',
+    'note', 'notes', 'noted', 'remember', 'wrote', 'write', 'saved'
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words without stopwords, with plural 's' stripped."""
+    terms = []
+    for word in re.findall(r"[a-z0-9]+", text.lower()):
+        if word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        terms.append(word)
+    return terms
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough LLM token count; about four characters per token for English."""
+    return max(1, len(text) // 4)
+
+
+class NotesIndex:
+    """Incremental BM25 index over the notes list.
+
+    Adding a note only touches the postings of its own terms, so the index
+    stays current without rebuilding on every ``add_note``.
+    """
+
+    def __init__(self, notes: List[Dict] = None, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._notes: List[Dict] = []
+        self._lengths: List[int] = []
+        self._total_length = 0
+        self._postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        for note in notes or []:
+            self.add(note)
+
+    def add(self, note: Dict):
+        terms = Counter(tokenize(note.get('text', '')))
+        with self._lock:
+            doc = len(self._notes)
+            self._notes.append(note)
+            length = sum(terms.values())
+            self._lengths.append(length)
+            self._total_length += length
+            for term, count in terms.items():
+                self._postings[term][doc] = count
+
+    def __len__(self) -> int:
+        return len(self._notes)
+
+    def search(self, query: str, k: int = 3, min_score: float = 0.0) -> List[Tuple[float, Dict]]:
+        """Top-k (score, note) pairs for a query, best first.
+
+        ``min_score`` is the share of the query a note must cover, from 0 to
+        1. A note holding every query term once scores about the sum of the
+        terms' idf, which is the scale used; terms no note contains count at
+        full weight, so sharing one word with a longer question is not enough.
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            n = len(self._notes)
+            if not n or not terms:
+                return []
+            avg_length = self._total_length / n or 1.0
+            scores: Dict[int, float] = defaultdict(float)
+            total_idf = 0.0
+            for term in terms:
+                postings = self._postings.get(term) or {}
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                total_idf += idf
+                for doc, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[doc] / avg_length)
+                    scores[doc] += idf * tf * (self.k1 + 1) / (tf + norm)
+            cutoff = min_score * total_idf
+            # Newer notes win ties
+            best = heapq.nlargest(k, ((doc, score) for doc, score in scores.items() if score >= cutoff),
+                                  key=lambda item: (item[1], item[0]))
+            return [(score, self._notes[doc]) for doc, score in best]
+
+    def context_for(self, query: str, k: int = 3, token_budget: int = 200, min_score: float = 0.0) -> str:
+        """Relevant notes formatted for a prompt, trimmed to fit the token budget."""
+        lines = []
+        used = estimate_tokens("Relevant notes from the user:")
+        for _, note in self.search(query, k, min_score):
+            line = f"- {note['text']}"
+            try:
+                saved = datetime.datetime.fromisoformat(note['timestamp'])
+                line += f" (saved {saved.strftime('%B %d, %Y')})"
+            except (KeyError, ValueError):
+                pass
+            cost = estimate_tokens(line)
+            if used + cost > token_budget:
+                if not lines:
+                    # Keep the start of an oversized best match rather than nothing
+                    lines.append(line[:max(0, token_budget - used) * 4])
+                break
+            lines.append(line)
+            used += cost
+        if not lines:
+            return ""
+        return "Relevant notes from the user:\n" + "\n".join(lines)
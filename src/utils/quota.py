@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Quota tracking for Jarvis Assistant
+Persistent per-provider token buckets and daily budgets for free-tier APIs
+"""
+
+import os
+import json
+import time
+import datetime
+import threading
+import logging
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Free-tier limits; providers not listed here are treated as unlimited
+DEFAULT_LIMITS = {
+    'groq': {'daily': 100, 'per_minute': 30},
+    'huggingface': {'per_minute': 30},
+    'together': {'per_minute': 60},
+    'weather': {'daily': 1000, 'per_minute': 60},
+    'news': {'daily': 100, 'per_minute': 30},
+}
+
+DEFAULT_BACKOFF = 60.0
+
+
+def parse_retry_after(value) -> Optional[float]:
+    """Convert a Retry-After header (seconds or HTTP date) to seconds from now."""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        return max(0.0, when.timestamp() - time.time())
+    except Exception:
+        return None
+
+
+class QuotaTracker:
+    """Decides whether a provider may be called now without burning a failed request."""
+
+    def __init__(self, limits: Optional[Dict[str, Dict]] = None, state_path: str = 'quota_state.json',
+                 save_interval: float = 10.0):
+        self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self.state_path = state_path
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+        self._state: Dict[str, Dict] = {}
+        self._last_save = 0.0
+        self._load()
+
+    def set_limits(self, limits: Optional[Dict[str, Dict]]):
+        """Adopt edited per-provider limits; usage counted so far is kept."""
+        with self._lock:
+            self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+
+    def _load(self):
+        try:
+            if os.path.exists(self.state_path):
+                with open(self.state_path, 'r') as f:
+                    self._state = json.load(f)
+        except Exception as e:
+            logger.warning(f"Quota state loading error: {e}")
+
+    def save(self):
+        """Persist usage so daily budgets survive restarts."""
+        with self._lock:
+            data = json.dumps(self._state, indent=2)
+        try:
+            tmp_path = f"{self.state_path}.tmp"
+            with open(tmp_path, 'w') as f:
+                f.write(data)
+            os.replace(tmp_path, self.state_path)
+            self._last_save = time.monotonic()
+        except Exception as e:
+            logger.error(f"Quota state saving error: {e}")
+
+    def _get(self, provider: str) -> Dict:
+        state = self._state.get(provider)
+        today = datetime.date.today().isoformat()
+        if state is None:
+            per_minute = self.limits.get(provider, {}).get('per_minute', 0)
+            state = self._state[provider] = {
+                'day': today, 'used': 0, 'tokens': float(per_minute),
+                'updated': time.time(), 'blocked_until': 0.0
+            }
+        if state['day'] != today:
+            state['day'], state['used'] = today, 0
+        return state
+
+    def _refill(self, provider: str, state: Dict):
+        per_minute = self.limits.get(provider, {}).get('per_minute')
+        if not per_minute:
+            return
+        now = time.time()
+        state['tokens'] = min(float(per_minute), state['tokens'] + (now - state['updated']) * per_minute / 60.0)
+        state['updated'] = now
+
+    def acquire(self, provider: str, max_wait: float = 0.0) -> bool:
+        """Take one request from the provider's budget.
+
+        Returns False when the daily budget is spent, the provider asked us to
+        back off, or the per-minute bucket would not refill within ``max_wait``.
+        Callers should then throttle or route elsewhere.
+        """
+        limits = self.limits.get(provider)
+        if not limits:
+            return True
+
+        with self._lock:
+            state = self._get(provider)
+            now = time.time()
+            if state['blocked_until'] > now:
+                return False
+            daily = limits.get('daily')
+            if daily and state['used'] >= daily:
+                return False
+
+            self._refill(provider, state)
+            wait = 0.0
+            per_minute = limits.get('per_minute')
+            if per_minute and state['tokens'] < 1.0:
+                wait = (1.0 - state['tokens']) * 60.0 / per_minute
+                if wait > max_wait:
+                    return False
+            state['tokens'] -= 1.0 if per_minute else 0.0
+            state['used'] += 1
+
+        if wait:
+            time.sleep(wait)
+        if time.monotonic() - self._last_save > self.save_interval:
+            self.save()
+        return True
+
+    def note_response(self, provider: str, status: int, retry_after=None):
+        """Record a provider's answer; 429/503 with Retry-After pauses the provider."""
+        if status not in (429, 503) and retry_after is None:
+            return
+        delay = parse_retry_after(retry_after)
+        if delay is None:
+            if status != 429:
+                return
+            delay = DEFAULT_BACKOFF
+        with self._lock:
+            state = self._get(provider)
+            state['blocked_until'] = max(state['blocked_until'], time.time() + delay)
+        logger.warning(f"{provider} asked to back off for {delay:.0f}s (status {status})")
+        self.save()
+
+    def blocked_for(self, provider: str) -> float:
+        """Seconds until the provider accepts requests again (0 when available)."""
+        with self._lock:
+            state = self._state.get(provider)
+            return max(0.0, state['blocked_until'] - time.time()) if state else 0.0
+
+    def remaining(self, provider: str) -> Optional[int]:
+        """Requests left today, or None when the provider has no daily cap."""
+        daily = self.limits.get(provider, {}).get('daily')
+        if not daily:
+            return None
+        with self._lock:
+            return max(0, daily - self._get(provider)['used'])
+
+    def headroom(self, provider: str) -> Optional[float]:
+        """Fraction of budget left (0..1), or None for unlimited providers."""
+        if provider not in self.limits:
+            return None
+        if self.blocked_for(provider) > 0:
+            return 0.0
+        remaining = self.remaining(provider)
+        if remaining is None:
+            return None
+        return remaining / self.limits[provider]['daily']
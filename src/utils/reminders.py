@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Reminder scheduler for Jarvis Assistant
+Natural-language due times, one timer thread over a min-heap, and an append-only journal
+"""
+
+import os
+import re
+import json
+import heapq
+import datetime
+import threading
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+REMINDER_PATTERN = re.compile(r"\b(remind me|set (?:a |an )?reminder|add (?:a )?reminder)\b")
+
+NUMBER_WORDS = {
+    'a': 1, 'an': 1, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6,
+    'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10, 'fifteen': 15, 'twenty': 20,
+    'thirty': 30, 'forty five': 45, 'couple of': 2, 'few': 3
+}
+
+UNIT_SECONDS = {'second': 1, 'sec': 1, 'minute': 60, 'min': 60, 'hour': 3600, 'hr': 3600,
+                'day': 86400, 'week': 604800}
+
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+# Clock hour used when only a part of the day is given
+DAY_PARTS = {'morning': 9, 'afternoon': 14, 'evening': 18, 'night': 20, 'tonight': 20}
+
+RELATIVE = re.compile(
+    r"\bin\s+(half an hour|\d+(?:\.\d+)?|" + "|".join(sorted(NUMBER_WORDS, key=len, reverse=True)) +
+    r")\s*(seconds?|secs?|minutes?|mins?|hours?|hrs?|days?|weeks?)?\b"
+)
+CLOCK = re.compile(r"\b(?:at\s+)?(\d{1,2})(?::(\d{2}))?\s*(am|pm|a\.m\.|p\.m\.)|\bat\s+(\d{1,2})(?::(\d{2}))?\b|\b(?:at\s+)?(noon|midnight)\b")
+DAY = re.compile(r"\b(?:on\s+|(next)\s+)?(today|tonight|tomorrow|" + "|".join(WEEKDAYS) + r")\b")
+# The standalone project app's reminder list, imported once into the journal
+LEGACY_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                           'project', 'reminders.json')
+
+PART = re.compile(r"\b(?:in the\s+|this\s+)?(morning|afternoon|evening|night)\b")
+
+
+def _relative_seconds(amount: str, unit: Optional[str]) -> Optional[float]:
+    if amount == 'half an hour':
+        return 1800
+    if unit is None:
+        return None
+    value = float(amount) if amount[0].isdigit() else NUMBER_WORDS[amount]
+    return value * UNIT_SECONDS[unit.rstrip('s')]
+
+
+def parse_due(text: str, now: Optional[datetime.datetime] = None) -> Optional[Tuple[datetime.datetime, str]]:
+    """Find a due time in text like "in 10 minutes" or "tomorrow at 5pm".
+
+    Returns (due, text with the time phrase removed), or None when no time is given.
+    A clock time that has already passed today means tomorrow, and an hour
+    without am/pm picks the next occurrence.
+    """
+    now = now or datetime.datetime.now()
+    text = text.lower()
+
+    match = RELATIVE.search(text)
+    if match:
+        seconds = _relative_seconds(match.group(1), match.group(2))
+        if seconds:
+            return now + datetime.timedelta(seconds=seconds), RELATIVE.sub(' ', text, count=1)
+
+    day_match, clock_match, part_match = DAY.search(text), CLOCK.search(text), PART.search(text)
+    if not (day_match or clock_match or part_match):
+        return None
+
+    day_word = day_match.group(2) if day_match else None
+    date = now.date()
+    if day_word == 'tomorrow':
+        date += datetime.timedelta(days=1)
+    elif day_word in WEEKDAYS:
+        days = (WEEKDAYS.index(day_word) - now.weekday()) % 7
+        # "next monday" said on a Monday means a week from today
+        if days == 0 and day_match.group(1):
+            days = 7
+        date += datetime.timedelta(days=days)
+
+    hour, minute, meridiem = None, 0, None
+    if clock_match:
+        if clock_match.group(6):
+            hour = 12 if clock_match.group(6) == 'noon' else 0
+            meridiem = 'fixed'
+        else:
+            hour = int(clock_match.group(1) or clock_match.group(4))
+            minute = int(clock_match.group(2) or clock_match.group(5) or 0)
+            meridiem = (clock_match.group(3) or '').replace('.', '') or None
+            if hour > 23 or minute > 59:
+                return None
+            if meridiem == 'pm' and hour < 12:
+                hour += 12
+            elif meridiem == 'am' and hour == 12:
+                hour = 0
+    elif part_match or day_word == 'tonight':
+        hour = DAY_PARTS[part_match.group(1) if part_match else 'tonight']
+    else:
+        hour = 9
+
+    due = datetime.datetime.combine(date, datetime.time(hour, minute))
+    if meridiem is None and clock_match and hour < 12 and part_match is None:
+        # "at 5" means the next 5 o'clock; evening/night parts already imply pm
+        if due <= now and due + datetime.timedelta(hours=12) > now:
+            due += datetime.timedelta(hours=12)
+    elif part_match and part_match.group(1) in ('afternoon', 'evening', 'night') and hour < 12:
+        due += datetime.timedelta(hours=12)
+    if due <= now:
+        due += datetime.timedelta(days=7 if day_word in WEEKDAYS else 1)
+
+    for pattern, found in ((DAY, day_match), (CLOCK, clock_match), (PART, part_match)):
+        if found:
+            text = pattern.sub(' ', text, count=1)
+    return due, text
+
+
+def parse_reminder(command: str, now: Optional[datetime.datetime] = None) -> Optional[Tuple[datetime.datetime, str]]:
+    """Turn "remind me to call mom at 5pm" into (due, "call mom")."""
+    parsed = parse_due(REMINDER_PATTERN.sub(' ', command.lower()), now)
+    if parsed is None:
+        return None
+    due, rest = parsed
+    task = re.sub(r"\s+", " ", rest).strip(" ,.")
+    task = re.sub(r"^(?:(?:to|for|that|about)\s+)+", "", task).strip()
+    return due, task or "your reminder"
+
+
+def describe_due(due: datetime.datetime, now: Optional[datetime.datetime] = None) -> str:
+    """Spoken form of a due time, e.g. "at 5:00 PM tomorrow"."""
+    now = now or datetime.datetime.now()
+    clock = due.strftime("%I:%M %p").lstrip('0')
+    days = (due.date() - now.date()).days
+    if days == 0:
+        return f"at {clock}"
+    if days == 1:
+        return f"at {clock} tomorrow"
+    if days < 7:
+        return f"at {clock} on {due.strftime('%A')}"
+    return f"at {clock} on {due.strftime('%B %d')}"
+
+
+class ReminderScheduler:
+    """Fires reminders from a single timer thread.
+
+    Pending reminders sit in a min-heap keyed by due time; the thread sleeps
+    until the earliest one and is woken early when a sooner reminder is added.
+    Changes are appended to a JSONL journal (one line per add, fire or cancel)
+    which is replayed and compacted on construction, so ids stay unique even
+    if reminders are added before ``start``. Reminders that came due while
+    the assistant was not running are announced on start if they are within
+    the catch-up window, and dropped otherwise.
+    """
+
+    def __init__(self, path: str = 'reminders.jsonl', catch_up: float = 86400,
+                 legacy_path: Optional[str] = LEGACY_PATH):
+        self.path = path
+        self.catch_up = catch_up
+        self.legacy_path = legacy_path
+        self._cond = threading.Condition()
+        self._heap: List[Tuple[float, int]] = []
+        self._pending: Dict[int, Dict] = {}
+        self._next_id = 1
+        self._listeners: List[Callable[[Dict], None]] = []
+        self._thread = None
+        self._running = False
+        self._load()
+
+    def add_listener(self, callback: Callable[[Dict], None]):
+        """Call ``callback(reminder)`` when a reminder fires; ``reminder['missed']`` marks catch-ups."""
+        self._listeners.append(callback)
+
+    def _append(self, record: Dict):
+        try:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + "\n")
+        except Exception as e:
+            logger.error(f"Reminder journal error: {e}")
+
+    def _replay(self) -> Dict[int, Dict]:
+        pending: Dict[int, Dict] = {}
+        if not os.path.exists(self.path):
+            return self._import_legacy()
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # A torn final line from a crash
+                if record.get('op') == 'add':
+                    pending[record['id']] = {k: record[k] for k in ('id', 'text', 'due', 'created')}
+                else:
+                    pending.pop(record.get('id'), None)
+                self._next_id = max(self._next_id, record.get('id', 0) + 1)
+        return pending
+
+    def _import_legacy(self) -> Dict[int, Dict]:
+        """Pick up reminders from the older reminders.json list format."""
+        pending: Dict[int, Dict] = {}
+        if not self.legacy_path or not os.path.exists(self.legacy_path):
+            return pending
+        try:
+            with open(self.legacy_path, 'r') as f:
+                for item in json.load(f):
+                    if item.get('text') and item.get('due'):
+                        datetime.datetime.fromisoformat(item['due'])
+                        pending[self._next_id] = {'id': self._next_id, 'text': item['text'], 'due': item['due'],
+                                                  'created': item.get('created', item['due'])}
+                        self._next_id += 1
+        except Exception as e:
+            logger.warning(f"Legacy reminders import error: {e}")
+        return pending
+
+    def _compact(self):
+        """Rewrite the journal with only pending reminders."""
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for reminder in sorted(self._pending.values(), key=lambda r: r['id']):
+                    f.write(json.dumps(dict(reminder, op='add')) + "\n")
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.error(f"Reminder journal compaction error: {e}")
+
+    def _load(self):
+        """Replay the journal, drop reminders missed for too long and queue the rest."""
+        try:
+            self._pending = self._replay()
+        except Exception as e:
+            logger.error(f"Reminder loading error: {e}")
+            self._pending = {}
+
+        now = datetime.datetime.now()
+        for reminder in list(self._pending.values()):
+            due = datetime.datetime.fromisoformat(reminder['due'])
+            if (now - due).total_seconds() > self.catch_up:
+                logger.info(f"Dropping reminder {reminder['id']} missed by more than the catch-up window")
+                del self._pending[reminder['id']]
+                continue
+            heapq.heappush(self._heap, (due.timestamp(), reminder['id']))
+        self._compact()
+
+    def start(self):
+        """Start the timer thread; pending reminders are already queued."""
+        if self._thread is not None:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='reminders', daemon=True)
+        self._thread.start()
+        logger.info(f"Reminder scheduler started with {len(self._pending)} pending")
+
+    def add(self, text: str, due: datetime.datetime) -> Dict:
+        with self._cond:
+            reminder = {'id': self._next_id, 'text': text, 'due': due.isoformat(timespec='seconds'),
+                        'created': datetime.datetime.now().isoformat(timespec='seconds')}
+            self._next_id += 1
+            self._pending[reminder['id']] = reminder
+            self._append(dict(reminder, op='add'))
+            heapq.heappush(self._heap, (due.timestamp(), reminder['id']))
+            # Wake the timer thread only if this is now the earliest reminder
+            if self._heap[0][1] == reminder['id']:
+                self._cond.notify()
+        return reminder
+
+    def cancel(self, reminder_id: int) -> bool:
+        """Cancel a pending reminder; its heap entry is skipped when it surfaces."""
+        with self._cond:
+            if self._pending.pop(reminder_id, None) is None:
+                return False
+            self._append({'op': 'cancel', 'id': reminder_id})
+        return True
+
+    def pending(self) -> List[Dict]:
+        """Pending reminders, soonest first."""
+        with self._cond:
+            return sorted(self._pending.values(), key=lambda r: r['due'])
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running:
+                    # Drop entries for reminders cancelled since they were queued
+                    while self._heap and self._heap[0][1] not in self._pending:
+                        heapq.heappop(self._heap)
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    wait = self._heap[0][0] - datetime.datetime.now().timestamp()
+                    if wait <= 0:
+                        break
+                    # Capped so a suspended machine or clock change is noticed
+                    self._cond.wait(min(wait, 60))
+                if not self._running:
+                    return
+                _, reminder_id = heapq.heappop(self._heap)
+                reminder = self._pending.pop(reminder_id)
+                self._append({'op': 'fired', 'id': reminder_id})
+
+            lateness = datetime.datetime.now() - datetime.datetime.fromisoformat(reminder['due'])
+            reminder = dict(reminder, missed=lateness.total_seconds() > 60)
+            for listener in self._listeners:
+                try:
+                    listener(reminder)
+                except Exception as e:
+                    logger.error(f"Reminder listener error: {e}")
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout=2)
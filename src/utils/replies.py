@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Reply capture for Jarvis Assistant
+Routes what the assistant says to whoever asked instead of the speakers
+"""
+
+import contextvars
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+ReplySink = Callable[[str, str], None]
+
+_sink: contextvars.ContextVar = contextvars.ContextVar('reply_sink', default=None)
+_details: contextvars.ContextVar = contextvars.ContextVar('reply_details', default=None)
+
+
+@contextmanager
+def capture_replies(sink: ReplySink, details: Optional[Dict] = None):
+    """Send speech produced in this context to ``sink(text, emotion)`` instead of TTS.
+
+    Being a context variable, it follows work handed to the async runner
+    and fan-out threads but not other callers such as the reminder thread.
+    ``details``, if given, collects what ``note_detail`` records about
+    the command, such as the AI backend that answered.
+    """
+    token = _sink.set(sink)
+    details_token = _details.set(details)
+    try:
+        yield
+    finally:
+        _details.reset(details_token)
+        _sink.reset(token)
+
+
+def reply_sink() -> Optional[ReplySink]:
+    return _sink.get()
+
+
+def note_detail(key: str, value):
+    """Record ``key`` for the caller capturing replies; a no-op otherwise."""
+    details = _details.get()
+    if details is not None:
+        details[key] = value
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Retry policy for Jarvis Assistant
+Jittered exponential backoff that honors Retry-After and model-loading hints within a deadline
+"""
+
+import time
+import random
+import asyncio
+import logging
+from typing import Dict, Optional
+
+from src.utils.deadline import current
+from src.utils.metrics import metrics
+from src.utils.quota import parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+# 503 is also what the Hugging Face inference API returns while a model loads
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+
+ai_retries = metrics.counter('jarvis_ai_retries', 'Backend request retries by backend and reason')
+
+
+class RetryableError(Exception):
+    """A transient failure; ``delay_hint`` is the server-suggested wait in seconds."""
+
+    def __init__(self, message: str, status: Optional[int] = None, delay_hint: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.delay_hint = delay_hint
+
+
+def delay_hint(headers, body) -> Optional[float]:
+    """Pick a wait from Retry-After or a Hugging Face ``estimated_time`` field."""
+    hint = parse_retry_after(headers.get('Retry-After')) if headers else None
+    if hint is None and isinstance(body, dict):
+        estimated = body.get('estimated_time')
+        if isinstance(estimated, (int, float)):
+            hint = float(estimated)
+    return hint
+
+
+async def raise_if_retryable(response, name: str):
+    """Raise RetryableError for a transient aiohttp response status."""
+    if response.status not in RETRYABLE_STATUSES:
+        return
+    try:
+        body = await response.json(content_type=None)
+    except Exception:
+        body = None
+    raise RetryableError(f"{name} returned {response.status}", response.status, delay_hint(response.headers, body))
+
+
+def raise_if_retryable_sync(response, name: str):
+    """Raise RetryableError for a transient requests response status."""
+    if response.status_code not in RETRYABLE_STATUSES:
+        return
+    try:
+        body = response.json()
+    except ValueError:
+        body = None
+    raise RetryableError(f"{name} returned {response.status_code}", response.status_code,
+                         delay_hint(response.headers, body))
+
+
+class RetryPolicy:
+    """Retries RetryableError with full-jitter exponential backoff.
+
+    A server hint (Retry-After, estimated_time) replaces the computed backoff.
+    No retry is attempted when the wait would run past the deadline. With a
+    ``quota`` (QuotaTracker), every retry takes a request from the
+    provider's budget like the first attempt did, and retrying stops once
+    the provider is backing off for longer than the wait or out of budget.
+    """
+
+    def __init__(self, config: Dict, quota=None):
+        self.config = config
+        self.quota = quota
+
+    @property
+    def max_attempts(self) -> int:
+        return self.config.get('retry_max_attempts', 3)
+
+    def backoff(self, attempt: int, hint: Optional[float] = None) -> float:
+        base = self.config.get('retry_base_delay', 0.5)
+        cap = self.config.get('retry_max_delay', 20.0)
+        if hint is not None:
+            # Small jitter so concurrent callers don't return in lockstep
+            return min(cap, hint) + random.uniform(0, base)
+        return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+    def _next_delay(self, name: str, attempt: int, error: RetryableError, deadline: float) -> Optional[float]:
+        if attempt + 1 >= self.max_attempts:
+            return None
+        delay = self.backoff(attempt, error.delay_hint)
+        if time.monotonic() + delay >= deadline:
+            logger.info(f"{name}: not retrying, {delay:.1f}s wait exceeds the deadline")
+            return None
+        if self.quota is not None and self.quota.blocked_for(name) > delay:
+            logger.info(f"{name}: not retrying, provider asked to back off")
+            return None
+        reason = 'loading' if error.status == 503 and error.delay_hint else str(error.status or 'error')
+        ai_retries.inc(backend=name, reason=reason)
+        logger.info(f"{name}: {error}; retrying in {delay:.1f}s (attempt {attempt + 2}/{self.max_attempts})")
+        return delay
+
+    def _acquire(self, name: str) -> bool:
+        """Charge a retry to the provider's quota; False means give up."""
+        if self.quota is None or self.quota.acquire(name):
+            return True
+        logger.info(f"{name}: not retrying, over quota or backing off")
+        return False
+
+    def _deadline(self, deadline: Optional[float]) -> float:
+        if deadline is None:
+            deadline = time.monotonic() + self.config.get('retry_budget', 15.0)
+        # Never retry past the command's own deadline
+        command_deadline = current()
+        if command_deadline is not None:
+            deadline = min(deadline, command_deadline.at)
+        return deadline
+
+    async def call_async(self, name: str, fn, *args, deadline: Optional[float] = None):
+        deadline = self._deadline(deadline)
+        attempt = 0
+        while True:
+            try:
+                return await fn(*args)
+            except RetryableError as e:
+                delay = self._next_delay(name, attempt, e, deadline)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                if not self._acquire(name):
+                    raise
+                attempt += 1
+
+    async def stream_async(self, name: str, fn, *args, deadline: Optional[float] = None):
+        """Like call_async for an async generator; only failures before the first item are retried."""
+        deadline = self._deadline(deadline)
+        attempt = 0
+        while True:
+            started = False
+            try:
+                async for item in fn(*args):
+                    started = True
+                    yield item
+                return
+            except RetryableError as e:
+                delay = None if started else self._next_delay(name, attempt, e, deadline)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                if not self._acquire(name):
+                    raise
+                attempt += 1
+
+    def call(self, name: str, fn, *args, deadline: Optional[float] = None):
+        deadline = self._deadline(deadline)
+        attempt = 0
+        while True:
+            try:
+                return fn(*args)
+            except RetryableError as e:
+                delay = self._next_delay(name, attempt, e, deadline)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                if not self._acquire(name):
+                    raise
+                attempt += 1
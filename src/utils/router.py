@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Adaptive backend routing for Jarvis Assistant
+Ranks AI backends per request from EWMA latency, success rate and quota headroom
+"""
+
+import os
+import json
+import time
+import datetime
+import threading
+import logging
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Static preference order, used by the "quality" policy and to break ties
+DEFAULT_PREFERENCE = ['groq', 'ollama', 'together', 'huggingface']
+
+
+class BackendStats:
+    """Running statistics for a single backend."""
+
+    def __init__(self, latency: float = 1.0, success: float = 1.0, calls: int = 0,
+                 failures: int = 0, last_failure: float = 0.0, day: str = '', used_today: int = 0):
+        self.latency = latency
+        self.success = success
+        self.calls = calls
+        self.failures = failures
+        self.last_failure = last_failure
+        self.day = day
+        self.used_today = used_today
+
+    def to_dict(self) -> Dict:
+        return dict(self.__dict__)
+
+
+class BackendRouter:
+    """Chooses the backend order for each AI request under a configurable policy.
+
+    Policies:
+      latency  - minimize expected time to a usable answer
+      quality  - keep the static preference order, skipping backends that are down
+      balanced - expected latency, weighted towards preferred backends
+    """
+
+    def __init__(self, config: Dict, stats_path: str = 'router_stats.json'):
+        self.config = config
+        self.stats_path = stats_path
+        self._lock = threading.Lock()
+        self._stats: Dict[str, BackendStats] = {}
+        self._last_save = 0.0
+        self._headroom_sources: List[Callable[[str], Optional[float]]] = []
+        self._load()
+
+    @property
+    def policy(self) -> str:
+        return self.config.get('router_policy', 'latency')
+
+    def _load(self):
+        try:
+            if os.path.exists(self.stats_path):
+                with open(self.stats_path, 'r') as f:
+                    saved = json.load(f)
+                self._stats = {name: BackendStats(**values) for name, values in saved.items()}
+        except Exception as e:
+            logger.warning(f"Router stats loading error: {e}")
+
+    def save(self):
+        """Persist stats atomically."""
+        with self._lock:
+            data = {name: stats.to_dict() for name, stats in self._stats.items()}
+        try:
+            tmp_path = f"{self.stats_path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, self.stats_path)
+            self._last_save = time.monotonic()
+        except Exception as e:
+            logger.error(f"Router stats saving error: {e}")
+
+    def add_headroom_source(self, source: Callable[[str], Optional[float]]):
+        """Register a callable returning remaining quota (0..1) for a backend, or None."""
+        self._headroom_sources.append(source)
+
+    def _get(self, backend: str) -> BackendStats:
+        stats = self._stats.get(backend)
+        if stats is None:
+            stats = self._stats[backend] = BackendStats(latency=self.config.get('router_prior_latency', 1.0))
+        today = datetime.date.today().isoformat()
+        if stats.day != today:
+            stats.day, stats.used_today = today, 0
+        return stats
+
+    def record(self, backend: str, seconds: float, ok: bool):
+        """Fold one call outcome into the backend's running statistics."""
+        alpha = self.config.get('router_ewma_alpha', 0.3)
+        with self._lock:
+            stats = self._get(backend)
+            stats.calls += 1
+            stats.used_today += 1
+            stats.success = (1 - alpha) * stats.success + alpha * (1.0 if ok else 0.0)
+            if ok:
+                stats.latency = (1 - alpha) * stats.latency + alpha * seconds
+            else:
+                stats.failures += 1
+                stats.last_failure = time.time()
+        if time.monotonic() - self._last_save > self.config.get('router_save_interval', 30):
+            self.save()
+
+    def headroom(self, backend: str) -> float:
+        """Fraction of today's quota left for a backend (1.0 when unlimited)."""
+        for source in self._headroom_sources:
+            value = source(backend)
+            if value is not None:
+                return value
+        return 1.0
+
+    def expected_cost(self, backend: str) -> float:
+        """Expected seconds to a usable answer when starting with this backend."""
+        with self._lock:
+            stats = self._get(backend)
+            latency, success, last_failure = stats.latency, stats.success, stats.last_failure
+
+        # Give failing backends another chance once the probe interval has passed
+        if time.time() - last_failure > self.config.get('router_reprobe_seconds', 300):
+            success = max(success, 0.5)
+
+        failure_penalty = self.config.get('router_failure_penalty', 5.0)
+        cost = latency + (1.0 - success) * failure_penalty
+
+        headroom = self.headroom(backend)
+        if headroom <= 0:
+            return float('inf')
+        reserve = self.config.get('router_quota_reserve', 0.1)
+        if headroom < reserve:
+            cost *= 1 + (reserve - headroom) / reserve * 10
+        return cost
+
+    def rank(self, candidates: List[str]) -> List[str]:
+        """Return candidates ordered best-first for the current policy."""
+        preference = self.config.get('router_preference', DEFAULT_PREFERENCE)
+
+        def preference_index(backend):
+            return preference.index(backend) if backend in preference else len(preference)
+
+        costs = {backend: self.expected_cost(backend) for backend in candidates}
+        usable = [b for b in candidates if costs[b] != float('inf')]
+        exhausted = [b for b in candidates if costs[b] == float('inf')]
+
+        if self.policy == 'quality':
+            ranked = sorted(usable, key=lambda b: (costs[b] > self.config.get('router_failure_penalty', 5.0),
+                                                   preference_index(b)))
+        elif self.policy == 'balanced':
+            ranked = sorted(usable, key=lambda b: costs[b] * (1 + 0.25 * preference_index(b)))
+        else:
+            ranked = sorted(usable, key=lambda b: (costs[b], preference_index(b)))
+        return ranked + exhausted
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Current stats per backend for display."""
+        with self._lock:
+            names = list(self._stats)
+        return {name: {**self._stats[name].to_dict(),
+                       'headroom': self.headroom(name),
+                       'expected_cost': self.expected_cost(name)} for name in names}
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Semantic response cache for Jarvis Assistant
+Reuses AI answers for reworded prompts using local hashed word vectors and cosine similarity
+"""
+
+import os
+import re
+import json
+import time
+import math
+import zlib
+import threading
+import logging
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils.metrics import cache_requests
+
+logger = logging.getLogger(__name__)
+
+DIM = 512
+VERSION = 3  # Bumped whenever embed() or prompt_key() changes, so vectors saved by another version are not reused
+
+# Words that change how a request is phrased but not what is asked, including
+# contraction endings ("what's", "you're") and ASR spellings like "whats"
+FILLER_WORDS = {
+    'a', 'an', 'the', 'please', 'jarvis', 'hey', 'can', 'could', 'would', 'will',
+    'you', 'me', 'tell', 'give', 'show', 'just', 'some', 'kindly', 'let', 'us',
+    'i', 'my', 'your', 'it', 'its', 'this', 'that', 'is', 'are', 'was', 'were', 'be',
+    'do', 'does', 'what', 'whats', 'which', 'of', 'in', 'on', 'at', 'for', 'to', 'about',
+    'like', 'good', 'know', 's', 're', 've', 'll', 'd', 'm'
+}
+
+# Tokens that flip the meaning of an otherwise similar prompt
+NEGATIONS = {'not', 'no', 'never', 't'}
+
+# Filler verbs that still set the tense: "who is" and "who was" ask different things
+PAST_TENSE = {'was', 'were'}
+
+TOP_K = 8  # Candidates checked against their stored words before a lookup misses
+CANDIDATE_MARGIN = 0.25  # How far below the threshold a hashed score may be and still be checked
+
+# Prompt pairs the threshold is calibrated against: rewordings that should
+# share an answer, and near misses that must not
+PARAPHRASES = [
+    ("what's a good joke", "tell me a joke"),
+    ("what is the weather like", "what's the weather like"),
+    ("what is the capital of france", "tell me the capital of france"),
+    ("who wrote hamlet", "jarvis who wrote hamlet"),
+    ("explain quantum computing", "can you explain quantum computing please"),
+    ("whats the speed of light", "what is the speed of light"),
+    ("give me a fun fact", "tell me a fun fact"),
+    ("how far is the moon", "how far away is the moon"),
+]
+NEAR_MISSES = [
+    ("capital of france", "capital of frances"),
+    ("what is the capital of france", "what is the capital of spain"),
+    ("when was einstein born", "where was einstein born"),
+    ("how tall is the eiffel tower", "how old is the eiffel tower"),
+    ("tell me a joke", "tell me a joke about cats"),
+    ("weather in london", "weather in london tomorrow"),
+    ("what is 2 plus 2", "what is 2 plus 3"),
+    ("is it going to rain", "is it not going to rain"),
+    ("who is the president of france", "who was the president of france"),
+]
+
+
+def _tokens(text: str) -> List[str]:
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def content_words(text: str) -> List[str]:
+    """Sorted words of a prompt that say what is asked; filler and negation are left out."""
+    tokens = _tokens(text)
+    words = [t for t in tokens if t not in FILLER_WORDS and t not in NEGATIONS]
+    return sorted(words or tokens)
+
+
+def prompt_key(text: str) -> Tuple[str, ...]:
+    """Numbers, negation and tense in a prompt; a cached answer is only reused when these match."""
+    tokens = _tokens(text)
+    key = sorted(t for t in tokens if t.isdigit())
+    if any(t in NEGATIONS for t in tokens):
+        key.append('not')
+    if any(t in PAST_TENSE for t in tokens):
+        key.append('past')
+    return tuple(key)
+
+
+def similarity(a: List[str], b: List[str]) -> float:
+    """Cosine similarity of two bags of content words."""
+    ca, cb = Counter(a), Counter(b)
+    dot = sum(count * cb[word] for word, count in ca.items())
+    norm = math.sqrt(sum(c * c for c in ca.values()) * sum(c * c for c in cb.values()))
+    return dot / norm if norm else 0.0
+
+
+def match_score(a: str, b: str) -> float:
+    """Similarity of two prompts as the cache judges it; 0.0 when their numbers, negation or tense differ."""
+    if prompt_key(a) != prompt_key(b):
+        return 0.0
+    return similarity(content_words(a), content_words(b))
+
+
+def embed(words: List[str], dim: int = DIM) -> Tuple[np.ndarray, np.ndarray]:
+    """Return a unit vector of signed, hashed content words, plus its non-zero indices.
+
+    Whole words rather than character n-grams, so "france" and "frances"
+    are as different as "france" and "spain". With n-grams that pair scores
+    about 0.90, above genuine rewordings like "how far (away) is the moon",
+    so no threshold separates them; the cost is that a word misspelled by
+    speech recognition misses the cache. crc32 is used instead of hash()
+    so vectors stay comparable across runs.
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    if words:
+        hashes = np.array([zlib.crc32(w.encode('utf-8')) for w in words], dtype=np.int64)
+        signs = np.where((hashes // dim) & 1, -1.0, 1.0).astype(np.float32)
+        np.add.at(vector, hashes % dim, signs)
+    norm = np.linalg.norm(vector)
+    if norm:
+        vector /= norm
+    return vector, np.flatnonzero(vector)
+
+
+class SemanticCache:
+    """Prompt/response cache matched by cosine similarity of content words.
+
+    Vectors live in a memory-mapped, column-major matrix. Queries are short,
+    so a lookup only touches the columns the query vector actually uses,
+    and storing a prompt writes only the few cells its words hash to.
+    The best few candidates are then checked against the exact words stored
+    with them, so a hash collision can cost a hit but never return a wrong
+    answer.
+    Entries are appended to a JSON-lines journal as they change, and
+    last-used times sit in their own memory-mapped array, so saving is a
+    flush rather than a rewrite; the journal is compacted once it holds
+    mostly superseded records. When full, the least recently used entry is
+    replaced.
+    """
+
+    def __init__(self, cache_dir: str = 'semantic_cache', capacity: int = 10000,
+                 threshold: float = 0.85, ttl: Optional[float] = 86400, dim: int = DIM,
+                 save_interval: float = 30.0):
+        self.cache_dir = cache_dir
+        self.capacity = capacity
+        self.threshold = threshold
+        self.ttl = ttl
+        self.dim = dim
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+        self._entries: Dict[int, Dict] = {}
+        self._free: List[int] = []
+        self._size = 0
+        self._last_save = 0.0
+        self._dirty = False
+        self._vectors = None
+        self._journal = None
+        self._records = 0  # Lines in the journal, superseded ones included
+        if capacity > 0:
+            self._open()
+
+    @property
+    def enabled(self) -> bool:
+        return self._vectors is not None
+
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.cache_dir, 'vectors.f32')
+
+    @property
+    def _used_path(self) -> str:
+        return os.path.join(self.cache_dir, 'used.f64')
+
+    @property
+    def _journal_path(self) -> str:
+        return os.path.join(self.cache_dir, 'entries.jsonl')
+
+    def _header(self) -> Dict:
+        return {'version': VERSION, 'dim': self.dim, 'capacity': self.capacity}
+
+    def _open(self):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            saved = self._load_entries()
+            mode = 'r+' if saved is not None else 'w+'
+            self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode=mode,
+                                      shape=(self.capacity, self.dim), order='F')
+            # Last-used wall-clock time per slot; 0 marks an empty slot
+            self._used = np.memmap(self._used_path, dtype=np.float64, mode=mode, shape=(self.capacity,))
+            if saved is None:
+                saved = {}
+                self._write_journal(saved)
+            self._journal = open(self._journal_path, 'a', encoding='utf-8')
+        except Exception as e:
+            logger.error(f"Semantic cache unavailable: {e}")
+            self._vectors = None
+            return
+
+        # Plain ndarray over the same mapping; indexing it skips np.memmap's per-slice overhead
+        self._matrix = np.asarray(self._vectors)
+        self._scores = np.empty(self.capacity, dtype=np.float32)
+        self._column = np.empty(self.capacity, dtype=np.float32)
+        self._entries = saved
+        self._size = max(self._entries) + 1 if self._entries else 0
+        self._free = [slot for slot in range(self._size) if slot not in self._entries]
+        logger.info(f"Semantic cache loaded with {len(self._entries)} entries")
+
+    def _load_entries(self) -> Optional[Dict[int, Dict]]:
+        """Replay the journal; None when the files are missing or were written with another layout."""
+        paths = (self._journal_path, self._vectors_path, self._used_path)
+        if not all(os.path.exists(path) for path in paths):
+            return None
+        try:
+            entries = {}
+            with open(self._journal_path, 'rb+') as f:
+                header = f.readline()
+                if json.loads(header or 'null') != self._header():
+                    logger.info("Semantic cache layout changed, starting empty")
+                    return None
+                self._records = 1
+                good = len(header)
+                for line in f:
+                    try:
+                        if not line.endswith(b'\n'):
+                            raise ValueError('incomplete record')
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # Torn by a crash mid-write; cut it off so appends start on a fresh line
+                    slot = record.pop('slot')
+                    if record.get('dropped'):
+                        entries.pop(slot, None)
+                    else:
+                        entries[slot] = record
+                    self._records += 1
+                    good += len(line)
+                f.truncate(good)
+            if (os.path.getsize(self._vectors_path) != self.capacity * self.dim * 4
+                    or os.path.getsize(self._used_path) != self.capacity * 8):
+                logger.info("Semantic cache layout changed, starting empty")
+                return None
+            if self._records > 2 * len(entries) + 1000:
+                self._write_journal(entries)
+            return entries
+        except Exception as e:
+            logger.warning(f"Semantic cache loading error: {e}")
+            return None
+
+    def _write_journal(self, entries: Dict[int, Dict]):
+        """Replace the journal with one record per live entry."""
+        tmp_path = f"{self._journal_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(self._header()) + '\n')
+            for slot, entry in entries.items():
+                f.write(json.dumps(dict(entry, slot=slot)) + '\n')
+        os.replace(tmp_path, self._journal_path)
+        self._records = len(entries) + 1
+
+    def _append(self, record: Dict):
+        self._journal.write(json.dumps(record) + '\n')
+        self._records += 1
+        self._dirty = True
+
+    def save(self):
+        """Flush vectors, last-used times and the journal; compact the journal when mostly stale."""
+        if not self.enabled or not self._dirty:
+            return
+        with self._lock:
+            try:
+                self._vectors.flush()
+                self._used.flush()
+                self._journal.flush()
+                if self._records > 2 * len(self._entries) + 1000:
+                    self._journal.close()
+                    self._write_journal(self._entries)
+                    self._journal = open(self._journal_path, 'a', encoding='utf-8')
+                self._dirty = False
+                self._last_save = time.monotonic()
+            except Exception as e:
+                logger.error(f"Semantic cache saving error: {e}")
+
+    def _best_match(self, words: List[str], key: List[str], vector: np.ndarray,
+                    nonzero: np.ndarray) -> Tuple[Optional[int], float]:
+        """The slot closest to ``words`` and its exact similarity; (None, 0.0) if there is none.
+
+        Up to TOP_K slots whose hashed score comes near the threshold are
+        rescored on their stored words, skipping any whose key differs.
+        """
+        n = self._size
+        if not n or not len(nonzero):
+            return None, 0.0
+        scores, column = self._scores[:n], self._column[:n]
+        # Rescaling the query does not change the ranking, and most of its
+        # weights are then +/-1, so whole columns are added or subtracted
+        scale = np.abs(vector[nonzero]).min()
+        weights = vector[nonzero] / scale
+        np.multiply(self._matrix[:n, nonzero[0]], weights[0], out=scores)
+        for j, weight in zip(nonzero[1:], weights[1:]):
+            if weight == 1.0:
+                np.add(scores, self._matrix[:n, j], out=scores)
+            elif weight == -1.0:
+                np.subtract(scores, self._matrix[:n, j], out=scores)
+            else:
+                np.multiply(self._matrix[:n, j], weight, out=column)
+                np.add(scores, column, out=scores)
+        candidates = np.flatnonzero(scores >= (self.threshold - CANDIDATE_MARGIN) / scale)
+        if len(candidates) > TOP_K:
+            candidates = candidates[np.argpartition(scores[candidates], -TOP_K)[-TOP_K:]]
+        best, best_score = None, 0.0
+        for slot in candidates.tolist():
+            entry = self._entries.get(slot)
+            if entry is None or entry['key'] != key:
+                continue
+            score = similarity(words, entry['words'])
+            if score > best_score:
+                best, best_score = slot, score
+        return best, best_score
+
+    def _clear_slot(self, slot: int):
+        """Zero the cells of the vector stored in ``slot``, if any."""
+        entry = self._entries.pop(slot, None)
+        if entry is not None:
+            self._matrix[slot, embed(entry['words'], self.dim)[1]] = 0.0
+
+    def _drop(self, slot: int):
+        self._clear_slot(slot)
+        self._used[slot] = 0.0
+        self._free.append(slot)
+        self._append({'slot': slot, 'dropped': True})
+
+    def get(self, prompt: str) -> Optional[str]:
+        """Return the cached response for the closest earlier prompt, if it is close enough."""
+        if not self.enabled:
+            return None
+        words = content_words(prompt)
+        vector, nonzero = embed(words, self.dim)
+        key = list(prompt_key(prompt))
+        with self._lock:
+            slot, score = self._best_match(words, key, vector, nonzero)
+            if slot is None or score < self.threshold:
+                cache_requests.inc(cache='semantic', result='miss')
+                return None
+            entry = self._entries[slot]
+            if self.ttl and time.time() - entry['created'] > self.ttl:
+                self._drop(slot)
+                cache_requests.inc(cache='semantic', result='stale')
+                return None
+            self._used[slot] = time.time()
+            self._dirty = True
+        cache_requests.inc(cache='semantic', result='hit')
+        logger.debug(f"Semantic cache hit ({score:.2f}): '{prompt}' ~ '{entry['prompt']}'")
+        return entry['response']
+
+    def put(self, prompt: str, response: str):
+        """Cache a response, replacing a near-identical prompt or the least recently used entry."""
+        if not self.enabled or not response:
+            return
+        words = content_words(prompt)
+        if not words:
+            return
+        vector, nonzero = embed(words, self.dim)
+        key = list(prompt_key(prompt))
+        with self._lock:
+            slot, score = self._best_match(words, key, vector, nonzero)
+            if slot is None or score < self.threshold:
+                if self._free:
+                    slot = self._free.pop()
+                elif self._size < self.capacity:
+                    slot = self._size
+                    self._size += 1
+                else:
+                    slot = int(np.argmin(self._used[:self._size]))
+            self._clear_slot(slot)
+            self._matrix[slot, nonzero] = vector[nonzero]
+            now = time.time()
+            self._used[slot] = now
+            entry = {'prompt': prompt, 'response': response, 'words': words, 'key': key, 'created': now}
+            self._entries[slot] = entry
+            self._append(dict(entry, slot=slot))
+        if time.monotonic() - self._last_save > self.save_interval:
+            self.save()
+
+    def __len__(self) -> int:
+        return len(self._entries)
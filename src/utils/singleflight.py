@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Request coalescing for Jarvis Assistant
+Concurrent identical calls share one in-flight result instead of repeating the work
+"""
+
+import asyncio
+import inspect
+import functools
+import threading
+import logging
+from concurrent.futures import Future
+from typing import Dict, Hashable
+
+from src.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+coalesced_calls = metrics.counter('jarvis_coalesced_calls', 'Duplicate calls served by an in-flight request')
+
+
+class SingleFlight:
+    """Tracks in-flight calls by key so followers wait for the leader's result.
+
+    Futures are thread-safe, so callers on different threads (and different
+    event loops) can share a result.
+    """
+
+    groups: Dict[str, 'SingleFlight'] = {}
+
+    def __init__(self, name: str):
+        self.name = name
+        self.saved = 0
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        SingleFlight.groups[name] = self
+
+    def _join(self, key: Hashable):
+        """Return (future, is_leader) for a key."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.saved += 1
+                coalesced_calls.inc(group=self.name)
+                return future, False
+            future = self._calls[key] = Future()
+            return future, True
+
+    def _finish(self, key: Hashable):
+        with self._lock:
+            self._calls.pop(key, None)
+
+    def do(self, key: Hashable, fn, *args, **kwargs):
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+        try:
+            result = fn(*args, **kwargs)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._finish(key)
+
+    async def do_async(self, key: Hashable, fn, *args, **kwargs):
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+        try:
+            result = await fn(*args, **kwargs)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._finish(key)
+
+    async def stream_async(self, key: Hashable, fn, *args, **kwargs):
+        """do_async for an async generator: the leader yields items as they come,
+        followers get the leader's complete list once it finishes."""
+        future, leader = self._join(key)
+        if not leader:
+            for item in await asyncio.wrap_future(future):
+                yield item
+            return
+        items = []
+        try:
+            async for item in fn(*args, **kwargs):
+                items.append(item)
+                yield item
+            future.set_result(items)
+        except GeneratorExit:
+            # The leader's consumer stopped early; followers get what was produced
+            future.set_result(items)
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._finish(key)
+
+    @classmethod
+    def total_saved(cls) -> int:
+        return sum(group.saved for group in cls.groups.values())
+
+
+def _method_key(args, kwargs) -> Hashable:
+    # The instance is keyed by identity; remaining arguments must be hashable
+    return (id(args[0]),) + tuple(args[1:]) + tuple(sorted(kwargs.items()))
+
+
+def coalesced(group: str):
+    """Decorate a method (plain, async or async generator) so identical concurrent calls share one execution."""
+    flight = SingleFlight(group)
+
+    def decorator(fn):
+        if inspect.isasyncgenfunction(fn):
+            @functools.wraps(fn)
+            async def stream_wrapper(*args, **kwargs):
+                async for item in flight.stream_async(_method_key(args, kwargs), fn, *args, **kwargs):
+                    yield item
+            stream_wrapper.flight = flight
+            return stream_wrapper
+
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                return await flight.do_async(_method_key(args, kwargs), fn, *args, **kwargs)
+            async_wrapper.flight = flight
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return flight.do(_method_key(args, kwargs), fn, *args, **kwargs)
+        wrapper.flight = flight
+        return wrapper
+
+    return decorator
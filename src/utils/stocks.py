@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Stock price history for Jarvis Assistant
+Caches daily OHLC data locally as NumPy columns and computes trend analytics
+"""
+
+import os
+import re
+import time
+import datetime
+import threading
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import yfinance as yf
+
+from src.utils.metrics import cache_requests
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+# Spoken period -> (calendar days, phrase used in the summary)
+PERIODS = {
+    'today': (1, 'today'),
+    'week': (7, 'over the past week'),
+    'month': (30, 'over the past month'),
+    'quarter': (91, 'over the past quarter'),
+    'year': (365, 'over the past year'),
+}
+
+TREND_PATTERN = re.compile(
+    r"how (?:has|have|did) (?P<symbols>[a-z0-9.,\- ]+?) (?:done|performed|moved|gone)", re.IGNORECASE
+)
+
+TICKER_PATTERN = re.compile(r"^[a-z]{1,5}(?:[.\-][a-z]{1,2})?$", re.IGNORECASE)
+
+# Words that can appear between "how has" and "done" without being tickers
+_FILLER_WORDS = {'and', 'the', 'stock', 'stocks', 'shares', 'my', 'watchlist'}
+
+# Any of these makes every short word in the question a candidate ticker;
+# otherwise only watchlist symbols and words written in capitals count
+MARKET_WORDS = re.compile(r"\b(?:stocks?|shares?|tickers?|market|portfolio|watchlist|ytd)\b")
+
+
+def parse_trend_query(command: str, watchlist: Optional[List[str]] = None) -> Optional[Tuple[List[str], str]]:
+    """Extract ticker symbols and a period name from a trend question.
+
+    ``command`` should keep its original case, so "how has AAPL done"
+    is recognized while "how has your day gone" is not.
+    """
+    lowered = command.lower()
+    watched = {symbol.upper() for symbol in watchlist or []}
+    market = bool(MARKET_WORDS.search(lowered))
+    words = []
+
+    match = TREND_PATTERN.search(command)
+    if match:
+        words = re.split(r"[\s,]+", match.group('symbols'))
+    elif 'trend' in lowered and ' of ' in lowered:
+        tail = command[lowered.index(' of ') + 4:]
+        for period in PERIODS:
+            tail = re.sub(rf"\b(?:this|past|last)?\s*{period}\b", '', tail, flags=re.IGNORECASE)
+        words = re.split(r"[\s,]+", tail)
+
+    symbols = [w.upper() for w in words
+               if TICKER_PATTERN.match(w) and w.lower() not in _FILLER_WORDS
+               and (market or w.isupper() or w.upper() in watched)]
+    if not symbols and match and 'watchlist' in lowered:
+        symbols = sorted(watched)
+
+    if not symbols:
+        return None
+
+    period = 'month'
+    for name in PERIODS:
+        if name in lowered:
+            period = name
+            break
+    if 'ytd' in lowered or 'year to date' in lowered:
+        period = 'ytd'
+
+    return symbols, period
+
+
+class PriceHistory:
+    """Local daily price cache with vectorized analytics across symbols."""
+
+    def __init__(self, cache_dir: str = 'price_cache', history_days: int = 400,
+                 refresh_interval: int = 3600):
+        self.cache_dir = Path(cache_dir)
+        self.history_days = history_days
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._memory: Dict[str, Dict[str, np.ndarray]] = {}
+
+    def _cache_file(self, symbol: str) -> Path:
+        return self.cache_dir / f"{symbol.upper()}.npz"
+
+    def _load(self, symbol: str) -> Optional[Dict[str, np.ndarray]]:
+        """Load cached columns for a symbol from memory or disk."""
+        if symbol in self._memory:
+            return self._memory[symbol]
+
+        path = self._cache_file(symbol)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path) as data:
+                columns = {key: data[key] for key in data.files}
+            self._memory[symbol] = columns
+            return columns
+        except Exception as e:
+            logger.warning(f"Price cache for {symbol} unreadable, refetching: {e}")
+            return None
+
+    def _store(self, symbol: str, columns: Dict[str, np.ndarray]):
+        """Persist columns atomically so a crash never leaves a torn file."""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self._cache_file(symbol)
+            tmp_path = path.with_suffix('.tmp.npz')
+            np.savez(tmp_path, **columns)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"Price cache saving error for {symbol}: {e}")
+        self._memory[symbol] = columns
+
+    def _download(self, symbol: str, start: datetime.date) -> Optional[Dict[str, np.ndarray]]:
+        """Fetch daily bars from yfinance starting at ``start``."""
+        try:
+            frame = yf.Ticker(symbol).history(start=start.isoformat(), interval='1d', auto_adjust=False)
+        except Exception as e:
+            logger.error(f"Price history fetch error for {symbol}: {e}")
+            return None
+
+        if frame is None or frame.empty:
+            return None
+
+        index = frame.index
+        if getattr(index, 'tz', None) is not None:
+            index = index.tz_localize(None)
+        columns = {'date': np.asarray(index.values, dtype='datetime64[D]')}
+        for name in COLUMNS:
+            columns[name] = frame[name.title()].to_numpy(dtype=np.float64)
+        return columns
+
+    def update(self, symbol: str) -> Optional[Dict[str, np.ndarray]]:
+        """Return cached history for a symbol, fetching only the missing range."""
+        symbol = symbol.upper()
+        with self._lock:
+            cached = self._load(symbol)
+            now = time.time()
+
+            if cached is not None and now - float(cached['fetched_at']) < self.refresh_interval:
+                cache_requests.inc(cache='prices', result='hit')
+                return cached
+            cache_requests.inc(cache='prices', result='miss' if cached is None else 'stale')
+
+            if cached is not None and len(cached['date']):
+                # Start at the last cached day, not the one after: if it was
+                # fetched mid-session its bar is partial and needs replacing
+                start = cached['date'][-1].astype(datetime.date)
+            else:
+                start = datetime.date.today() - datetime.timedelta(days=self.history_days)
+
+            fresh = self._download(symbol, start)
+
+            if fresh is None and cached is None:
+                return None
+
+            if cached is None:
+                merged = fresh
+            elif fresh is None:
+                merged = {key: cached[key] for key in ('date',) + COLUMNS}
+            else:
+                merged = {key: np.concatenate([cached[key], fresh[key]]) for key in ('date',) + COLUMNS}
+                # Keep the latest bar for any date fetched twice (e.g. today's partial bar)
+                _, last_idx = np.unique(merged['date'][::-1], return_index=True)
+                keep = len(merged['date']) - 1 - last_idx
+                merged = {key: values[keep] for key, values in merged.items()}
+
+            merged['fetched_at'] = np.float64(now)
+            self._store(symbol, merged)
+            return merged
+
+    def _window_start(self, period: str) -> np.datetime64:
+        today = np.datetime64(datetime.date.today(), 'D')
+        if period == 'ytd':
+            return np.datetime64(f"{datetime.date.today().year}-01-01", 'D')
+        days = PERIODS.get(period, PERIODS['month'])[0]
+        return today - np.timedelta64(days, 'D')
+
+    def analyze(self, symbols: List[str], period: str = 'month', ma_window: int = 20) -> Dict[str, Dict]:
+        """Compute return, moving average, volatility and drawdown for many symbols at once."""
+        histories = {}
+        for symbol in symbols:
+            history = self.update(symbol)
+            if history is not None and len(history['close']):
+                histories[symbol.upper()] = history
+        if not histories:
+            return {}
+
+        names = list(histories)
+        start = self._window_start(period)
+
+        # Left-pad every series with NaN into one (symbols x days) matrix
+        full_len = max(len(h['close']) for h in histories.values())
+        closes = np.full((len(names), full_len), np.nan)
+        in_window = np.zeros((len(names), full_len), dtype=bool)
+        for row, name in enumerate(names):
+            history = histories[name]
+            n = len(history['close'])
+            closes[row, full_len - n:] = history['close']
+            in_window[row, full_len - n:] = history['date'] >= start
+
+        # Include the last close before the window as the baseline for returns
+        first_idx = np.argmax(in_window, axis=1)
+        has_window = in_window.any(axis=1)
+        base_idx = np.maximum(first_idx - 1, 0)
+        baseline_mask = np.zeros_like(in_window)
+        baseline_mask[np.arange(len(names)), base_idx] = has_window
+        window = np.where(in_window | baseline_mask, closes, np.nan)
+
+        rows = np.arange(len(names))
+        last = closes[:, -1]
+        base = closes[rows, base_idx]
+        returns = last / base - 1.0
+
+        # Annualized volatility of daily log returns inside the window
+        with np.errstate(invalid='ignore', divide='ignore'):
+            log_returns = np.diff(np.log(window), axis=1)
+            counts = np.sum(~np.isnan(log_returns), axis=1)
+            means = np.nansum(log_returns, axis=1) / np.maximum(counts, 1)
+            variance = np.nansum((log_returns - means[:, None]) ** 2, axis=1) / np.maximum(counts - 1, 1)
+        volatility = np.sqrt(variance * 252.0)
+        volatility[counts < 2] = np.nan
+
+        # Max drawdown: running peak via fmax.accumulate ignores the NaN padding
+        peaks = np.fmax.accumulate(np.where(np.isnan(window), -np.inf, window), axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            drawdowns = np.where(np.isnan(window), np.nan, window / peaks - 1.0)
+        max_drawdown = np.nanmin(np.where(np.isnan(drawdowns), np.inf, drawdowns), axis=1)
+        max_drawdown[~has_window] = np.nan
+
+        # Trailing simple moving average of the last ``ma_window`` closes
+        tail = closes[:, -ma_window:]
+        tail_counts = np.sum(~np.isnan(tail), axis=1)
+        moving_avg = np.nansum(tail, axis=1) / np.maximum(tail_counts, 1)
+        moving_avg[tail_counts < ma_window] = np.nan
+
+        results = {}
+        for row, name in enumerate(names):
+            results[name] = {
+                'last': float(last[row]),
+                'return': float(returns[row]) if has_window[row] else float('nan'),
+                'moving_average': float(moving_avg[row]),
+                'volatility': float(volatility[row]),
+                'max_drawdown': float(max_drawdown[row]),
+                'period': period,
+            }
+        return results
+
+    def summarize(self, symbols: List[str], period: str = 'month', ma_window: int = 20) -> List[str]:
+        """Build one spoken sentence per symbol."""
+        results = self.analyze(symbols, period, ma_window)
+        phrase = 'so far this year' if period == 'ytd' else PERIODS.get(period, PERIODS['month'])[1]
+
+        summaries = []
+        for symbol in symbols:
+            stats = results.get(symbol.upper())
+            if stats is None:
+                summaries.append(f"I couldn't find price history for {symbol.upper()}.")
+                continue
+
+            sentence = f"{symbol.upper()} is at ${stats['last']:.2f}"
+            if not np.isnan(stats['return']):
+                direction = 'up' if stats['return'] >= 0 else 'down'
+                sentence += f", {direction} {abs(stats['return']) * 100:.1f}% {phrase}"
+            if not np.isnan(stats['moving_average']):
+                relation = 'above' if stats['last'] >= stats['moving_average'] else 'below'
+                sentence += f", {relation} its {ma_window}-day average of ${stats['moving_average']:.2f}"
+            if not np.isnan(stats['volatility']):
+                sentence += f". Volatility is {stats['volatility'] * 100:.0f}% annualized"
+            if not np.isnan(stats['max_drawdown']) and stats['max_drawdown'] < 0:
+                sentence += f" with a maximum drawdown of {abs(stats['max_drawdown']) * 100:.1f}%"
+            summaries.append(sentence + '.')
+        return summaries
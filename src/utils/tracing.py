@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Latency tracing for Jarvis Assistant
+Records timed spans tagged with a turn id and writes them to a JSONL timeline
+"""
+
+import json
+import time
+import itertools
+import threading
+import contextvars
+import logging
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Context variables rather than thread-locals, so the async runner and
+# fan-out workers, which copy the caller's context, keep the caller's turn
+_turn: contextvars.ContextVar = contextvars.ContextVar('trace_turn', default=None)
+_stack: contextvars.ContextVar = contextvars.ContextVar('trace_stack', default=())
+
+
+class Tracer:
+    """Span recorder that costs almost nothing until it is enabled."""
+
+    def __init__(self):
+        self.enabled = False
+        self._file = None
+        self._lock = threading.Lock()
+        self._pending: Dict[str, List[Dict]] = {}
+        self._turn_ids = itertools.count(1)
+        self._session = f"{int(time.time()):x}"
+
+    def enable(self, path: str = 'jarvis_trace.jsonl'):
+        """Start appending span records to ``path``."""
+        self._file = open(path, 'a', buffering=1, encoding='utf-8')
+        self.enabled = True
+        logger.info(f"Tracing enabled, writing to {path}")
+
+    def start_turn(self) -> Optional[str]:
+        """Begin a new turn in the calling context and return its id.
+
+        Ids are handed out even with tracing off so log records can carry them.
+        """
+        turn_id = f"{self._session}-{next(self._turn_ids)}"
+        if self.enabled:
+            with self._lock:
+                self._pending[turn_id] = []
+        _turn.set(turn_id)
+        _stack.set(())
+        return turn_id
+
+    def current_turn(self) -> Optional[str]:
+        return _turn.get()
+
+    def end_turn(self, discard: bool = False):
+        """Flush the current turn's spans, or drop them if nothing happened."""
+        turn_id = self.current_turn()
+        _turn.set(None)
+        if turn_id is None or not self.enabled:
+            return
+        with self._lock:
+            records = self._pending.pop(turn_id, [])
+            if not discard:
+                for record in records:
+                    self._write(record)
+
+    @contextmanager
+    def span(self, name: str, turn_id: Optional[str] = None, **tags):
+        """Time a block of work; callers may add tags to the yielded dict."""
+        if not self.enabled:
+            yield tags
+            return
+
+        turn_id = turn_id or self.current_turn()
+        stack: Tuple[str, ...] = _stack.get()
+        parent = stack[-1] if stack else None
+        token = _stack.set(stack + (name,))
+
+        started = time.time()
+        t0 = time.perf_counter()
+        try:
+            yield tags
+        except Exception as e:
+            tags.setdefault('error', type(e).__name__)
+            raise
+        finally:
+            duration = (time.perf_counter() - t0) * 1000
+            try:
+                _stack.reset(token)
+            except ValueError:
+                # Closed in a different context than it was opened in
+                _stack.set(stack)
+            self._record({
+                'turn': turn_id,
+                'span': name,
+                'parent': parent,
+                'start': round(started, 6),
+                'duration_ms': round(duration, 3),
+                'thread': threading.current_thread().name,
+                **tags
+            })
+
+    def add(self, name: str, duration_ms: float, turn_id: Optional[str] = None, **tags):
+        """Record a span measured elsewhere, e.g. time spent waiting in a queue."""
+        if not self.enabled:
+            return
+        self._record({
+            'turn': turn_id or self.current_turn(),
+            'span': name,
+            'parent': None,
+            'start': round(time.time() - duration_ms / 1000, 6),
+            'duration_ms': round(duration_ms, 3),
+            'thread': threading.current_thread().name,
+            **tags
+        })
+
+    def _record(self, record: Dict):
+        with self._lock:
+            pending = self._pending.get(record['turn'])
+            if pending is not None:
+                pending.append(record)
+            else:
+                # Turn already flushed (e.g. TTS finishing after the command) or no turn
+                self._write(record)
+
+    def _write(self, record: Dict):
+        try:
+            self._file.write(json.dumps(record, default=str) + '\n')
+        except Exception as e:
+            logger.error(f"Trace write error: {e}")
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+        self.enabled = False
+
+
+# Shared tracer; run.py enables it with --trace
+tracer = Tracer()
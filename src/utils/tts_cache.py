@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Speech audio cache for Jarvis Assistant
+Fixed and frequently repeated phrases are rendered to WAV once and replayed from memory
+"""
+
+import os
+import wave
+import hashlib
+import threading
+import logging
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+
+from src.utils.metrics import cache_requests
+
+logger = logging.getLogger(__name__)
+
+_audio = None
+_audio_lock = threading.Lock()
+
+
+class AudioClip:
+    """Decoded PCM audio held in memory."""
+
+    def __init__(self, frames: bytes, channels: int, sample_width: int, rate: int):
+        self.frames = frames
+        self.channels = channels
+        self.sample_width = sample_width
+        self.rate = rate
+
+    @property
+    def duration(self) -> float:
+        return len(self.frames) / float(self.channels * self.sample_width * self.rate)
+
+    @classmethod
+    def from_wav(cls, path: str) -> 'AudioClip':
+        with wave.open(path, 'rb') as wav:
+            return cls(wav.readframes(wav.getnframes()), wav.getnchannels(), wav.getsampwidth(), wav.getframerate())
+
+
+def play_clip(clip: AudioClip, should_stop: Optional[Callable[[], bool]] = None) -> bool:
+    """Play a clip on the default output device; False if audio output is unavailable.
+
+    Audio is written in short chunks so ``should_stop`` can cut playback off.
+    """
+    global _audio
+    try:
+        import pyaudio
+        with _audio_lock:
+            if _audio is None:
+                _audio = pyaudio.PyAudio()
+        stream = _audio.open(format=_audio.get_format_from_width(clip.sample_width),
+                             channels=clip.channels, rate=clip.rate, output=True)
+        chunk = clip.channels * clip.sample_width * (clip.rate // 20)  # 50ms
+        try:
+            for start in range(0, len(clip.frames), chunk):
+                if should_stop and should_stop():
+                    break
+                stream.write(clip.frames[start:start + chunk])
+        finally:
+            stream.stop_stream()
+            stream.close()
+        return True
+    except Exception as e:
+        logger.warning(f"Cached audio playback failed: {e}")
+        return False
+
+
+def voice_signature(config: Dict) -> str:
+    """Short digest of the settings that change how rendered speech sounds."""
+    settings = f"{config.get('voice_id', 0)}|{config.get('voice_volume', 0.9)}"
+    return hashlib.sha1(settings.encode('utf-8')).hexdigest()[:8]
+
+
+class TTSCache:
+    """LRU cache of rendered utterances keyed by text and speaking rate.
+
+    ``render(text, rate, path)`` writes a WAV file with the owner's TTS
+    engine and returns True on success; the owner makes sure that happens on
+    a thread allowed to use the engine. Pinned phrases and phrases spoken
+    ``min_repeats`` times are queued for rendering by ``render_pending``.
+    WAV files are kept in ``cache_dir`` so they survive restarts, and are
+    discarded when the voice settings change.
+    """
+
+    def __init__(self, render: Callable[[str, int, str], bool], cache_dir: str = 'tts_cache',
+                 max_items: int = 64, min_repeats: int = 2, max_chars: int = 120):
+        self.render = render
+        self.cache_dir = cache_dir
+        self.max_items = max_items
+        self.min_repeats = min_repeats
+        self.max_chars = max_chars
+        self.signature = None
+        self._lock = threading.Lock()
+        self._clips: 'OrderedDict[Tuple[str, int], AudioClip]' = OrderedDict()
+        self._wanted: 'OrderedDict[Tuple[str, int], None]' = OrderedDict()
+        self._failed: Set[Tuple[str, int]] = set()
+        self._uses: Counter = Counter()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_items > 0
+
+    def configure(self, config: Dict):
+        """Adopt the current voice settings, dropping audio rendered with different ones."""
+        signature = voice_signature(config)
+        with self._lock:
+            if signature == self.signature:
+                return
+            if self.signature is not None:
+                logger.info("Voice settings changed, clearing cached speech")
+            self.signature = signature
+            self._clips.clear()
+            self._failed.clear()
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            for name in os.listdir(self.cache_dir):
+                if name.endswith('.wav') and not name.startswith(signature):
+                    os.remove(os.path.join(self.cache_dir, name))
+        except OSError as e:
+            logger.warning(f"Speech cache directory error: {e}")
+
+    def _path(self, key: Tuple[str, int]) -> str:
+        digest = hashlib.sha1(f"{key[0]}|{key[1]}".encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{self.signature}-{digest}.wav")
+
+    def _remember(self, key: Tuple[str, int], clip: AudioClip):
+        self._clips[key] = clip
+        self._clips.move_to_end(key)
+        while len(self._clips) > self.max_items:
+            self._clips.popitem(last=False)
+
+    def pin(self, phrases: Iterable[Tuple[str, int]]):
+        """Queue fixed (text, rate) phrases for rendering regardless of use count."""
+        if not self.enabled:
+            return
+        with self._lock:
+            for text, rate in phrases:
+                if (text, rate) not in self._clips:
+                    self._wanted[(text, rate)] = None
+
+    def contains(self, text: str, rate: int) -> bool:
+        """True if the phrase is cached or queued for rendering, without counting a lookup."""
+        key = (text, rate)
+        return key in self._clips or key in self._wanted or (
+            self.signature is not None and os.path.exists(self._path(key)))
+
+    def lookup(self, text: str, rate: int) -> Optional[AudioClip]:
+        """Return cached audio for an utterance, loading it from disk if needed."""
+        if not self.enabled or self.signature is None or len(text) > self.max_chars:
+            return None
+        key = (text, rate)
+        with self._lock:
+            clip = self._clips.get(key)
+            if clip is not None:
+                self._clips.move_to_end(key)
+        if clip is None and os.path.exists(self._path(key)):
+            try:
+                clip = AudioClip.from_wav(self._path(key))
+                with self._lock:
+                    self._remember(key, clip)
+            except Exception as e:
+                logger.warning(f"Cached speech unreadable, re-rendering: {e}")
+                clip = None
+        if clip is not None:
+            cache_requests.inc(cache='tts', result='hit')
+            return clip
+
+        cache_requests.inc(cache='tts', result='miss')
+        with self._lock:
+            if len(self._uses) > 1000:
+                self._uses.clear()
+            self._uses[key] += 1
+            if self._uses[key] >= self.min_repeats and key not in self._failed:
+                self._wanted[key] = None
+        return None
+
+    @property
+    def pending(self) -> bool:
+        return bool(self._wanted)
+
+    def render_pending(self) -> bool:
+        """Render one queued phrase; returns False when nothing is left to do."""
+        with self._lock:
+            if not self._wanted or self.signature is None:
+                return False
+            key, _ = self._wanted.popitem(last=False)
+            if key in self._clips:
+                return True
+        path = self._path(key)
+        try:
+            if not os.path.exists(path):
+                tmp_path = f"{path[:-4]}.tmp.wav"
+                if not self.render(key[0], key[1], tmp_path):
+                    raise RuntimeError("engine produced no audio")
+                os.replace(tmp_path, path)
+            clip = AudioClip.from_wav(path)
+        except Exception as e:
+            # Some drivers cannot write WAV; don't keep retrying the same phrase
+            logger.warning(f"Could not render '{key[0]}' for the speech cache: {e}")
+            with self._lock:
+                self._failed.add(key)
+            return True
+        with self._lock:
+            self._remember(key, clip)
+        logger.debug(f"Cached speech for '{key[0]}' ({clip.duration:.1f}s)")
+        return True
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Voice activity detection for Jarvis Assistant
+Energy and zero-crossing endpointing that ends a phrase as soon as the user stops talking
+"""
+
+import logging
+from collections import deque
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# aggressiveness -> (dB above the noise floor that counts as speech, hangover seconds).
+# Higher values need louder speech and wait less before deciding the phrase is over.
+AGGRESSIVENESS = {
+    0: (6.0, 0.70),
+    1: (8.0, 0.55),
+    2: (10.0, 0.45),
+    3: (12.0, 0.35),
+}
+
+FRICATIVE_ZCR = 0.25    # Zero-crossing rate of unvoiced sounds like "s" and "f"
+MIN_SPEECH_DB = -55.0   # Nothing quieter than this is speech, however quiet the room
+
+
+def frame_features(samples: np.ndarray, frame_length: int):
+    """Short-time energy (dBFS) and zero-crossing rate for each whole frame of int16 samples."""
+    count = len(samples) // frame_length
+    frames = samples[:count * frame_length].reshape(count, frame_length).astype(np.float32) / 32768.0
+    energy = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / float(frame_length - 1)
+    return energy, zcr
+
+
+class Endpointer:
+    """Streaming speech start/end detector over raw 16-bit mono PCM.
+
+    Frames louder than the noise floor by the aggressiveness margin are
+    speech. Quieter frames with a high zero-crossing rate still count once a
+    phrase has started, so trailing fricatives are not cut off. The phrase
+    ends after ``hangover`` seconds without speech. The noise floor follows
+    the background level between phrases, dropping quickly and rising
+    slowly, and is kept across phrases. During a phrase it can only rise,
+    to the quietest frame of the last ``floor_window`` seconds, so
+    background noise that gets louder mid-phrase does not hold it open.
+    """
+
+    def __init__(self, sample_rate: int, aggressiveness: int = 1, frame_ms: int = 20,
+                 min_speech: float = 0.06, floor_window: float = 2.0):
+        self.sample_rate = sample_rate
+        self.frame_length = max(1, sample_rate * frame_ms // 1000)
+        self.frame_seconds = self.frame_length / float(sample_rate)
+        self.margin, hangover = AGGRESSIVENESS[max(0, min(3, int(aggressiveness)))]
+        self.hangover_frames = max(1, int(round(hangover / self.frame_seconds)))
+        self.min_speech_frames = max(1, int(round(min_speech / self.frame_seconds)))
+        self.floor_frames = max(1, int(round(floor_window / self.frame_seconds)))
+        self.noise_floor: Optional[float] = None
+        self._pending = np.zeros(0, dtype=np.int16)
+        self.reset()
+
+    def reset(self):
+        """Start a new phrase; the learned noise floor is kept."""
+        self._pending = np.zeros(0, dtype=np.int16)
+        self.frames = 0          # Frames seen in this phrase
+        self.in_speech = False
+        self.done = False
+        self.speech_end = None    # Frame index just after the last speech frame
+        self._run = 0             # Consecutive loud frames before speech starts
+        self._silence = 0         # Consecutive non-speech frames during speech
+        self._recent = deque(maxlen=self.floor_frames)  # Energies since speech started
+
+    def _update_floor(self, energy: float):
+        if self.noise_floor is None:
+            self.noise_floor = energy
+        elif energy < self.noise_floor:
+            self.noise_floor += 0.3 * (energy - self.noise_floor)
+        else:
+            self.noise_floor += 0.02 * (energy - self.noise_floor)
+
+    def feed(self, data: bytes) -> bool:
+        """Process a chunk of audio; returns True once the phrase has ended."""
+        if self.done:
+            return True
+        samples = np.frombuffer(data, dtype=np.int16)
+        if len(self._pending):
+            samples = np.concatenate((self._pending, samples))
+        energies, zcrs = frame_features(samples, self.frame_length)
+        self._pending = samples[len(energies) * self.frame_length:]
+
+        for energy, zcr in zip(energies.tolist(), zcrs.tolist()):
+            floor = self.noise_floor if self.noise_floor is not None else energy
+            loud = energy > max(floor + self.margin, MIN_SPEECH_DB)
+            self.frames += 1
+            if not self.in_speech:
+                if loud:
+                    self._run += 1
+                    if self._run >= self.min_speech_frames:
+                        self.in_speech = True
+                        self.speech_end = self.frames
+                        self._silence = 0
+                else:
+                    self._run = 0
+                    self._update_floor(energy)
+                continue
+
+            self._recent.append(energy)
+            if len(self._recent) == self.floor_frames:
+                self.noise_floor = max(floor, min(self._recent))
+                floor = self.noise_floor
+                loud = energy > max(floor + self.margin, MIN_SPEECH_DB)
+            fricative = zcr > FRICATIVE_ZCR and energy > max(floor + self.margin / 2, MIN_SPEECH_DB)
+            if loud or fricative:
+                self._silence = 0
+                self.speech_end = self.frames
+            else:
+                self._silence += 1
+                if self._silence >= self.hangover_frames:
+                    self.done = True
+                    return True
+        return False
+
+
+def capture_phrase(source, endpointer: Endpointer, timeout: Optional[float] = None,
+                   phrase_time_limit: Optional[float] = None, padding: float = 0.3) -> Optional[bytes]:
+    """Read one phrase from a speech_recognition source, ending it with ``endpointer``.
+
+    Returns the raw PCM of the phrase with ``padding`` seconds of audio on
+    either side, or None if no speech started within ``timeout`` seconds of
+    audio. The rest of the hangover silence is trimmed so STT gets less audio.
+    """
+    seconds_per_chunk = float(source.CHUNK) / source.SAMPLE_RATE
+    lead = deque(maxlen=max(1, int(np.ceil(padding / seconds_per_chunk))))
+    frames = []
+    waited = 0.0
+    spoken = 0.0
+    fed = 0  # Samples given to the endpointer
+    endpointer.reset()
+
+    while True:
+        chunk = source.stream.read(source.CHUNK)
+        if not chunk:
+            break  # Stream ended
+        finished = endpointer.feed(chunk)
+        fed += len(chunk) // 2
+        if not endpointer.in_speech:
+            lead.append(chunk)
+            waited += seconds_per_chunk
+            if timeout and waited > timeout:
+                return None
+            continue
+        if not frames:
+            frames.extend(lead)
+            lead.clear()
+        frames.append(chunk)
+        spoken += seconds_per_chunk
+        if finished or (phrase_time_limit and spoken >= phrase_time_limit):
+            break
+
+    if not frames:
+        return None
+    audio = b"".join(frames)
+    if endpointer.done:
+        keep = (endpointer.speech_end + int(padding / endpointer.frame_seconds)) * endpointer.frame_length
+        tail = min(fed - keep, len(audio) // 2 - 1)
+        if tail > 0:
+            audio = audio[:len(audio) - tail * 2]
+    return audio
@@ -4,33 +4,77 @@ Voice utilities for Jarvis Assistant
 Handles text-to-speech and speech-to-text with threading and fallbacks
 """
 
+import os
+import time
+import itertools
 import threading
 import queue
 import speech_recognition as sr
 import pyttsx3
 import logging
 
+from src.utils.metrics import (stt_latency, stt_requests, tts_coalesced, tts_interruptions, tts_queue_depth,
+                               tts_queue_wait)
+from src.utils.audio_source import open_audio_source
+from src.utils.capture import ContinuousMicrophone
+from src.utils.replies import reply_sink
+from src.utils.tracing import tracer
+from src.utils.tts_cache import TTSCache, play_clip
+from src.utils.vad import Endpointer, capture_phrase
+
 logger = logging.getLogger(__name__)
 
+# Speech priorities; lower values are spoken first
+URGENT = 0      # Acknowledgements and reminders
+NORMAL = 1
+LOW = 2         # Long readouts such as news items
+_SHUTDOWN = 99  # Queued behind everything so pending speech finishes
+
+
 class Voice:
     def __init__(self, config):
         """Initialize voice system with configuration."""
         self.config = config
         
-        # Initialize TTS engine
-        try:
-            self.tts = pyttsx3.init()
-            self._setup_tts()
-        except Exception as e:
-            logger.error(f"TTS initialization failed: {e}")
-            self.tts = None
+        # Initialize TTS engine; batch jobs turn it off and capture replies instead
+        self.tts = None
+        if config.get('tts_enabled', True):
+            try:
+                self.tts = pyttsx3.init()
+                self._setup_tts()
+                self.tts.connect('started-word', self._on_word)
+            except Exception as e:
+                logger.error(f"TTS initialization failed: {e}")
+                self.tts = None
         
         # Initialize STT components
         self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone()
+        # Created on first listen, so batch and daemon runs need no PyAudio or input device
+        self._microphone = None
+        # Opened and calibrated once, then kept buffering between listens
+        self._capture = ContinuousMicrophone(None, pre_roll=config.get('voice_pre_roll', 2.0))
+        self._endpointer = None  # Created on first listen, once the sample rate is known
+        # Half-duplex: audio captured while Jarvis talks (or echoes) is never transcribed
+        self.half_duplex = config.get('voice_half_duplex', True)
+        self.echo_tail = config.get('voice_echo_tail', 0.3)
+        self.last_spoke = 0.0  # time.monotonic() when the last utterance finished
+        self._tts_stale = False  # Voice or volume edited; re-applied by the speech worker
+        
+        # Rendered audio for fixed and frequently repeated phrases
+        self.tts_cache = TTSCache(
+            self._render_to_file,
+            cache_dir=config.get('tts_cache_dir', 'tts_cache'),
+            max_items=config.get('tts_cache_size', 64),
+            min_repeats=config.get('tts_cache_min_repeats', 2)
+        )
+        self.tts_cache.configure(config)
         
-        # Threading setup for non-blocking TTS
-        self._speech_queue = queue.Queue()
+        # Threading setup for non-blocking TTS; items are
+        # (priority, sequence, text, emotion, turn_id, queued_at)
+        self._speech_queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._speaking = threading.Event()
+        self._interrupted = threading.Event()
         self._speech_thread = threading.Thread(target=self._speech_worker, daemon=True)
         self._speech_thread.start()
         
@@ -52,83 +96,212 @@ class Voice:
         except Exception as e:
             logger.warning(f"TTS setup warning: {e}")
 
+    def _rate_for(self, emotion):
+        """Speaking rate adjusted for emotion."""
+        base_rate = self.config.get('voice_rate', 200)
+        if emotion == 'excited':
+            return base_rate + 20
+        elif emotion == 'calm':
+            return base_rate - 20
+        return base_rate
+
+    def _render_to_file(self, text, rate, path):
+        """Render speech to a WAV file; only called from the speech worker."""
+        self.tts.setProperty('rate', rate)
+        self.tts.save_to_file(text, path)
+        self.tts.runAndWait()
+        return os.path.exists(path) and os.path.getsize(path) > 44
+
+    def _on_word(self, name, location, length):
+        # pyttsx3 only allows stop() from inside its own run loop
+        if self._interrupted.is_set():
+            self.tts.stop()
+
+    def _record_wait(self, item):
+        waited = time.perf_counter() - item[5]
+        tts_queue_wait.observe(waited)
+        tracer.add('tts.queue_wait', waited * 1000, turn_id=item[4])
+
+    def _coalesce(self, first):
+        """Merge queued short utterances that follow ``first`` into one synthesis call.
+
+        Only items with the same priority and emotion are merged, and never
+        phrases that have pre-rendered audio.
+        """
+        priority, _, text, emotion, turn_id, _ = first
+        limit = self.config.get('tts_coalesce_chars', 240)
+        rate = self._rate_for(emotion)
+        if len(text) >= limit or self.tts_cache.contains(text, rate):
+            return text
+        
+        parts = [text]
+        total = len(text)
+        while True:
+            try:
+                item = self._speech_queue.get_nowait()
+            except queue.Empty:
+                break
+            next_text = item[2]
+            if (item[0] != priority or item[3] != emotion or not next_text
+                    or total + len(next_text) > limit or self.tts_cache.contains(next_text, rate)):
+                # Not mergeable; the (priority, sequence) key puts it back in the same place
+                self._speech_queue.put(item)
+                self._speech_queue.task_done()
+                break
+            self._record_wait(item)
+            parts.append(next_text)
+            total += len(next_text) + 1
+            self._speech_queue.task_done()
+        
+        if len(parts) > 1:
+            tts_coalesced.inc(len(parts) - 1)
+        return " ".join(parts)
+
     def _speech_worker(self):
         """Background worker for TTS processing."""
         while True:
             try:
-                text, emotion = self._speech_queue.get()
+                # Render cached phrases only while there is nothing to say
+                item = self._speech_queue.get(timeout=0.1 if self.tts_cache.pending else None)
+            except queue.Empty:
+                if self.tts:
+                    self.tts_cache.render_pending()
+                continue
+            
+            try:
+                priority, _, text, emotion, turn_id, _ = item
                 if text is None:  # Shutdown signal
                     break
                 
-                if self.tts:
-                    # Adjust rate based on emotion
-                    base_rate = self.config.get('voice_rate', 200)
-                    if emotion == 'excited':
-                        rate = base_rate + 20
-                    elif emotion == 'calm':
-                        rate = base_rate - 20
-                    else:
-                        rate = base_rate
+                if self.tts and text:
+                    self._record_wait(item)
+                    self._speaking.set()
+                    text = self._coalesce(item)
+                    tts_queue_depth.set(self._speech_queue.qsize())
+                    if self._tts_stale:
+                        self._tts_stale = False
+                        self._setup_tts()
+                    rate = self._rate_for(emotion)
+                    self.tts_cache.configure(self.config)
+                    clip = self.tts_cache.lookup(text, rate)
                     
-                    self.tts.setProperty('rate', rate)
-                    self.tts.say(text)
-                    self.tts.runAndWait()
+                    with tracer.span('tts.speak', turn_id=turn_id, chars=len(text), cached=clip is not None) as span:
+                        if clip is None or not play_clip(clip, self._interrupted.is_set):
+                            self.tts.setProperty('rate', rate)
+                            self.tts.say(text)
+                            self.tts.runAndWait()
+                        span['interrupted'] = self._interrupted.is_set()
                 
             except Exception as e:
                 logger.error(f"TTS worker error: {e}")
             finally:
+                if self._speaking.is_set():
+                    self.last_spoke = time.monotonic()
+                self._speaking.clear()
+                self._interrupted.clear()
                 self._speech_queue.task_done()
 
-    def speak(self, text, emotion='neutral'):
-        """Queue text for speech synthesis."""
+    def reconfigure(self, changed):
+        """Apply edited settings; the TTS engine itself is only touched by the speech worker."""
+        self.half_duplex = self.config.get('voice_half_duplex', True)
+        self.echo_tail = self.config.get('voice_echo_tail', 0.3)
+        if changed & {'voice_id', 'voice_volume'}:
+            self._tts_stale = True
+        if 'vad_aggressiveness' in changed:
+            self._endpointer = None  # Rebuilt on the next listen
+
+    def warm(self, phrases):
+        """Pre-render (text, emotion) phrases in the background so they play instantly."""
+        if not self.tts:
+            return
+        self.tts_cache.pin((text, self._rate_for(emotion)) for text, emotion in phrases)
+        # Wake the worker so it starts rendering while idle
+        self._speech_queue.put((LOW, next(self._sequence), '', None, None, time.perf_counter()))
+
+    def speak(self, text, emotion='neutral', priority=NORMAL):
+        """Queue text for speech synthesis; lower priority values are spoken first."""
+        sink = reply_sink()
+        if sink is not None:
+            # Answering a daemon client or batch job rather than the room
+            sink(text, emotion)
+            return
         print(f"🗣️ Jarvis ({emotion}): {text}")
         
         if self.tts:
-            self._speech_queue.put((text, emotion))
+            self._speech_queue.put((priority, next(self._sequence), text, emotion,
+                                    tracer.current_turn(), time.perf_counter()))
+            tts_queue_depth.set(self._speech_queue.qsize())
         else:
             logger.warning("TTS not available, text-only output")
 
-    def listen(self, timeout=5, phrase_time_limit=10, offline_fallback=False):
-        """Listen for voice input with proper timeout handling."""
+    def flush(self, min_priority=NORMAL):
+        """Drop queued utterances at ``min_priority`` or below; returns how many were dropped."""
+        kept, dropped = [], 0
+        while True:
+            try:
+                item = self._speech_queue.get_nowait()
+            except queue.Empty:
+                break
+            if item[0] < min_priority or item[2] is None:
+                kept.append(item)
+            elif item[2]:
+                dropped += 1
+            self._speech_queue.task_done()
+        for item in kept:
+            self._speech_queue.put(item)
+        tts_queue_depth.set(self._speech_queue.qsize())
+        return dropped
+
+    def interrupt(self):
+        """Stop the utterance currently being spoken, if any."""
+        if self._speaking.is_set():
+            self._interrupted.set()
+            return True
+        return False
+
+    def barge_in(self):
+        """Silence Jarvis when the user starts talking: flush queued speech and cut off the current one."""
+        dropped = self.flush(min_priority=URGENT + 1)
+        stopped = self.interrupt()
+        if dropped or stopped:
+            tts_interruptions.inc(dropped + int(stopped))
+            logger.info(f"Barge-in: stopped current speech={stopped}, dropped {dropped} queued")
+
+    @property
+    def is_speaking(self):
+        return self._speaking.is_set()
+
+    def listen(self, timeout=5, phrase_time_limit=10, offline_fallback=False, pre_roll=None):
+        """Listen for voice input with proper timeout handling.
+
+        ``pre_roll`` limits how much already-buffered audio is included
+        (default ``voice_pre_roll``); 0 starts from live audio.
+        """
+        audio = self.record(timeout, phrase_time_limit, pre_roll)
+        if audio is None:
+            return None
+        return self.recognize(audio, offline_fallback)
+
+    def record(self, timeout=5, phrase_time_limit=10, pre_roll=None):
+        """Capture one phrase from the microphone; None if nobody spoke."""
         try:
-            with self.microphone as source:
-                print("🎤 Listening...")
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                
-                # Handle timeout at the listening level
-                try:
-                    audio = self.recognizer.listen(
-                        source, 
-                        timeout=timeout, 
-                        phrase_time_limit=phrase_time_limit
-                    )
-                except sr.WaitTimeoutError:
-                    # Normal timeout - no speech detected, not an error
-                    return None
-            
-            print("🔄 Processing speech...")
-            
-            # Try Google Speech Recognition first (unless offline forced)
-            if not offline_fallback:
-                try:
-                    text = self.recognizer.recognize_google(audio).lower()
-                    print(f"👤 You said: {text}")
-                    return text
-                except sr.RequestError as e:
-                    print(f"⚠️ Google STT failed: {e}. Trying offline fallback...")
-                    # Fall through to offline recognition
-                except sr.UnknownValueError:
-                    print("⚠️ Google STT could not understand audio.")
-                    return None
+            if not self._capture.is_open:
+                self._capture.microphone = self.microphone
+                with tracer.span('listen.calibrate'):
+                    self._capture.open(self.recognizer)
+            if self.half_duplex:
+                # Never rewind into audio of Jarvis talking
+                pre_roll = self._capture.pre_roll if pre_roll is None else pre_roll
+                pre_roll = max(0.0, min(pre_roll, time.monotonic() - self.last_spoke - self.echo_tail))
+            source = self._capture.source(self.recognizer, pre_roll)
+            print("🎤 Listening...")
             
-            # Offline fallback using PocketSphinx
+            # Handle timeout at the listening level
             try:
-                print("🔄 Processing with PocketSphinx (offline)...")
-                text = self.recognizer.recognize_sphinx(audio).lower()
-                print(f"👤 (offline) You said: {text}")
-                return text
-            except Exception as e:
-                logger.warning(f"Offline STT failed: {e}")
+                with tracer.span('listen.capture', timeout=timeout):
+                    return self._record_phrase(source, timeout, phrase_time_limit)
+            except sr.WaitTimeoutError:
+                # Normal timeout - no speech detected, not an error
                 return None
             
         except Exception as e:
@@ -136,8 +309,89 @@ class Voice:
             logger.error(f"Unexpected listening error: {e}")
             return None
 
+    def recognize(self, audio, offline_fallback=False):
+        """Transcribe recorded audio, falling back to offline recognition."""
+        print("🔄 Processing speech...")
+        
+        # Try Google Speech Recognition first (unless offline forced)
+        if not offline_fallback:
+            started = time.perf_counter()
+            try:
+                with tracer.span('stt.google'):
+                    text = self.recognizer.recognize_google(audio).lower()
+                self._record_stt('google', started, 'ok')
+                print(f"👤 You said: {text}")
+                return text
+            except sr.RequestError as e:
+                self._record_stt('google', started, 'error')
+                print(f"⚠️ Google STT failed: {e}. Trying offline fallback...")
+                # Fall through to offline recognition
+            except sr.UnknownValueError:
+                self._record_stt('google', started, 'unintelligible')
+                print("⚠️ Google STT could not understand audio.")
+                return None
+            except Exception as e:
+                self._record_stt('google', started, 'error')
+                logger.error(f"Unexpected speech recognition error: {e}")
+                return None
+        
+        # Offline fallback using PocketSphinx
+        started = time.perf_counter()
+        try:
+            print("🔄 Processing with PocketSphinx (offline)...")
+            with tracer.span('stt.sphinx'):
+                text = self.recognizer.recognize_sphinx(audio).lower()
+            self._record_stt('sphinx', started, 'ok')
+            print(f"👤 (offline) You said: {text}")
+            return text
+        except Exception as e:
+            self._record_stt('sphinx', started, 'error')
+            logger.warning(f"Offline STT failed: {e}")
+            return None
+
+    @property
+    def microphone(self):
+        """The audio source: the microphone, or recorded audio when ``audio_input`` is set."""
+        if self._microphone is None:
+            self._microphone = open_audio_source(self.config)
+        return self._microphone
+
+    @property
+    def input_position(self):
+        """Seconds of input audio listened through so far."""
+        return self._capture.position
+
+    @property
+    def input_ended(self):
+        """True when recorded input has been played to the end; a microphone never ends."""
+        return self._capture.exhausted
+
+    def heard_itself(self, since):
+        """True if Jarvis spoke (plus its echo) at any point after ``since`` (time.monotonic())."""
+        return self.is_speaking or self.last_spoke + self.echo_tail > since
+
+    def _record_phrase(self, source, timeout, phrase_time_limit):
+        """Record one phrase, ending it with the VAD endpointer when enabled.
+
+        Raises sr.WaitTimeoutError like Recognizer.listen when nobody speaks.
+        """
+        if not self.config.get('vad_enabled', True) or source.SAMPLE_WIDTH != 2:
+            return self.recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
+        if self._endpointer is None:
+            self._endpointer = Endpointer(source.SAMPLE_RATE, self.config.get('vad_aggressiveness', 1))
+        frames = capture_phrase(source, self._endpointer, timeout, phrase_time_limit)
+        if frames is None:
+            raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+        return sr.AudioData(frames, source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+
+    def _record_stt(self, engine, started, outcome):
+        stt_latency.observe(time.perf_counter() - started, engine=engine)
+        stt_requests.inc(engine=engine, outcome=outcome)
+
     def shutdown(self):
         """Gracefully shutdown voice system."""
         if hasattr(self, '_speech_queue'):
-            self._speech_queue.put((None, None))  # Shutdown signal
+            self._speech_queue.put((_SHUTDOWN, next(self._sequence), None, None, None, time.perf_counter()))
+        if hasattr(self, '_capture'):
+            self._capture.close()
         logger.info("Voice system shutdown")
\ No newline at end of file
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Pipelined voice loop for Jarvis Assistant
+Capture, speech-to-text and command execution run as separate stages so the microphone never stops
+"""
+
+import time
+import queue
+import threading
+import logging
+from typing import Callable, Dict, Optional
+
+from src.utils.metrics import voice_dropped, voice_queue_depth
+from src.utils.tracing import tracer
+from src.utils.voice import URGENT
+from src.utils.wake_word import is_stop_request, split_wake_word
+
+logger = logging.getLogger(__name__)
+
+POLICIES = ('block', 'drop_oldest', 'drop_newest')
+COMMAND_WINDOW = 15.0  # Seconds to give a command after a bare wake word
+QUIT_WORDS = ('quit', 'exit', 'goodbye')
+
+
+class StageQueue:
+    """Bounded hand-off between two pipeline stages.
+
+    When full, ``block`` makes the producer wait (backpressure),
+    ``drop_oldest`` discards the stalest item and ``drop_newest`` discards
+    the incoming one. Items older than ``ttl`` seconds are dropped on
+    ``get`` instead of being handed to a consumer that fell behind.
+    """
+
+    def __init__(self, stage: str, maxsize: int = 3, policy: str = 'block', ttl: Optional[float] = None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown drop policy '{policy}', expected one of {POLICIES}")
+        self.stage = stage
+        self.policy = policy
+        self.ttl = ttl
+        self._queue = queue.Queue(maxsize=max(1, maxsize))
+
+    def put(self, item, stop: threading.Event) -> bool:
+        """Queue ``(created_at, payload)``; False if it was dropped."""
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                voice_queue_depth.set(self._queue.qsize(), stage=self.stage)
+                return True
+            except queue.Full:
+                pass
+            if self.policy == 'drop_newest':
+                self._drop('full')
+                return False
+            if self.policy == 'drop_oldest':
+                try:
+                    self._queue.get_nowait()
+                    self._drop('full')
+                except queue.Empty:
+                    pass
+                continue
+            if stop.wait(0.05):
+                return False
+
+    def get(self, timeout: float):
+        """Next fresh ``(created_at, payload)``, or None if nothing arrived in time."""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                return None
+            voice_queue_depth.set(self._queue.qsize(), stage=self.stage)
+            if self.ttl and time.monotonic() - item[0] > self.ttl:
+                self._drop('stale')
+                continue
+            return item
+
+    def empty(self) -> bool:
+        return self._queue.empty()
+
+    def _drop(self, reason: str):
+        voice_dropped.inc(stage=self.stage, reason=reason)
+        logger.warning(f"Voice pipeline dropped an item at {self.stage} ({reason})")
+
+
+class VoicePipeline:
+    """Capture -> STT -> execute, each stage on its own thread.
+
+    The capture thread records phrases back to back; while one is being
+    transcribed or executed the next is already being recorded. Capture
+    keeps running while Jarvis speaks so the user can talk over it. With
+    ``voice_half_duplex`` on, a phrase that overlapped Jarvis's speech is
+    only kept if its transcript contains the wake word, so Jarvis never
+    answers itself but "Jarvis, stop" still barges in. Wake-word handling
+    happens at the STT stage, so it is acted on even while a command is
+    still running.
+
+    ``handle(command)`` runs on the thread that calls ``run`` and returns
+    False to end the loop.
+    """
+
+    def __init__(self, voice, handle: Callable[[str], bool], config: Dict):
+        self.voice = voice
+        self.handle = handle
+        self.config = config  # Read per phrase so wake-word edits apply live
+        size = config.get('voice_queue_size', 3)
+        self.utterances = StageQueue('stt', size, config.get('voice_capture_policy', 'block'))
+        self.commands = StageQueue('execute', size, config.get('voice_command_policy', 'drop_oldest'),
+                                   ttl=config.get('voice_command_ttl', 20))
+        self._stop = threading.Event()
+        # Set in turn as recorded input runs out and each stage drains
+        self._captured = threading.Event()
+        self._transcribed = threading.Event()
+        self._awaiting_until = 0.0
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name='voice-capture', daemon=True),
+            threading.Thread(target=self._stt_loop, name='voice-stt', daemon=True),
+        ]
+
+    def _capture_loop(self):
+        while not self._stop.is_set():
+            if self.voice.input_ended:
+                self._captured.set()
+                return
+            started = time.monotonic()
+            audio = self.voice.record(timeout=1, phrase_time_limit=10)
+            if audio is None:
+                continue
+            # Judged after STT: an overlapping phrase may still be the user saying the wake word
+            echo = self.voice.half_duplex and self.voice.heard_itself(started)
+            self.utterances.put((time.monotonic(), (audio, time.monotonic() - started, echo)), self._stop)
+
+    def _stt_loop(self):
+        while not self._stop.is_set():
+            item = self.utterances.get(timeout=0.5)
+            if item is None:
+                if self._captured.is_set() and self.utterances.empty():
+                    self._transcribed.set()
+                    return
+                continue
+            captured_at, (audio, capture_seconds, echo) = item
+            queued = time.monotonic() - captured_at
+            started = time.monotonic()
+            text = self.voice.recognize(audio)
+            if not text:
+                continue
+            timings = {'capture': capture_seconds, 'stt_queue': queued, 'stt': time.monotonic() - started}
+            command = self._command_from(text, echo)
+            if command:
+                self.commands.put((time.monotonic(), (command, timings)), self._stop)
+
+    def _command_from(self, text: str, echo: bool = False) -> Optional[str]:
+        """Apply wake-word rules to a transcript; returns the command to execute, if any.
+
+        ``echo`` marks a phrase recorded while Jarvis was talking; without
+        the wake word it is most likely Jarvis hearing itself and is dropped.
+        """
+        remainder = split_wake_word(text, self.config['wake_word'], self.config.get('wake_word_aliases', []))
+        if remainder is None:
+            if echo:
+                voice_dropped.inc(stage='stt', reason='echo')
+                return None
+            if time.monotonic() < self._awaiting_until:
+                self._awaiting_until = 0.0
+                return text
+            if any(word in text for word in QUIT_WORDS):
+                return text
+            return None
+
+        # The user talking over Jarvis cuts it off
+        self.voice.barge_in()
+        if is_stop_request(remainder):
+            return None
+        if not remainder:
+            self.voice.speak("Yes? I'm listening.", 'attentive', URGENT)
+            self._awaiting_until = time.monotonic() + COMMAND_WINDOW
+            return None
+        self._awaiting_until = 0.0
+        return remainder
+
+    def run(self):
+        """Start capture and STT, then execute commands until ``handle`` returns False.
+
+        With recorded input, also returns once every utterance has been handled.
+        """
+        for thread in self._threads:
+            thread.start()
+        try:
+            while not self._stop.is_set():
+                item = self.commands.get(timeout=0.5)
+                if item is None:
+                    if self._transcribed.is_set() and self.commands.empty():
+                        break
+                    continue
+                queued_at, (command, timings) = item
+                tracer.start_turn()
+                try:
+                    for stage, seconds in timings.items():
+                        tracer.add(f"pipeline.{stage}", seconds * 1000)
+                    tracer.add('pipeline.execute_queue', (time.monotonic() - queued_at) * 1000)
+                    if not self.handle(command):
+                        break
+                finally:
+                    tracer.end_turn()
+        finally:
+            self.stop()
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            if thread.is_alive() and thread is not threading.current_thread():
+                thread.join(timeout=2)
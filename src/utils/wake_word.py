@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Wake word handling for Jarvis Assistant
+Finds the wake word inside an utterance so the rest of it can be run as the command
+"""
+
+import re
+from typing import Iterable, Optional
+
+# Said right after the wake word to silence Jarvis rather than to give a command
+STOP_PHRASES = {'stop', 'quiet', 'be quiet', 'enough', 'shut up', 'cancel', 'never mind', 'nevermind'}
+
+
+def split_wake_word(transcript: str, wake_word: str, aliases: Iterable[str] = ()) -> Optional[str]:
+    """Return what follows the wake word, '' if nothing does, or None if it was not said.
+
+    "hey jarvis, what time is it" -> "what time is it". Anything before the
+    wake word is ignored. ``aliases`` covers common mis-transcriptions.
+    """
+    names = [wake_word] + [alias for alias in aliases if alias]
+    pattern = r"\b(?:" + "|".join(re.escape(name.lower()) for name in names) + r")(?:'s)?\b[\s,.!?:;-]*"
+    match = re.search(pattern, transcript.lower())
+    if match is None:
+        return None
+    return transcript[match.end():].strip()
+
+
+def is_stop_request(text: str) -> bool:
+    """True for a short request to be quiet, e.g. "stop" or "quiet please"."""
+    words = text.lower().strip(" .!").split()
+    if not words or len(words) > 3:
+        return False
+    return any(" ".join(words[:n]) in STOP_PHRASES for n in (1, 2))
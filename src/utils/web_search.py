@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Web search pipeline for Jarvis Assistant
+Fetches a results page and the top result pages concurrently, extracts text off the event loop
+"""
+
+import re
+import time
+import asyncio
+import threading
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, quote_plus, urlparse
+
+import aiohttp
+from bs4 import BeautifulSoup, SoupStrainer
+
+from src.utils.deadline import expired, time_left
+from src.utils.metrics import cache_requests
+
+logger = logging.getLogger(__name__)
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+# Only build the parts of each document we actually read
+_SNIPPET_STRAINER = SoupStrainer(['div', 'a'])
+_PARAGRAPH_STRAINER = SoupStrainer('p')
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+
+def search_url(query: str) -> str:
+    return f"https://www.google.com/search?q={quote_plus(query)}"
+
+
+def _extract_results(html: str, max_links: int) -> Dict[str, List[str]]:
+    """Pull answer snippets and outbound result links from a results page."""
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=_SNIPPET_STRAINER)
+
+    snippets = []
+    for div in soup.find_all('div', class_='BNeawe'):
+        text = div.get_text().strip()
+        if text and len(text) > 10 and text not in snippets:
+            snippets.append(text)
+        if len(snippets) >= 3:
+            break
+
+    links = []
+    for anchor in soup.find_all('a', href=True):
+        href = anchor['href']
+        if href.startswith('/url?'):
+            href = parse_qs(urlparse(href).query).get('q', [''])[0]
+        host = urlparse(href).netloc
+        if not href.startswith('http') or 'google.' in host or href in links:
+            continue
+        links.append(href)
+        if len(links) >= max_links:
+            break
+
+    return {'snippets': snippets, 'links': links}
+
+
+def _extract_page_text(html: str, max_chars: int) -> str:
+    """Return the leading paragraph text of an article page."""
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=_PARAGRAPH_STRAINER)
+    text = ''
+    for paragraph in soup.find_all('p'):
+        chunk = ' '.join(paragraph.get_text().split())
+        if len(chunk) < 40:
+            continue
+        text = f"{text} {chunk}".strip()
+        if len(text) >= max_chars:
+            break
+    return text[:max_chars]
+
+
+def split_sentences(text: str) -> List[str]:
+    return [sentence.strip() for sentence in _SENTENCE_END.split(text) if sentence.strip()]
+
+
+class SentenceBuffer:
+    """Accumulate streamed tokens and release them a sentence at a time."""
+
+    def __init__(self):
+        self._buffer = ''
+
+    def feed(self, token: str) -> List[str]:
+        self._buffer += token
+        parts = _SENTENCE_END.split(self._buffer)
+        self._buffer = parts.pop()
+        return [part.strip() for part in parts if part.strip()]
+
+    def flush(self) -> str:
+        tail, self._buffer = self._buffer.strip(), ''
+        return tail
+
+
+class SearchPipeline:
+    """Concurrent search fetcher with a per-query results cache."""
+
+    def __init__(self, max_pages: int = 3, per_host: int = 2, timeout: float = 8,
+                 page_chars: int = 600, cache_size: int = 128, cache_ttl: float = 900,
+                 workers: int = 4):
+        self.max_pages = max_pages
+        self.per_host = per_host
+        self.timeout = timeout
+        self.page_chars = page_chars
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='html-parse')
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_limits = None  # (max_pages, per_host) the session's connector was sized for
+
+    def _cache_key(self, query: str) -> str:
+        return ' '.join(query.lower().split())
+
+    def cached(self, query: str) -> Optional[Dict]:
+        """Return a fresh cached result for the query, if any."""
+        key = self._cache_key(query)
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None and time.monotonic() - entry[0] > self.cache_ttl:
+                del self._cache[key]
+                entry = None
+            if entry is None:
+                cache_requests.inc(cache='search', result='miss')
+                return None
+            self._cache.move_to_end(key)
+        cache_requests.inc(cache='search', result='hit')
+        return entry[1]
+
+    def remember(self, query: str, result: Dict):
+        key = self._cache_key(query)
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic(), result)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        # Created lazily so it binds to the loop that runs the pipeline
+        limits = (self.max_pages, self.per_host)
+        if self._session is not None and not self._session.closed and self._session_limits != limits:
+            # Connector limits are fixed at creation, so edited limits need a new session;
+            # the old one closes once any fetch still using it has timed out
+            old = self._session
+            asyncio.get_running_loop().call_later(self.timeout, lambda: asyncio.ensure_future(old.close()))
+            self._session = None
+        if self._session is None or self._session.closed:
+            self._session_limits = limits
+            connector = aiohttp.TCPConnector(limit=self.max_pages * self.per_host + 1,
+                                             limit_per_host=self.per_host)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers={'User-Agent': USER_AGENT},
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+
+    async def _fetch(self, url: str) -> Optional[str]:
+        if expired('search_fetch'):
+            return None
+        session = await self._get_session()
+        try:
+            timeout = aiohttp.ClientTimeout(total=time_left(self.timeout))
+            async with session.get(url, timeout=timeout) as response:
+                if response.status == 200:
+                    return await response.text(errors='replace')
+                logger.warning(f"Search fetch {url} returned {response.status}")
+        except Exception as e:
+            logger.warning(f"Search fetch error for {url}: {e}")
+        return None
+
+    async def _fetch_page_text(self, url: str) -> Optional[str]:
+        html = await self._fetch(url)
+        if not html:
+            return None
+        loop = asyncio.get_running_loop()
+        text = await loop.run_in_executor(self._pool, _extract_page_text, html, self.page_chars)
+        return text or None
+
+    async def search(self, query: str) -> Dict:
+        """Return snippets and page extracts for a query, using the cache when possible."""
+        cached = self.cached(query)
+        if cached is not None:
+            return cached
+
+        result = {'query': query, 'url': search_url(query), 'snippets': [], 'pages': []}
+        html = await self._fetch(result['url'])
+        if not html:
+            return result
+
+        loop = asyncio.get_running_loop()
+        extracted = await loop.run_in_executor(self._pool, _extract_results, html, self.max_pages)
+        result['snippets'] = extracted['snippets']
+
+        texts = await asyncio.gather(*(self._fetch_page_text(url) for url in extracted['links']))
+        result['pages'] = [{'url': url, 'text': text}
+                           for url, text in zip(extracted['links'], texts) if text]
+
+        if result['snippets'] or result['pages']:
+            self.remember(query, result)
+        return result
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._pool.shutdown(wait=False)